@@ -1,16 +1,18 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import os
 import random
-import numpy as np
+import sys
 import time
 
 from Constraint import Constraint, ConstraintBinary, ConstraintEnum, ConstraintAllDiff, ConstraintLinear
-from Variable import Variable
+from Variable import Variable, IntervalVariable
 
 
-VARIABLES_SELECTION = ["arbitrary", "smallest_domain", "most_constrained", "dom_over_constr"]
+VARIABLES_SELECTION = ["arbitrary", "smallest_domain", "most_constrained", "dom_over_constr", "dom_over_future_constr"]
 VALUES_SELECTION = ["arbitrary", "ascending", "descending", "most_supported"]
+LAZY_DOMAIN = 1 << 16  # variables with more values are IntervalVariable, their values are not enumerated
 
 
 class CSP(object):
@@ -36,8 +38,19 @@ class CSP(object):
         self.nbConstrs = len(constrs)
         self.constrs = constrs  # list of constraints
 
-        self.matrixIncident = None # matrixIncident[var1][var2] = True, if var1 and var2 are linked by a constraint
-        self.supportedValCount = None
+        self.arcs = None  # binary constraints and their reverse, cached by arc_consistency.binary_arcs
+        self.blocks = None  # arcs as compatibility blocks, cached by arc_consistency.bulk_arcs
+        self.graph = None  # sparse index of the constraint graph (constraint_graph.ConstraintGraph)
+        self.supportCounter = None  # supports of each value in the current domains, for most_supported ordering
+        self.checker = None  # incremental consistency checks of the BT look-ahead
+        self.adaptive = None  # FC or MAC choice at each node of the ADAPT look-ahead
+        self.engine = None  # event-driven propagation of the ENGINE look-ahead
+
+        # Kept between two solves, to warm start the next one
+        self.compiled = False  # True once the domain sizes and the constraint graph are built
+        self.rootFeasible = True  # False once the root domains were proven inconsistent
+        self.changedVars = set()  # variables whose root domain or constraints changed since the last solve
+        self.phaseHint = None  # values tried first for each variable : the last solution found, or the saved phases
 
         self.param = dict() # parameters settings
         self.__init_parameters()
@@ -49,18 +62,49 @@ class CSP(object):
         self.exploreTime = 0
         self.isFeasible = False
         self.timeOut = False
+        self.propagationStats = None  # nodes, pruned values and time of FC and MAC with the ADAPT look-ahead
+        self.cacheHit = False  # the last solve was answered by the result cache
         self.timeLimit = 300 # seconds
         self.start = None
+        self.interrupted = False  # may be set from another thread to stop the search
+        self.parent = None  # CSP this one is a sub-problem of, its interruption stops the search too
+        self.depth = 0  # current level in the research tree
+        self.intervalVars = []  # variables with a lazy domain, see Variable.IntervalVariable
+        self.nodeIds = []  # id of the branch (node and value tried) explored at each level of the current branch
+        self.lastNodeId = 0  # never reset, so that the ids are unique over all the solves
+        self.maxDepth = 0  # deepest level reached so far
+        self.cubeDepth = None  # if set, the search stops at this level and records the subproblems in cubes
+        self.cubes = None  # domains of each variable at the nodes of level cubeDepth (see distributed.py)
+        self.decisions = []  # [variable, values order, index of the value explored] at each level of the branch
+        self.resumeStack = None  # decisions of a checkpointed branch, replayed by the search before going on
+        self.resumed = None  # checkpoint the next solve continues from (see resume)
+        self.lastCheckpoint = 0  # time of the last checkpoint
+
+        for constr in self.constrs:  # as add_constraint, e.g. to bind the trail of the incremental constraints
+            constr.attach(self)
     
     def __init_parameters(self):
         self.param["variable"] = None
         self.param["value"] = None
         self.param["look-ahead"] = {
-            "BT": False, "FC": False, "MAC3": False, "MAC4": False
+            "BT": False, "FC": False, "MAC3": False, "MAC4": False, "ADAPT": False, "ENGINE": False, "LS": False
         }
         self.param["root"] = { 
-            "AC3": False, "AC4": False
+            "AC3": False, "AC4": False, "SAC": False, "BULK": False
         }
+        self.param["workers"] = 1  # number of processes used by the parallel stages
+        self.param["tabu"] = 10  # local search : number of moves a variable can't take back the value it left
+        self.param["walk"] = 0.02  # local search : probability of a random move
+        self.param["decompose"] = False  # solve each connected component of the constraint graph on its own
+        self.param["cube"] = None  # cube and conquer : depth of the subproblems solved by the workers
+        self.param["address"] = ("localhost", 0)  # cube and conquer : address the workers connect to
+        self.param["authkey"] = None  # cube and conquer : key of the workers, random per solve if None
+        self.param["checkpoint"] = None  # file the search frontier is saved to
+        self.param["period"] = 60  # seconds between two checkpoints
+        self.param["phase"] = False  # phase saving : remember the last value of each variable that passed propagation
+        self.param["rootDepth"] = None  # adaptive look-ahead : MAC is always used above this level
+        self.param["cache"] = None  # SQLite file of the result cache (see result_cache.py)
+        self.param["cacheEntries"] = 10000  # number of results kept in the cache
     
     def set_variable_selection(self, selection=0):
         if selection < 0 or selection > len(VARIABLES_SELECTION)-1:
@@ -72,6 +116,12 @@ class CSP(object):
             raise ValueError("The argument value selection setting {} is invalid.".format(selection))
         self.param.update({"value": VALUES_SELECTION[selection]})
     
+    def set_result_cache(self, path: str, maxEntries=10000):
+        """ Look the solves up in the result cache stored in the given SQLite file, and store their outcomes in it. """
+        if maxEntries < 1:
+            raise ValueError("The cache should keep at least one result, not {}.".format(maxEntries))
+        self.param.update({"cache": path, "cacheEntries": maxEntries})
+
     def set_BT(self):
         self.param["look-ahead"].update({"BT": True})
     
@@ -80,6 +130,67 @@ class CSP(object):
 
     def set_AC4(self):
         self.param["root"].update({"AC4": True})
+
+    def set_SAC(self):
+        self.param["root"].update({"SAC": True})
+
+    def set_bulk_AC(self):
+        """ Root arc consistency with matrix products over all the arcs, see arc_consistency.ac_bulk. """
+        self.param["root"].update({"BULK": True})
+
+    def set_decomposition(self):
+        self.param.update({"decompose": True})
+
+    def set_phase_saving(self):
+        """ Try first, for each variable, the last value it took without contradiction (its saved phase). """
+        self.param.update({"phase": True})
+
+    def set_phase(self, values):
+        """Give the initial phase of the variables, e.g. a known near-solution : its values are tried first.
+
+        Args:
+            values (list or dict): value of each variable id, None (or missing) for the variables without phase
+        """
+        if isinstance(values, dict):
+            phase = [None] * self.nbVars
+            for varId, value in values.items():
+                phase[varId] = value
+        else:
+            phase = list(values)
+        if len(phase) > self.nbVars:
+            raise ValueError("{} values given for {} variables".format(len(phase), self.nbVars))
+        self.phaseHint = phase + [None] * (self.nbVars - len(phase))
+
+    def set_cube_and_conquer(self, depth=4, workers=None, address=None, authkey=None):
+        """Split the search at the given depth, and solve the subproblems in workers connected over TCP.
+
+        Args:
+            depth (int): level of the search tree the subproblems are taken at
+            workers (int): number of local worker processes (all the CPUs if None), 0 to only use remote ones
+            address (tuple): (host, port) the remote workers connect to, see distributed.py
+            authkey (bytes): key the remote workers give to connect, required with them. The local workers use a
+                random key per solve if None
+        """
+        if depth < 1:
+            raise ValueError("The argument cube depth {} is invalid.".format(depth))
+        if authkey is None and (address is not None or workers == 0):
+            raise ValueError("The remote workers need an explicit authkey")
+        self.param.update({"cube": depth})
+        self.param.update({"workers": (os.cpu_count() or 1) if workers is None else workers})
+        if address is not None:
+            self.param.update({"address": address})
+        self.param.update({"authkey": authkey})
+
+    def set_checkpoint(self, path: str, period=60):
+        """ Save the search frontier to the file path every period seconds, and when the search is stopped. """
+        if period <= 0:
+            raise ValueError("The argument checkpoint period {} is invalid.".format(period))
+        self.param.update({"checkpoint": path, "period": period})
+
+    def set_workers(self, workers=1):
+        if workers < 1:
+            raise ValueError("The argument number of workers {} is invalid.".format(workers))
+        self.param.update({"workers": workers})
     
     def set_FC(self):
         self.param["look-ahead"].update({"FC": True})
@@ -92,54 +203,175 @@ class CSP(object):
         self.param["look-ahead"].update({"MAC4": True})
         #self.param["look-ahead"].update({"BT": True})
 
-    def __init_matrix_incidence_supported_values_counter(self):
-        """ Initialize a binary incidence matrix such that mat[var1][var2] = True if var1 and var2 are linked by a
-        constraint. """
-        self.matrixIncident = [[False for _ in range(self.nbVars)] for _ in range(self.nbVars)] 
-        self.supportedValCount = [{val: 0 for val in self.vars[id].dom(-1)} for id in range(self.nbVars)]
-        
-        for c in self.constrs:
-            if not isinstance(c, ConstraintBinary):  # does not count all diff constraints for simplicity
-                continue
-            self.matrixIncident[c.var1.id][c.var2.id] = True
-            self.matrixIncident[c.var2.id][c.var1.id] = True
-            for a in c.var1.dom(0):
-                for b in c.var2.dom(0):
-                    if c.is_feasible([a, b]):
-                        nb = self.supportedValCount[c.var1.id][a]
-                        self.supportedValCount[c.var1.id].update({a: nb+1})
-                        nb = self.supportedValCount[c.var2.id][b]
-                        self.supportedValCount[c.var2.id].update({b: nb+1})
-    
-    def __count_related_constraints(self, id: int):
-        """ Return the number of constraints containing the given variable. """
-        return sum(self.matrixIncident[id])
-
-    def add_variable(self, name: str, domMin: int, domMax: int):
-        """ Create and add a new variable to CSP. """
-        var = Variable(self.nbVars, name, domMin, domMax)
+    def set_adaptive(self, rootDepth=None):
+        """ Switch between forward checking and MAC3 at each node, see adaptive_propagation.AdaptivePropagation. """
+        self.param["look-ahead"].update({"ADAPT": True})
+        if rootDepth is not None:
+            self.param["rootDepth"] = rootDepth
+
+    def set_propagation_engine(self):
+        """ Propagate all the constraints to a fixpoint at each node, see propagation.PropagationEngine. """
+        self.param["look-ahead"].update({"ENGINE": True})
+
+    def set_LS(self, tabu=None, walk=None):
+        """ Solve with min-conflicts local search rather than backtracking (incomplete : can't prove infeasibility).
+
+            A move costs O(degree) whatever the size of the domains, and the search is linear in memory (see
+            local_search.MinConflicts). The enumerated domains of the model hold all their values, about 1.2 GB for
+            the N-Queens with N = 4000 : large models use lazy domains (see add_variable), as solve_nqueens does. """
+        self.param["look-ahead"].update({"LS": True})
+        if tabu is not None:
+            self.param["tabu"] = tabu
+        if walk is not None:
+            self.param["walk"] = walk
+
+    def set_parameters(self, settings):
+        """ Enable the look-ahead and root consistency methods named in settings, e.g. ["FC", "AC4"]. """
+        for param in settings:
+            if param == "BT":
+                self.set_BT()
+            if param == "FC":
+                self.set_FC()
+            if param == "MAC3":
+                self.set_MAC3()
+            if param == "MAC4":
+                self.set_MAC4()
+            if param == "ADAPT":
+                self.set_adaptive()
+            if param == "ENGINE":
+                self.set_propagation_engine()
+            if param == "LS":
+                self.set_LS()
+            if param == "AC3":
+                self.set_AC3()
+            if param == "AC4":
+                self.set_AC4()
+            if param == "SAC":
+                self.set_SAC()
+            if param == "BULK":
+                self.set_bulk_AC()
+            if param == "DECOMPOSE":
+                self.set_decomposition()
+            if param == "CUBE":
+                self.set_cube_and_conquer()
+            if param == "PHASE":
+                self.set_phase_saving()
+
+    def add_variable(self, name: str, domMin: int, domMax: int, lazy=None):
+        """ Create and add a new variable to CSP, with a lazy domain if lazy (by default, if it has many values). """
+        if lazy is None:
+            lazy = domMax - domMin + 1 > LAZY_DOMAIN
+        var = (IntervalVariable if lazy else Variable)(self.nbVars, name, domMin, domMax)
         self.vars.append(var)
         self.nbVars += 1
+        self.compiled = False  # the domain sizes and the constraint graph must be rebuilt
         return var
 
-    def add_constraint_enum(self, var1: int, var2: int, funCompatible=None):
-        """ Create and add a new enumeration constraint to CSP. """
-        constr = ConstraintEnum(self.nbConstrs, self.vars[var1], self.vars[var2], funCompatible)
+    def __register_constraint(self, constr):
+        """ Add a constraint, and update the structures built by a previous solve. """
         self.constrs.append(constr)
         self.nbConstrs += 1
+        constr.attach(self)
+        if self.compiled:
+            self.graph.add_constraint(constr)
+            if self.supportCounter is not None:
+                self.supportCounter.add_constraint(constr)
+            if isinstance(constr, ConstraintBinary):
+                self.changedVars.update([constr.var1.id, constr.var2.id])
+            else:
+                self.changedVars.update([var.id for var in constr.vars])
         return constr
 
+    def add_constraint_enum(self, var1: int, var2: int, funCompatible=None):
+        """ Create and add a new enumeration constraint to CSP. """
+        constr = ConstraintEnum(self.nbConstrs, self.vars[var1], self.vars[var2], funCompatible)
+        return self.__register_constraint(constr)
+
     def add_constraint(self, constr):
         constr.id = self.nbConstrs
-        self.constrs.append(constr)
-        self.nbConstrs += 1
-        return constr
+        return self.__register_constraint(constr)
+
+    def add_all_diff(self, vars, offsets=None):
+        """ Create and add a new all diff constraint to CSP, over the expressions vars[i] + offsets[i] if given. """
+        constr = ConstraintAllDiff(self.nbConstrs, vars, offsets)
+        return self.__register_constraint(constr)
+
+    def add_table(self, vars, table):
+        """ Create and add a new table constraint to CSP, table is an array of the allowed tuples (one per row). """
+        from compact_table import ConstraintTable  # numpy is only loaded by the models with tables
+        constr = ConstraintTable(self.nbConstrs, vars, table)
+        return self.__register_constraint(constr)
+
+    def remove_value(self, varId: int, value: int):
+        """ Remove a value from the domain of a variable, for this solve and the next ones. """
+        self.__compile()
+        var = self.vars[varId]
+        if var.contains(value, 0):
+            var.remove_value(value, 0)
+            self.changedVars.add(varId)
+            if var.current_dom_size[0] == 0:
+                self.rootFeasible = False
+
+    def set_root_domains(self, domains):
+        """Replace the root domains, e.g. by the ones of a subproblem. The values removed before are restored.
 
-    def add_all_diff(self, vars):
-        constr = ConstraintAllDiff(self.nbConstrs, vars)
-        self.constrs.append(constr)
-        self.nbConstrs += 1
-        return constr
+        Args:
+            domains (list): for each variable, the sorted list of the disjoint intervals (a, b) of its domain, see
+                Variable.intervals
+        """
+        self.__compile()
+        self.__new_root()
+        self.rootFeasible = True
+        for var, intervals in zip(self.vars, domains):
+            var.restrict(intervals, 0)
+            if var.current_dom_size[0] == 0:
+                self.rootFeasible = False
+        self.changedVars = set(range(self.nbVars))
+
+    def reset(self):
+        """ Forget the structures and the root domains of the previous solves, the next solve starts from scratch. """
+        for var in self.vars:
+            var.current_dom_size = None
+        self.compiled = False
+        self.rootFeasible = True
+        self.supportCounter = None
+        self.arcs = None
+        self.blocks = None
+        self.phaseHint = None
+
+    def __new_root(self):
+        """ Start a new root branch (csp.nodeIds[-1], never used by the search), so that the incremental states of the
+            constraints computed over the previous root domains are undone (see reversible.Trail). """
+        self.lastNodeId += 1
+        self.nodeIds[-1] = self.lastNodeId
+
+    def __compile(self):
+        """ Build the domain sizes of each level and the constraint graph, keeping the root domains if any. """
+        # the local search only uses the root domains (and the level below for singleton arc consistency)
+        levels = 2 if self.param["look-ahead"]["LS"] else self.nbVars + 1
+        if self.compiled and all(len(var.current_dom_size) >= levels for var in self.vars):
+            return
+        for var in self.vars:
+            if var.lazy:
+                var.allocate_levels(levels, var.current_dom_size is not None)
+            root_size = var.dom_size if var.current_dom_size is None else var.current_dom_size[0]
+            var.current_dom_size = [var.dom_size] * levels
+            var.current_dom_size[0] = root_size
+        if self.compiled:  # only the levels were missing
+            return
+
+        self.intervalVars = [var for var in self.vars if var.lazy]
+        self.nodeIds = [0] * (self.nbVars + 1)
+        self.__new_root()
+        self.decisions = [None] * (self.nbVars + 1)
+
+        from constraint_graph import ConstraintGraph
+        self.graph = ConstraintGraph(self)
+        self.supportCounter = None
+        self.changedVars = set(range(self.nbVars))
+        if self.phaseHint is not None:
+            self.phaseHint += [None] * (self.nbVars - len(self.phaseHint))
+        self.compiled = True
 
     def select_unassigned_varId(self, level=-1):
         if self.param["variable"] == VARIABLES_SELECTION[0]:
@@ -150,6 +382,8 @@ class CSP(object):
             return self.__select_unassigned_varId_most_constr()
         if self.param["variable"] == VARIABLES_SELECTION[3]:
             return self.__select_unassigned_varId_dom_over_constr(level)
+        if self.param["variable"] == VARIABLES_SELECTION[4]:
+            return self.__select_unassigned_varId_dom_over_constr(level, self.graph.futureDegree)
         raise ValueError("Variable selection parameter error : {}.".format(self.param["variable"]))
 
     def __select_unassigned_varId_arbitrary(self):
@@ -176,21 +410,25 @@ class CSP(object):
         """ Select the most constrained unassigned variable. """
         id = -1
         nbConstr = -1
+        degree = self.graph.degree
         for i in range(self.nbVars):
-            if self.assignments[i] is None and self.__count_related_constraints(i) > nbConstr:
-                nbConstr = self.__count_related_constraints(i)
+            if self.assignments[i] is None and degree[i] > nbConstr:
+                nbConstr = degree[i]
                 id = i
         return id
     
-    def __select_unassigned_varId_dom_over_constr(self, level=-1):
+    def __select_unassigned_varId_dom_over_constr(self, level=-1, degree=None):
         """ To select the variable leading to a contradiction rapidly, return the variable
-            with the smallest ratio |dom|/|constr|. """
+            with the smallest ratio |dom|/|constr|. If degree is given, it replaces the number of constraints of
+            each variable (e.g. the number of constraints with an unassigned variable). """
+        if degree is None:
+            degree = self.graph.degree
         id = -1
         ratio = float('inf')
         candidates = [i for i in range(self.nbVars) if self.assignments[i] is None]
         isolated = list()  # variables have no constraint
         for i in candidates:
-            cardConstr = self.__count_related_constraints(i)
+            cardConstr = degree[i]
             if cardConstr == 0:
                 isolated.append(i)
             elif (self.vars[i].current_dom_size[level] / cardConstr) < ratio:
@@ -202,18 +440,36 @@ class CSP(object):
             return id
 
     def select_values(self, varId: int, level=-1):
-        if self.param["value"] == VALUES_SELECTION[0]:
-            return self.__select_values_arbitrary(varId, level)
-        if self.param["value"] == VALUES_SELECTION[1]:
-            return self.__select_values_in_ascending_order(varId, level)
-        if self.param["value"] == VALUES_SELECTION[2]:
-            return self.__select_values_in_descending_order(varId, level)
-        if self.param["value"] == VALUES_SELECTION[3]:
-            return self.__select_values_most_supported_order(varId, level)
-        raise ValueError("Value selection parameter error : {}.".format(self.param["value"]))
+        var = self.vars[varId]
+        if var.lazy and self.param["value"] in VALUES_SELECTION[1:3]:
+            # the values of a lazy domain are not enumerated, the search skips the ones removed from the range
+            lo, hi = var.dom_min(level), var.dom_max(level)
+            values_order = range(lo, hi + 1) if self.param["value"] == VALUES_SELECTION[1] else range(hi, lo - 1, -1)
+        elif self.param["value"] == VALUES_SELECTION[0]:
+            values_order = self.__select_values_arbitrary(varId, level)
+        elif self.param["value"] == VALUES_SELECTION[1]:
+            values_order = self.__select_values_in_ascending_order(varId, level)
+        elif self.param["value"] == VALUES_SELECTION[2]:
+            values_order = self.__select_values_in_descending_order(varId, level)
+        elif self.param["value"] == VALUES_SELECTION[3]:
+            values_order = self.__select_values_most_supported_order(varId, level)
+        else:
+            raise ValueError("Value selection parameter error : {}.".format(self.param["value"]))
+
+        if self.phaseHint is not None:  # warm start or phase saving, try the hinted value first
+            hint = self.phaseHint[varId]
+            if isinstance(values_order, range):
+                if hint in values_order and values_order[0] != hint:
+                    from value_ordering import HintFirst
+                    values_order = HintFirst(hint, values_order)
+            elif hint in values_order and values_order[0] != hint:
+                values_order.remove(hint)
+                values_order.insert(0, hint)
+        return values_order
 
     def __select_values_arbitrary(self, varId: int, level=-1):
         """ Select values arbitrarily. """
+        import numpy as np
         values_order = self.vars[varId].dom(level)[:]
         np.random.shuffle(values_order)
         return values_order
@@ -229,30 +485,12 @@ class CSP(object):
         return values_order
 
     def __select_values_most_supported_order(self, varId: int, level=-1):
-        """ Select values most supported. """
-        return list(filter(
-            lambda val: val in self.vars[varId].dom(level),
-            sorted(
-                self.supportedValCount[varId].keys(),
-                key=lambda x: self.supportedValCount[varId][x], reverse=True
-            )
-        ))
+        """ Select values most supported by the current domains of the neighbouring variables. """
+        return self.supportCounter.order(varId, level)
 
     def all_associated_constrs(self, varId: int):
         """ Return all constraints containing the given variable. """
-        if self.vars[varId].associated_constrs is None:
-            self.vars[varId].associated_constrs = list(filter(
-                lambda c: c.contains_var(varId),
-                self.constrs
-            ))
-        return self.vars[varId].associated_constrs
-
-    def all_associated_assigned_constrs(self, varId: int):
-        """ Return all constraints containing the given variable, and the other variable is also assigned. """
-        return list(filter(
-            lambda c: c.is_assigned(self.assignments),
-            self.all_associated_constrs(varId)
-        ))
+        return self.graph.constrs[varId]
 
     def display(self):
         for c in self.constrs:
@@ -260,39 +498,188 @@ class CSP(object):
             # for (a, b) in c.feasibleTuples:  # TODO: ne marche pas pour les contraintes lineaires
             #     print("(", a, ", ", b, ")")
 
+    def resume(self, path=None):
+        """Continue the search saved in a checkpoint file, by default the one given to set_checkpoint.
+
+        The CSP must be built and set as for the checkpointed solve. The explored nodes and the time already spent are
+        counted in exploredNodes, exploreTime and against timeLimit. If the file doesn't exist, a new solve starts.
+
+        Returns:
+            (bool): True if the CSP admits at least one feasible solution, False otherwise.
+        """
+        from checkpoint import load_checkpoint, restore_domains
+
+        if path is None:
+            path = self.param["checkpoint"]
+        if not os.path.exists(path):
+            return self.solve()
+        state = load_checkpoint(self, path)
+        restore_domains(self, state)
+        self.changedVars = set()
+        self.resumed = state
+        return self.solve()
+
     def solve(self):
         """Solves the CSP with a backtracking algorithm. Final variable values are stored in self.assignments.
 
+        The CSP can be tightened (add_constraint, add_all_diff, remove_value...) and solved again : the constraint
+        graph, the value supports and the root-consistent domains of the previous solve are reused, the root
+        consistency only propagates the changes, and the last solution found gives the values tried first.
+
+        With a result cache (see set_result_cache), a model already solved with the same parameters is not searched
+        again : its solution is checked against the constraints and restored with the statistics of its search. Only
+        the outcomes proven by a search are cached, not the time-outs, interruptions or local search failures.
+
         Returns:
             (bool): True if the CSP admits at least one feasible solution, False otherwise.
         """
+        resumed, self.resumed = self.resumed, None
+        self.cacheHit = False
+        if self.param["cache"] is None or resumed is not None or self.cubeDepth is not None:
+            return self.__solve(resumed)
+
+        from result_cache import ResultCache, model_key
+        cache = ResultCache(self.param["cache"], self.param["cacheEntries"])
+        key = model_key(self)
+        if key is None:  # a constraint can't be described
+            return self.__solve(resumed)
+
+        entry = cache.get(key)
+        if entry is not None:
+            if self.__restore_result(*entry):
+                self.cacheHit = True
+                return self.isFeasible
+            cache.discard(key)  # e.g. the hash of a different model collided
+
+        isFeasible = self.__solve(resumed)
+        if not self.timeOut and not self.interrupted and (isFeasible or not self.param["look-ahead"]["LS"]):
+            stats = {"exploredNodes": self.exploredNodes, "exploreTime": self.exploreTime, "maxDepth": self.maxDepth,
+                     "propagation": self.propagationStats}
+            cache.put(key, isFeasible, self.assignments if isFeasible else None, stats)
+        return isFeasible
+
+    def __restore_result(self, isFeasible: bool, assignment, stats: dict) -> bool:
+        """ Make a cached result the result of this solve, if its solution satisfies the model. """
+        if isFeasible:
+            level = 0 if self.compiled else -1
+            if len(assignment) != self.nbVars or None in assignment:
+                return False
+            if not all(var.contains(value, level) for var, value in zip(self.vars, assignment)):
+                return False
+            if not all(c.is_feasible([assignment[var.id] for var in c.scope()]) for c in self.constrs):
+                return False
+            self.assignments = assignment
+            self.nb_assigned = self.nbVars
+            self.phaseHint = assignment[:]
+        else:
+            self.assignments = [None] * self.nbVars
+            self.nb_assigned = 0
+        self.isFeasible = isFeasible
+        self.timeOut = False
+        self.exploredNodes = stats["exploredNodes"]
+        self.exploreTime = stats["exploreTime"]
+        self.maxDepth = stats["maxDepth"]
+        self.propagationStats = stats["propagation"]
+        return True
+
+    def __solve(self, resumed):
+        """ Solve the CSP, resuming the search of the given checkpoint state if any. """
         from backtrack import backtracking  # to avoid circular imports
-        from arc_consistency import ac3, ac4
+        from arc_consistency import ac3, ac4, ac_bulk
 
         # setup
         self.isFeasible = True
+        self.timeOut = False
+        self.exploredNodes = 0
+        self.propagationStats = None
 
         self.assignments = [None for _ in range(self.nbVars)]
         self.nb_assigned = 0
-
-        for var in self.vars:
-            var.current_dom_size = var.dom_size * np.ones(self.nbVars + 1, dtype=int)
-            var.associated_constrs = None
+        self.depth = 0
+        self.maxDepth = 0
+
+        if self.param["cube"] is not None and self.cubeDepth is None and resumed is None:
+            from distributed import solve_distributed
+            return solve_distributed(self, self.param["cube"], self.param["workers"], self.param["address"],
+                                     self.param["authkey"])
+
+        if self.param["decompose"] and resumed is None:
+            from decomposition import components, solve_components
+            varIds, constrs = components(self)
+            if len(varIds) > 1:
+                self.start = time.time()
+                self.isFeasible = solve_components(self, varIds, constrs)
+                if self.isFeasible:
+                    self.phaseHint = self.assignments[:]
+                self.exploreTime = round(time.time() - self.start, 3)
+                return self.isFeasible
+
+        warm = self.compiled
+        self.__compile()
+        self.graph.compact()
+        self.graph.reset_future_degree()
+        if self.param["phase"] and self.phaseHint is None:
+            self.phaseHint = [None] * self.nbVars
 
         # Actual solve
-        if self.param["root"]["AC3"]: 
-            self.isFeasible = ac3(self)
+        if resumed is not None:
+            self.isFeasible = True  # the root domains of the checkpoint are consistent already
+        elif self.param["root"]["BULK"]:
+            changed = sorted(self.changedVars) if warm else None
+            self.isFeasible = ac_bulk(self, changed=changed, workers=self.param["workers"])
+        elif self.param["root"]["AC3"] or (warm and self.param["root"]["AC4"]):
+            # re-solves only revise the arcs around the changes, the other root domains are arc-consistent already
+            self.isFeasible = ac3(self, changed=sorted(self.changedVars) if warm else None)
         elif self.param["root"]["AC4"]: 
             self.isFeasible = ac4(self)
+        elif self.param["root"]["SAC"]:
+            from singleton_consistency import sac
+            self.isFeasible = sac(self, self.param["workers"])
+        if self.param["look-ahead"]["ENGINE"]:
+            from propagation import PropagationEngine
+            self.engine = PropagationEngine(self)
+            if self.isFeasible and resumed is None:
+                self.isFeasible = self.engine.propagate_all()
+        self.changedVars = set()
+        self.rootFeasible = self.rootFeasible and self.isFeasible
+        self.isFeasible = self.rootFeasible
         if not self.isFeasible:
             return False
         
-        self.__init_matrix_incidence_supported_values_counter()
-        # print("supportedValCount : {}. ".format(self.supportedValCount))
+        if self.param["value"] == VALUES_SELECTION[3] and self.supportCounter is None:
+            from value_ordering import SupportCounter
+            self.supportCounter = SupportCounter(self)
+        if self.param["look-ahead"]["BT"]:
+            from incremental_check import IncrementalChecker
+            self.checker = IncrementalChecker(self)
+        if self.param["look-ahead"]["ADAPT"]:
+            from adaptive_propagation import AdaptivePropagation
+            self.adaptive = AdaptivePropagation(self, self.param["rootDepth"])
+            self.propagationStats = self.adaptive.stats
 
         self.start = time.time()
-
+        if resumed is not None:
+            from checkpoint import resume_state
+            resume_state(self, resumed)
+        self.lastCheckpoint = time.time()
+
+        if self.param["look-ahead"]["LS"]:
+            from local_search import min_conflicts
+            self.isFeasible = min_conflicts(self)
+            if self.isFeasible:
+                self.phaseHint = self.assignments[:]
+            self.exploreTime = round(time.time() - self.start, 3)
+            return self.isFeasible
+
+        # the search recurses once per level, e.g. thousands of levels for the N-Queens with large N
+        sys.setrecursionlimit(max(sys.getrecursionlimit(), self.nbVars + 1000))
         self.isFeasible = backtracking(self, 0)
+        self.resumeStack = None
+        if self.isFeasible:
+            self.phaseHint = self.assignments[:]
+        checkpoint = self.param["checkpoint"]
+        if checkpoint is not None and not self.timeOut and not self.interrupted and os.path.exists(checkpoint):
+            os.remove(checkpoint)  # the search is over
 
         end = time.time()
         self.exploreTime = round(end - self.start, 3)
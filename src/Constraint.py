@@ -1,11 +1,46 @@
+import copy
+import math
+import operator
 from operator import itemgetter
 
 import Variable
+from reversible import Trail
+
+# operator functions rather than lambdas, so that constraints can be pickled
+OPERATORS = {"eq": operator.eq, "g": operator.gt, "geq": operator.ge, "l": operator.lt, "leq": operator.le,
+             "neq": operator.ne}
+
+# domain events of a variable (see propagation.PropagationEngine) : assigned (a single value left), bounds changed, any
+# value removed. A constraint subscribed to an event is also woken up by the stronger ones, with a lower number.
+ASSIGNED, BOUNDS, VALUE = 0, 1, 2
+# cost classes of the propagators, the cheapest ones run first
+BINARY, LINEAR, GLOBAL = 0, 1, 2
+BATCH_CELLS = 1 << 20  # number of pairs of values checked at once by ConstraintBinary.unsupported
+
+def value_interval(coef, lowTerm, highTerm, a: int, b: int, supported):
+    """Return the interval of the values v in [a, b] such that lowTerm <= coef * v <= highTerm.
+
+    The term bounds may be infinite. The predicate supported(v) refines the ends, for strict inequalities and rounding
+    errors. The interval is empty if the first value returned is greater than the second.
+    """
+    low, high = (lowTerm / coef, highTerm / coef) if coef > 0 else (highTerm / coef, lowTerm / coef)
+    if low != -math.inf:
+        a = max(a, math.ceil(low))
+    if high != math.inf:
+        b = min(b, math.floor(high))
+    while a <= b and not supported(a):
+        a += 1
+    while b >= a and not supported(b):
+        b -= 1
+    return a, b
 
 
 class Constraint(object):
     """ Implementation of a binary constraint object. For the sake of simplicity, all attributes are public.
     """
+    EVENT = VALUE  # weakest domain event the constraint is propagated on
+    PRIORITY = GLOBAL  # cost class of its propagator
+    IDEMPOTENT = False  # True if propagating it again right after its own changes removes nothing more
 
     def __init__(self, id: int):
         """Initializes a constraint.
@@ -23,13 +58,61 @@ class Constraint(object):
     def contains_var(self, varId: int):
         raise NotImplemented
 
+    def scope(self):
+        """ Return the list of variables of the constraint. """
+        raise NotImplementedError
+
+    def attach(self, csp):
+        """ Called when the constraint is added to csp. """
+        pass
+
+    def register(self, engine):
+        """ Subscribe the constraint to the domain events of its variables, see propagation.PropagationEngine. """
+        for var in self.scope():
+            engine.subscribe(self, var, self.EVENT)
+
+    def copy_with(self, vars: dict):
+        """Returns a copy of the constraint over other variables, e.g. the variables of a sub-problem
+
+        Args:
+            vars (dict): new variable replacing each variable of the constraint, by id of the replaced variable
+
+        Returns:
+            (Constraint): the copied constraint
+        """
+        raise NotImplementedError
+
     def is_assigned(self, assignments):
         raise NotImplemented
 
+    def signature(self):
+        """Returns a description of the constraint independent of its id, for the key of a model in a result cache.
+
+        Returns:
+            (tuple): the kind of constraint, the ids of its variables and its parameters, as python numbers and strings.
+                None if the constraint can't be described, the models using it are not cached.
+        """
+        return None
+
     def is_feasible(self, values: list):
         """ Return True if the given assigned values are satisfied by current constraint, False otherwise. """
         raise NotImplemented()
 
+    def is_feasible_batch(self, values: list):
+        """Check many assignments of the variables of the constraint at once.
+
+        Args:
+            values (list): candidate values of each variable of the scope, arrays (or ints) broadcast together
+
+        Returns:
+            (numpy.ndarray): boolean mask, True where the values satisfy the constraint
+        """
+        import numpy as np
+        columns = np.broadcast_arrays(*[np.asarray(column) for column in values])
+        rows = zip(*[column.ravel().tolist() for column in columns])
+        mask = np.fromiter((self.is_feasible(list(row)) for row in rows), dtype=bool, count=columns[0].size)
+        return mask.reshape(columns[0].shape)
+
     def propagate_assignment(self, assigned_var: Variable.Variable, assignments: list, level: int):
         """After one of its constraints was assigned a value, eliminated infeasible values from the second one's domain
 
@@ -43,8 +126,24 @@ class Constraint(object):
         """
         raise NotImplemented()
 
+    def propagate(self, level: int, changed: list):
+        """After the domains of some of its variables changed, eliminate the values without support at level + 1
+
+        Args:
+            level (int): Depth on the current branch in backtracking, -1 for the root domains
+            changed (list of variable.Variable): the variables of the constraint whose domain changed
+
+        Returns:
+            (bool): True if no domain was wiped out, False otherwise
+        """
+        raise NotImplementedError
+
 
 class ConstraintBinary(Constraint):
+    EVENT = VALUE
+    PRIORITY = BINARY
+    IDEMPOTENT = True  # a value without support doesn't support the other variable either
+
     def __init__(self, id: int, var1: Variable.Variable, var2: Variable.Variable):
         """Initializes a constraint.
 
@@ -63,6 +162,15 @@ class ConstraintBinary(Constraint):
     def contains_var(self, varId: int):
         return self.var1.id == varId or self.var2.id == varId
 
+    def scope(self):
+        return [self.var1, self.var2]
+
+    def copy_with(self, vars: dict):
+        constr = copy.copy(self)
+        constr.var1 = vars[self.var1.id]
+        constr.var2 = vars[self.var2.id]
+        return constr
+
     def is_assigned(self, assignments):
         return assignments[self.var1.id] is not None and assignments[self.var2.id] is not None
 
@@ -74,6 +182,63 @@ class ConstraintBinary(Constraint):
         """
         raise NotImplemented()
 
+    def is_feasible_pair(self, a, b):
+        """ Return True if the values a of var1 and b of var2 satisfy the constraint, without building a list. """
+        return self.is_feasible([a, b])
+
+    def unsupported(self, var: Variable.Variable, values, support):
+        """Return the given values of var (one of the two variables) without support among the values of the other one.
+
+        The pairs are checked with is_feasible_batch, BATCH_CELLS at most at once : the values found supported by a
+        part of the support are not checked against the next ones.
+
+        Args:
+            var (variable.Variable): the variable whose values are checked
+            values (list or numpy.ndarray): values of var
+            support (list or numpy.ndarray): values of the other variable
+
+        Returns:
+            (numpy.ndarray): the values without support, in the given order
+        """
+        import numpy as np
+        values = np.asarray(values, dtype=np.int64)
+        support = np.asarray(support, dtype=np.int64)
+        pending = np.ones(len(values), dtype=bool)
+        start = 0
+        while start < len(support) and pending.any():
+            rest = values[pending][:, None]
+            part = support[start:start + max(1, BATCH_CELLS // len(rest))][None, :]
+            feasible = self.is_feasible_batch([rest, part] if var.id == self.var1.id else [part, rest])
+            pending[pending] = ~feasible.any(axis=1)
+            start += part.shape[1]
+        return values[pending]
+
+    def revise(self, var: Variable.Variable, level: int) -> bool:
+        """ Remove the values of var (one of the two variables) without support in the domain of the other one. """
+        other = self.var2 if var.id == self.var1.id else self.var1
+        for a in self.unsupported(var, var.dom(level + 1), other.dom(level + 1)).tolist():
+            var.remove_value(a, level + 1)
+            if var.current_dom_size[level + 1] == 0:
+                return False
+        return True
+
+    def propagate(self, level: int, changed: list):
+        for var in changed:
+            if not self.revise(self.var2 if var.id == self.var1.id else self.var1, level):
+                return False
+        return True
+
+    def compatibility_matrix(self):
+        """Returns the compatibility of every pair of values of the initial domains
+
+        Returns:
+            (numpy.ndarray): boolean matrix, mat[a - var1.domMin][b - var2.domMin] = True if (a, b) is feasible
+        """
+        import numpy as np
+        a = np.arange(self.var1.domMin, self.var1.domMax + 1)
+        b = np.arange(self.var2.domMin, self.var2.domMax + 1)
+        return self.is_feasible_batch([a[:, None], b[None, :]])
+
     def propagate_assignment(self, assigned_var: Variable.Variable, assignments: list, level: int):
         """After one of its constraints was assigned a value, eliminated infeasible values from the second one's domain
 
@@ -100,18 +265,17 @@ class ConstraintBinary(Constraint):
         contradiction = False
 
         if assignments[var_to_check.id] is None:
-            for value in var_to_check.dom(level):
+            import numpy as np
+            values = np.array(var_to_check.dom(level + 1), dtype=np.int64)
+            assigned = assignments[assigned_var.id]
+            feasible = self.is_feasible_batch([assigned, values] if var_to_check is self.var2 else [values, assigned])
 
-                assignments[var_to_check.id] = value
-                feasible = self.is_feasible([assignments[self.var1.id], assignments[self.var2.id]])
-                assignments[var_to_check.id] = None
+            for value in values[~feasible].tolist():
+                var_to_check.remove_value(value, level + 1)
 
-                if not feasible:
-                    var_to_check.remove_value(value, level + 1)
-
-                    if var_to_check.current_dom_size[level + 1] == 0:
-                        contradiction = True
-                        break
+                if var_to_check.current_dom_size[level + 1] == 0:
+                    contradiction = True
+                    break
 
         return not contradiction
 
@@ -136,10 +300,36 @@ class ConstraintEnum(ConstraintBinary):
                     self.feasibleTuples.add((a, b))
                 elif feasibility_fun(var1.id, var2.id, a, b):
                     self.feasibleTuples.add((a, b))
+        self.matrix = None  # (var1.domMin, var2.domMin, compatibility matrix), built on the first batched check
 
     def is_feasible(self, values: list):
         return (values[0], values[1]) in self.feasibleTuples
 
+    def is_feasible_pair(self, a, b):
+        return (a, b) in self.feasibleTuples
+
+    def is_feasible_batch(self, values: list):
+        # lookups in the compatibility matrix, the values out of the initial domains are infeasible
+        import numpy as np
+        if self.matrix is None:
+            self.matrix = (self.var1.domMin, self.var2.domMin, self.compatibility_matrix())
+        min1, min2, mat = self.matrix
+        a = np.asarray(values[0]) - min1
+        b = np.asarray(values[1]) - min2
+        inside = (a >= 0) & (a < mat.shape[0]) & (b >= 0) & (b < mat.shape[1])
+        return inside & mat[np.clip(a, 0, mat.shape[0] - 1), np.clip(b, 0, mat.shape[1] - 1)]
+
+    def signature(self):
+        return "enum", self.var1.id, self.var2.id, sorted(self.feasibleTuples)
+
+    def compatibility_matrix(self):
+        import numpy as np
+        mat = np.zeros((self.var1.dom_size, self.var2.dom_size), dtype=bool)
+        if self.feasibleTuples:
+            tuples = np.array(list(self.feasibleTuples), dtype=int)
+            mat[tuples[:, 0] - self.var1.domMin, tuples[:, 1] - self.var2.domMin] = True
+        return mat
+
     def reverse(self):
         return ConstraintEnum(
             id=-self.id,
@@ -171,22 +361,23 @@ class ConstraintLinear(ConstraintBinary):
         self.rhs = rhs
 
         self.type = type
-        if type == "eq":
-            self.check_function = lambda x, y: x == y
-        elif type == "g":
-            self.check_function = lambda x, y: x > y
-        elif type == "geq":
-            self.check_function = lambda x, y: x >= y
-        elif type == "l":
-            self.check_function = lambda x, y: x < y
-        elif type == "leq":
-            self.check_function = lambda x, y: x <= y
-        elif type == "neq":
-            self.check_function = lambda x, y: x != y
+        self.check_function = OPERATORS[type]
 
     def is_feasible(self, values: list):
         return self.check_function(self.coef1 * values[0] + self.coef2 * values[1], self.rhs)
 
+    def is_feasible_pair(self, a, b):
+        return self.check_function(self.coef1 * a + self.coef2 * b, self.rhs)
+
+    def is_feasible_batch(self, values: list):
+        import numpy as np
+        return self.check_function(self.coef1 * np.asarray(values[0]) + self.coef2 * np.asarray(values[1]), self.rhs)
+
+    def signature(self):
+        # the variables are sorted by id, so that the constraint and its reverse have the same signature
+        terms = sorted([(self.var1.id, self.coef1), (self.var2.id, self.coef2)])
+        return "linear", terms, self.rhs, self.type
+
     def reverse(self):
         return ConstraintLinear(
             id=-self.id,
@@ -195,6 +386,60 @@ class ConstraintLinear(ConstraintBinary):
             type=self.type
         )
 
+    def unsupported(self, var: Variable.Variable, values, support):
+        # neq : a value loses its support only against a single value. inequalities : only the bound of the support
+        # minimizing (l, leq) or maximizing (g, geq) the term of the other variable needs to be checked
+        import numpy as np
+        if self.type == "eq" or len(support) == 0:
+            return super().unsupported(var, values, support)
+        coef, otherCoef = (self.coef1, self.coef2) if var.id == self.var1.id else (self.coef2, self.coef1)
+        if self.type == "neq":
+            value = (self.rhs - otherCoef * support[0]) / coef if len(support) == 1 else None
+            if value is None or value != int(value) or int(value) not in values:
+                return np.empty(0, dtype=np.int64)
+            return np.array([int(value)], dtype=np.int64)
+        values = np.asarray(values, dtype=np.int64)
+        best = min(support) if (otherCoef > 0) == (self.type in ("leq", "l")) else max(support)
+        feasible = self.is_feasible_batch([values, best] if var.id == self.var1.id else [best, values])
+        return values[~feasible]
+
+    def revise(self, var: Variable.Variable, level: int) -> bool:
+        # inequalities : the supported values form an interval, given by the bounds of the other domain
+        if self.type == "eq" and not (var.lazy or (self.var1 if var.id == self.var2.id else self.var2).lazy):
+            return super().revise(var, level)
+        if var.id == self.var1.id:
+            other, coef, otherCoef = self.var2, self.coef1, self.coef2
+        else:
+            other, coef, otherCoef = self.var1, self.coef2, self.coef1
+
+        if self.type == "neq":
+            if other.current_dom_size[level + 1] == 1:
+                value = (self.rhs - otherCoef * other.dom_min(level + 1)) / coef
+                if value == int(value) and var.contains(int(value), level + 1):
+                    var.remove_value(int(value), level + 1)
+            return var.current_dom_size[level + 1] > 0
+
+        # eq on lazy domains : bounds consistency, the holes are ignored
+        minTerm, maxTerm = sorted((otherCoef * other.dom_min(level + 1), otherCoef * other.dom_max(level + 1)))
+
+        def supported(value):
+            if self.type == "eq":
+                return self.rhs - maxTerm <= coef * value <= self.rhs - minTerm
+            if self.type in ("leq", "l"):
+                return self.check_function(coef * value + minTerm, self.rhs)
+            return self.check_function(coef * value + maxTerm, self.rhs)
+
+        lo, hi = var.dom_min(level + 1), var.dom_max(level + 1)
+        if supported(lo) and supported(hi):
+            return True
+        a, b = value_interval(
+            coef, self.rhs - maxTerm if self.type in ("eq", "geq", "g") else -math.inf,
+            self.rhs - minTerm if self.type in ("eq", "leq", "l") else math.inf, lo, hi, supported
+        )
+        var.remove_below(a, level + 1)
+        var.remove_above(b, level + 1)
+        return var.current_dom_size[level + 1] > 0
+
     def propagate_assignment(self, assigned_var, assignments, level):
         if assignments[assigned_var.id] is None:
             raise ValueError("Variable {} should have an assigned value".format(assigned_var.name))
@@ -202,13 +447,14 @@ class ConstraintLinear(ConstraintBinary):
         if self.coef1 == 0 or self.coef2 == 0:
             raise ValueError("Unary constraints not supported, modify variable's domain instead")
 
+        # coef * value <type> residual for the values of the other variable
         if assigned_var.id == self.var1.id:
-            updated_rhs = (self.rhs - self.coef1 * assignments[assigned_var.id]) / self.coef2
-            var_to_check = self.var2
+            residual = self.rhs - self.coef1 * assignments[assigned_var.id]
+            var_to_check, coef = self.var2, self.coef2
 
         elif assigned_var.id == self.var2.id:
-            updated_rhs = (self.rhs - self.coef2 * assignments[assigned_var.id]) / self.coef1
-            var_to_check = self.var1
+            residual = self.rhs - self.coef2 * assignments[assigned_var.id]
+            var_to_check, coef = self.var1, self.coef1
 
         else:
             raise ValueError("Variable {} not in constraint {} (should be {} or {})".format(
@@ -217,32 +463,271 @@ class ConstraintLinear(ConstraintBinary):
 
         contradiction = False
 
-        if assignments[var_to_check.id] is None:
-            for value in var_to_check.dom(level):
-
-                if not self.check_function(value, updated_rhs):
-                    var_to_check.remove_value(value, level + 1)
+        if assignments[var_to_check.id] is None and (var_to_check.lazy or self.type == "neq"):
+            # the supported values are all but one (neq) or an interval, the domain is not enumerated
+            if self.type == "neq":
+                value = residual / coef
+                if value == int(value) and var_to_check.contains(int(value), level + 1):
+                    var_to_check.remove_value(int(value), level + 1)
+            else:
+                a, b = value_interval(
+                    coef, residual if self.type in ("eq", "geq", "g") else -math.inf,
+                    residual if self.type in ("eq", "leq", "l") else math.inf,
+                    var_to_check.dom_min(level + 1), var_to_check.dom_max(level + 1),
+                    lambda value: self.check_function(coef * value, residual)
+                )
+                var_to_check.remove_below(a, level + 1)
+                var_to_check.remove_above(b, level + 1)
+            contradiction = var_to_check.current_dom_size[level + 1] == 0
+
+        elif assignments[var_to_check.id] is None:
+            import numpy as np
+            values = np.array(var_to_check.dom(level + 1), dtype=np.int64)
+            for value in values[~self.check_function(coef * values, residual)].tolist():
+                var_to_check.remove_value(value, level + 1)
 
-                    if var_to_check.current_dom_size[level + 1] == 0:
-                        contradiction = True
-                        break
+                if var_to_check.current_dom_size[level + 1] == 0:
+                    contradiction = True
+                    break
 
         return not contradiction
 
 
+class ConstraintSum(Constraint):
+    """ n-ary linear constraint sum(coefs[i] * vars[i]) <type> rhs, filtered with bounds reasoning.
+
+    The constraint keeps the bounds of the domains of its variables, the running min / max of the sum and a bound on
+    the largest span of a term, restored with a Trail when the search backtracks. A propagation only updates the
+    variables pushed to it, the changed ones given by the propagation engine or the assigned one in forward checking,
+    in O(1) each plus the values a moved bound skips. The bounds of the variables not pushed are wider, which is still
+    sound. The scope is only scanned for values to remove when the slack of the sum is below the largest span.
+    """
+    EVENT = BOUNDS
+    PRIORITY = LINEAR
+    IDEMPOTENT = True
+
+    def __init__(self, id: int, vars, coefs, rhs: float, type: str):
+        """Initializes a constraint of linear expression over any number of variables.
+
+        Args:
+            id (int): id of the constraint, should be unique inside a CSP
+            vars (list of variable.Variable): variables of the constraint
+            coefs (list or numpy.ndarray): coefficient of each variable, the variables with a null one are dropped
+            rhs(float): right-hand side
+            type (str): type of linear constraint, see ConstraintLinear
+        """
+        import numpy as np
+        super().__init__(id)
+        coefs = np.asarray(coefs)
+        self.vars = [var for var, coef in zip(vars, coefs) if coef != 0]
+        self.vars_ids = dict.fromkeys([var.id for var in self.vars])
+        self.positions = dict()  # positions[id] = indices of the variable in vars
+        for i, var in enumerate(self.vars):
+            self.positions.setdefault(var.id, []).append(i)
+        self.coefs = coefs[coefs != 0]
+        self.__coefs = self.coefs.tolist()  # faster to read one by one
+        self.rhs = rhs
+        self.type = type
+        self.check_function = OPERATORS[type]
+
+        self.lo = [var.domMin for var in self.vars]
+        self.hi = [var.domMax for var in self.vars]
+        self.lastSize = [var.dom_size for var in self.vars]  # domain sizes the bounds were computed with
+        terms = [self.__terms(i) for i in range(len(self.vars))]
+        self.sums = [sum(t[0] for t in terms), sum(t[1] for t in terms)]  # min and max of the sum
+        self.span = [max((t[1] - t[0] for t in terms), default=0)]  # >= max term - min term of each variable
+        self.trail = Trail()
+
+    def __repr__(self):
+        return "constraint {0} : {1} {2} {3}".format(
+            self.id, " + ".join("{} * {}".format(coef, var.name) for coef, var in zip(self.coefs, self.vars)),
+            self.type, self.rhs
+        )
+
+    def contains_var(self, varId: int):
+        return varId in self.vars_ids
+
+    def scope(self):
+        return self.vars
+
+    def copy_with(self, vars: dict):
+        return ConstraintSum(self.id, [vars[var.id] for var in self.vars], self.coefs, self.rhs, self.type)
+
+    def attach(self, csp):
+        self.trail.attach(csp)
+
+    def is_assigned(self, assignments):
+        for varId in self.vars_ids:
+            if assignments[varId] is None:
+                return False
+        return True
+
+    def is_feasible(self, values):
+        if len(self.vars) != len(values):
+            raise ValueError("{} variables but {} values given".format(len(self.vars), len(values)))
+        return self.check_function(sum(coef * value for coef, value in zip(self.__coefs, values)), self.rhs)
+
+    def signature(self):
+        return "sum", sorted(zip([var.id for var in self.vars], self.__coefs)), self.rhs, self.type
+
+    def is_feasible_batch(self, values: list):
+        import numpy as np
+        if len(self.vars) != len(values):
+            raise ValueError("{} variables but {} values given".format(len(self.vars), len(values)))
+        total = sum(coef * np.asarray(column) for coef, column in zip(self.__coefs, values))
+        return np.asarray(self.check_function(total, self.rhs))
+
+    def __terms(self, i: int):
+        """ Return the min and max of the term of the i-th variable. """
+        coef = self.__coefs[i]
+        if coef > 0:
+            return coef * self.lo[i], coef * self.hi[i]
+        return coef * self.hi[i], coef * self.lo[i]
+
+    def __set_bounds(self, i: int, lo: int, hi: int):
+        minTerm, maxTerm = self.__terms(i)
+        self.trail.set(self.lo, i, lo)
+        self.trail.set(self.hi, i, hi)
+        newMin, newMax = self.__terms(i)
+        self.trail.set(self.sums, 0, self.sums[0] + newMin - minTerm)
+        self.trail.set(self.sums, 1, self.sums[1] + newMax - maxTerm)
+        if newMax - newMin > self.span[0]:  # a domain restored since, e.g. the root domains of a new solve
+            self.trail.set(self.span, 0, newMax - newMin)
+
+    def __tighten(self, i: int, level: int, lo=None, hi=None):
+        """ Move the bounds of the i-th variable to the ones of its domain at level + 1, which is not empty, known to
+            be within [lo, hi] if given. """
+        var = self.vars[i]
+        if var.lazy or var.current_dom_size[level + 1] > self.lastSize[i]:
+            # the bounds of a lazy domain are known in O(1), a domain restored since (e.g. the root domains of a new
+            # solve) is scanned
+            lo, hi = var.dom_min(level + 1), var.dom_max(level + 1)
+        else:  # walk from the old bounds over the values removed since
+            lo = self.lo[i] if lo is None else max(lo, self.lo[i])
+            hi = self.hi[i] if hi is None else min(hi, self.hi[i])
+            while not var.contains(lo, level + 1):
+                lo += 1
+            while not var.contains(hi, level + 1):
+                hi -= 1
+        if lo != self.lo[i] or hi != self.hi[i]:
+            self.__set_bounds(i, lo, hi)
+        self.trail.set(self.lastSize, i, var.current_dom_size[level + 1])
+
+    def __update_bounds(self, level: int, changed) -> bool:
+        """ Update the bounds and the sums with the values removed from the changed variables since the last call. """
+        for var in changed:
+            size = var.current_dom_size[level + 1]
+            if size == 0:
+                return False
+            for i in self.positions[var.id]:
+                if size != self.lastSize[i]:
+                    self.__tighten(i, level)
+        return True
+
+    def __slack(self):
+        """ Return how far the sums are from violating the constraint : a term spanning less loses no value. """
+        if self.type in ("leq", "l"):
+            return self.rhs - self.sums[0]
+        if self.type in ("geq", "g"):
+            return self.sums[1] - self.rhs
+        if self.type == "eq":
+            return min(self.rhs - self.sums[0], self.sums[1] - self.rhs)
+        return self.sums[1] - self.sums[0]  # neq, a value is only removed when the other variables are fixed
+
+    def __supported(self, term, minRest, maxRest) -> bool:
+        """ Return True if some values of the other variables, within their bounds, complete the term. """
+        if self.type == "eq":
+            return minRest <= self.rhs - term <= maxRest
+        if self.type in ("leq", "l"):
+            return self.check_function(term + minRest, self.rhs)
+        if self.type in ("geq", "g"):
+            return self.check_function(term + maxRest, self.rhs)
+        return minRest != maxRest or term + minRest != self.rhs
+
+    def __supported_interval(self, i: int, minRest, maxRest):
+        """ Return the interval of the values of the i-th variable, within its bounds, supported by the others. """
+        coef = self.__coefs[i]
+        return value_interval(
+            coef, self.rhs - maxRest if self.type in ("eq", "geq", "g") else -math.inf,
+            self.rhs - minRest if self.type in ("eq", "leq", "l") else math.inf,
+            self.lo[i], self.hi[i], lambda value: self.__supported(coef * value, minRest, maxRest)
+        )
+
+    def __filter_domains(self, level: int) -> bool:
+        """ Remove the values without support within the bounds, until the bounds don't change. """
+        if self.span[0] < self.__slack():
+            return True
+        coefs = self.__coefs
+        changed = True
+        while changed:
+            changed = False
+            for i, var in enumerate(self.vars):
+                coef = coefs[i]
+                minTerm, maxTerm = self.__terms(i)
+                minRest, maxRest = self.sums[0] - minTerm, self.sums[1] - maxTerm
+                if self.type == "neq":
+                    # only the value completing the others, if they are all fixed, is removed
+                    value = (self.rhs - minRest) / coef
+                    if minRest != maxRest or value != int(value) or not var.contains(int(value), level + 1):
+                        continue
+                    var.remove_value(int(value), level + 1)
+                    a, b = None, None
+                # the supported values form an interval, it is enough to check the bounds
+                elif self.__supported(coef * self.lo[i], minRest, maxRest) and \
+                        self.__supported(coef * self.hi[i], minRest, maxRest):
+                    continue
+                else:
+                    a, b = self.__supported_interval(i, minRest, maxRest)
+                    var.remove_below(a, level + 1)
+                    var.remove_above(b, level + 1)
+                if var.current_dom_size[level + 1] == 0:
+                    return False
+
+                self.__tighten(i, level, a, b)
+                changed = True
+        span = max((maxTerm - minTerm for minTerm, maxTerm in map(self.__terms, range(len(self.vars)))), default=0)
+        if span != self.span[0]:
+            self.trail.set(self.span, 0, span)
+        return True
+
+    def propagate_assignment(self, assigned_var: Variable.Variable, assignments: list, level: int):
+        if assignments[assigned_var.id] is None:
+            raise ValueError("Variable {} should have an assigned value".format(assigned_var.name))
+
+        self.trail.sync(level)
+        return self.__update_bounds(level, [assigned_var]) and self.__filter_domains(level)
+
+    def propagate(self, level: int, changed: list):
+        self.trail.sync(level)
+        return self.__update_bounds(level, changed) and self.__filter_domains(level)
+
+
 class ConstraintAllDiff(Constraint):
+    """ All the expressions vars[i] + offsets[i] take different values, e.g. the diagonals of the N-Queens. """
+    EVENT = ASSIGNED
+    PRIORITY = GLOBAL
 
-    def __init__(self, id: int, vars):
+    def __init__(self, id: int, vars, offsets=None):
         super().__init__(id)
         self.vars = vars
         self.vars_ids = dict.fromkeys([var.id for var in vars])
+        self.offsets = list(offsets) if offsets is not None else [0] * len(vars)
+        self.offset = {var.id: offset for var, offset in zip(vars, self.offsets)}  # by variable id
 
     def __repr__(self):
-        return "constraint {0} : ({1})".format(self.id, [var.name for var in self.vars])
+        if not any(self.offsets):
+            return "constraint {0} : ({1})".format(self.id, [var.name for var in self.vars])
+        return "constraint {0} : ({1}) with offsets {2}".format(self.id, [var.name for var in self.vars], self.offsets)
 
     def contains_var(self, varId: int):
         return varId in self.vars_ids
 
+    def scope(self):
+        return self.vars
+
+    def copy_with(self, vars: dict):
+        return ConstraintAllDiff(self.id, [vars[var.id] for var in self.vars], self.offsets)
+
     def is_assigned(self, assignments):
         nb_assigned = 0
 
@@ -258,24 +743,49 @@ class ConstraintAllDiff(Constraint):
         if len(self.vars) != len(values):
             raise ValueError("{} variables but {} values given".format(len(self.vars), len(values)))
 
-        actual_values = list(filter(lambda x: x is not None, values))
+        actual_values = [value + offset for value, offset in zip(values, self.offsets) if value is not None]
         return len(set(actual_values)) == len(actual_values)
 
+    def signature(self):
+        return "alldiff", sorted(zip([var.id for var in self.vars], self.offsets))
+
+    def is_feasible_batch(self, values: list):
+        # the values of each row are sorted, a duplicate is then next to its copy
+        import numpy as np
+        if len(self.vars) != len(values):
+            raise ValueError("{} variables but {} values given".format(len(self.vars), len(values)))
+        columns = np.broadcast_arrays(*[np.asarray(column) + offset for column, offset in zip(values, self.offsets)])
+        rows = np.sort(np.stack(columns, axis=-1), axis=-1)
+        return ~(rows[..., 1:] == rows[..., :-1]).any(axis=-1)
+
     def propagate_assignment(self, assigned_var: Variable.Variable, assignments: list, level: int):
         if assignments[assigned_var.id] is None:
             raise ValueError("Variable {} should have an assigned value".format(assigned_var.name))
 
-        contradiction = False
-
-        for var_to_check in self.vars:
+        used = assignments[assigned_var.id] + self.offset[assigned_var.id]
+        for var_to_check, offset in zip(self.vars, self.offsets):
             if assignments[var_to_check.id] is not None:
                 continue
 
-            if assignments[assigned_var.id] in var_to_check.dom(level + 1):
-                var_to_check.remove_value(assignments[assigned_var.id], level + 1)
+            if var_to_check.contains(used - offset, level + 1):
+                var_to_check.remove_value(used - offset, level + 1)
 
                 if var_to_check.current_dom_size[level + 1] == 0:
-                    contradiction = True
-                    break
+                    return False
 
-        return not contradiction
+        return True
+
+    def propagate(self, level: int, changed: list):
+        # the value of each variable with a single value left is removed from the others
+        for var in changed:
+            if var.current_dom_size[level + 1] != 1:
+                continue
+            used = var.dom_min(level + 1) + self.offset[var.id]
+            for var_to_check, offset in zip(self.vars, self.offsets):
+                if var_to_check.id != var.id and var_to_check.contains(used - offset, level + 1):
+                    var_to_check.remove_value(used - offset, level + 1)
+
+                    if var_to_check.current_dom_size[level + 1] == 0:
+                        return False
+
+        return True
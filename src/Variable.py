@@ -5,6 +5,7 @@ import Constraint
 class Variable(object):
     """ Implementation of a variable object. For the sake of simplicity, all attributes are public.
     """
+    lazy = False  # True if the domain is not enumerated, see IntervalVariable
 
     def __init__(self, id: int, name: str, domMin: int, domMax: int):  # , domFun):
         """ Initialize a variable."""
@@ -14,11 +15,11 @@ class Variable(object):
         self.domMin = domMin
         self.domMax = domMax
         self._dom = list(range(domMin, domMax + 1))  # domaine énumérée, l'ens élément finis
+        self._pos = list(range(len(self._dom)))  # _pos[value - domMin] = index of value in _dom
         self.dom_size = len(self._dom)
         # self.domFun = domFun  # domaine defini par une fonction
         self.level = -1
         self.current_dom_size = None
-        self.associated_constrs = None
 
     def __repr__(self):
         return "variable {}".format(self.name)
@@ -36,39 +37,84 @@ class Variable(object):
             return self._dom[:]
         return self._dom[:self.current_dom_size[level]]
 
+    def contains(self, value: int, level: int = -1) -> bool:
+        """ Return True if the value is in the domain at the given level, in O(1). """
+        if not self.domMin <= value <= self.domMax:
+            return False
+        return level == -1 or self._pos[value - self.domMin] < self.current_dom_size[level]
+
+    def __swap(self, i: int, j: int):
+        a, b = self._dom[i], self._dom[j]
+        self._dom[i], self._dom[j] = b, a
+        self._pos[a - self.domMin], self._pos[b - self.domMin] = j, i
+
     def remove_value(self, value:int, level:int):
         """ Remove the given value from the domain at actual level of research tree"""
-        last = self.current_dom_size[level] - 1
-        to_remove = -1
-        for i in range(last + 1):
-            if self._dom[i] == value:
-                to_remove = i
-                break
-
-        if to_remove == -1:
+        if not self.contains(value, level):
             raise ValueError("Value {} not found in variable {}'s domain at level {}".format(value, self.name, level))
-        self._dom[to_remove], self._dom[last] = self._dom[last], self._dom[to_remove]
+        last = self.current_dom_size[level] - 1
+        self.__swap(self._pos[value - self.domMin], last)
         self.current_dom_size[level] -= 1
 
     def remove_all_values_except(self, value: int, level: int):
-        last = self.current_dom_size[level] - 1
-        to_keep = -1
-        for i in range(last + 1):
-            if self._dom[i] == value:
-                to_keep = i
-                break
-
-        if to_keep == -1:
+        if not self.contains(value, level):
             raise ValueError("Value {} not found in variable {}'s domain at level {}".format(value, self.name, level))
-        self._dom[to_keep], self._dom[0] = self._dom[0], self._dom[to_keep]
+        self.__swap(self._pos[value - self.domMin], 0)
         self.current_dom_size[level] = 1
 
+    def remove_below(self, value: int, level: int):
+        """ Remove the values lower than the given one from the domain at given level. """
+        for a in self.dom(level):
+            if a < value:
+                self.remove_value(a, level)
+
+    def remove_above(self, value: int, level: int):
+        """ Remove the values greater than the given one from the domain at given level. """
+        for a in self.dom(level):
+            if a > value:
+                self.remove_value(a, level)
+
+    def dom_min(self, level: int = -1) -> int:
+        return min(self.dom(level))
+
+    def dom_max(self, level: int = -1) -> int:
+        return max(self.dom(level))
+
+    def copy_level(self, src: int, dst: int):
+        """ The domain at level dst becomes the domain at level src. """
+        self.current_dom_size[dst] = self.current_dom_size[src]
+
+    def intervals(self, level: int = -1):
+        """ Return the domain at given level as a sorted list of intervals (a, b), a compact copy of it. """
+        intervals = []
+        for value in sorted(self.dom(level)):
+            if intervals and intervals[-1][1] == value - 1:
+                intervals[-1][1] = value
+            else:
+                intervals.append([value, value])
+        return [(a, b) for a, b in intervals]
+
+    def restrict(self, intervals, level: int):
+        """ The domain at given level becomes the initial domain values within the given intervals (disjoint and
+            sorted). The domains of the levels above it are lost, it is meant for the root level. """
+        self.current_dom_size[level] = self.dom_size  # the removed values are kept after the domain
+        kept = set(value for a, b in intervals for value in range(a, b + 1))
+        for value in self.dom(level):
+            if value not in kept:
+                self.remove_value(value, level)
+
     def __add__(self, other):
         return LinearExpr(var1=self, coef1=1) + other
 
+    def __radd__(self, other):  # e.g. sum(vars)
+        return self + other
+
     def __mul__(self, other):
         return LinearExpr(var1=self, coef1=1) * other
 
+    def __rmul__(self, other):
+        return self * other
+
     def __sub__(self, other):
         return LinearExpr(var1=self, coef1=1) - other
 
@@ -91,6 +137,202 @@ class Variable(object):
         return LinearExpr(var1=self, coef1=1) >= other
 
 
+class IntervalVariable(Variable):
+    """ Variable with a large range of values, whose domains are bounds and a few holes rather than enumerated lists.
+
+    At each level, the domain is [lo[level], hi[level]] minus the holes and the gaps of this level or above it on
+    the current branch : holes[value] is the level the value was removed at, gaps are the (a, b, level) ranges cut
+    by restrict. Both are stacked by level, the ones of the deeper levels being dropped when a level is overwritten.
+    Removing a bound moves it in O(1) (skipping the holes and the gaps), only dom() enumerates the values.
+    """
+    lazy = True
+
+    def __init__(self, id: int, name: str, domMin: int, domMax: int):
+        self.id = id
+        self.name = name
+        self.domMin = domMin
+        self.domMax = domMax
+        self.dom_size = domMax - domMin + 1
+        self.level = -1
+        self.current_dom_size = None
+        self.lo = None  # lower bound at each level
+        self.hi = None  # upper bound at each level
+        self.holes = dict()
+        self.stack = []  # (value, level) of the holes, by increasing level
+        self.gaps = []  # (a, b, level) of the ranges removed by restrict, by increasing level
+
+    def __repr__(self):
+        return "variable {} in [{}, {}]".format(self.name, self.domMin, self.domMax)
+
+    def allocate_levels(self, levels: int, keepRoot: bool):
+        """ Allocate the bounds of levels 0..levels-1, keeping the root domain if keepRoot. """
+        lo, hi = (self.lo[0], self.hi[0]) if keepRoot and self.lo is not None else (self.domMin, self.domMax)
+        self.lo = [self.domMin] * levels
+        self.hi = [self.domMax] * levels
+        self.lo[0], self.hi[0] = lo, hi
+        self.__drop(1 if keepRoot else 0)
+
+    def __drop(self, level: int):
+        """ Forget the holes of the given level and the deeper ones. """
+        stack = self.stack
+        while stack and stack[-1][1] >= level:
+            value, _ = stack.pop()
+            del self.holes[value]
+        gaps = self.gaps
+        while gaps and gaps[-1][2] >= level:
+            gaps.pop()
+
+    def __is_hole(self, value: int, level: int) -> bool:
+        removed = self.holes.get(value)
+        return removed is not None and removed <= level
+
+    def __gap_end(self, value: int, level: int):
+        """ Return the end of the gap containing the value at given level, None if there is none. """
+        for a, b, removed in self.gaps:
+            if removed <= level and a <= value <= b:
+                return b
+        return None
+
+    def __gap_start(self, value: int, level: int):
+        """ Return the start of the gap containing the value at given level, None if there is none. """
+        for a, b, removed in self.gaps:
+            if removed <= level and a <= value <= b:
+                return a
+        return None
+
+    def __removed(self, level: int, a: int, b: int):
+        """ Return the disjoint ranges of the holes and gaps of the domain at given level within [a, b], sorted. """
+        ranges = [(value, value) for value, removed in self.stack if removed <= level and a <= value <= b]
+        ranges += [(max(c, a), min(d, b)) for c, d, removed in self.gaps if removed <= level and c <= b and a <= d]
+        merged = []
+        for c, d in sorted(ranges):
+            if merged and c <= merged[-1][1] + 1:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], d))
+            else:
+                merged.append((c, d))
+        return merged
+
+    def __nb_removed(self, level: int, a: int, b: int) -> int:
+        return sum(d - c + 1 for c, d in self.__removed(level, a, b))
+
+    def dom(self, level: int = -1):
+        if level == -1:
+            return list(range(self.domMin, self.domMax + 1))
+        if not self.holes and not self.gaps:
+            return list(range(self.lo[level], self.hi[level] + 1))
+        return [value for a, b in self.intervals(level) for value in range(a, b + 1)]
+
+    def contains(self, value: int, level: int = -1) -> bool:
+        if level == -1:
+            return self.domMin <= value <= self.domMax
+        return (self.lo[level] <= value <= self.hi[level] and not self.__is_hole(value, level) and
+                self.__gap_end(value, level) is None)
+
+    def dom_min(self, level: int = -1) -> int:
+        return self.domMin if level == -1 else self.lo[level]
+
+    def dom_max(self, level: int = -1) -> int:
+        return self.domMax if level == -1 else self.hi[level]
+
+    def remove_value(self, value: int, level: int):
+        if not self.contains(value, level):
+            raise ValueError("Value {} not found in variable {}'s domain at level {}".format(value, self.name, level))
+        if value == self.lo[level]:
+            self.__set_lo(value + 1, level)
+        elif value == self.hi[level]:
+            self.__set_hi(value - 1, level)
+        else:
+            self.__drop(level + 1)
+            self.holes[value] = level
+            self.stack.append((value, level))
+        self.current_dom_size[level] -= 1
+
+    def __set_lo(self, value: int, level: int):
+        while value <= self.hi[level]:
+            if self.__is_hole(value, level):
+                value += 1
+                continue
+            end = self.__gap_end(value, level)
+            if end is None:
+                break
+            value = end + 1
+        self.lo[level] = value
+
+    def __set_hi(self, value: int, level: int):
+        while value >= self.lo[level]:
+            if self.__is_hole(value, level):
+                value -= 1
+                continue
+            start = self.__gap_start(value, level)
+            if start is None:
+                break
+            value = start - 1
+        self.hi[level] = value
+
+    def remove_all_values_except(self, value: int, level: int):
+        if not self.contains(value, level):
+            raise ValueError("Value {} not found in variable {}'s domain at level {}".format(value, self.name, level))
+        self.lo[level] = self.hi[level] = value
+        self.current_dom_size[level] = 1
+
+    def remove_below(self, value: int, level: int):
+        lo, hi = self.lo[level], self.hi[level]
+        if value <= lo:
+            return
+        if value > hi:
+            self.lo[level] = value
+            self.current_dom_size[level] = 0
+            return
+        self.current_dom_size[level] -= value - lo - self.__nb_removed(level, lo, value - 1)
+        self.__set_lo(value, level)
+
+    def remove_above(self, value: int, level: int):
+        lo, hi = self.lo[level], self.hi[level]
+        if value >= hi:
+            return
+        if value < lo:
+            self.hi[level] = value
+            self.current_dom_size[level] = 0
+            return
+        self.current_dom_size[level] -= hi - value - self.__nb_removed(level, value + 1, hi)
+        self.__set_hi(value, level)
+
+    def copy_level(self, src: int, dst: int):
+        self.lo[dst] = self.lo[src]
+        self.hi[dst] = self.hi[src]
+        self.current_dom_size[dst] = self.current_dom_size[src]
+        self.__drop(dst)
+
+    def intervals(self, level: int = -1):
+        if level == -1:
+            return [(self.domMin, self.domMax)]
+        intervals = []
+        a = self.lo[level]
+        for c, d in self.__removed(level, self.lo[level], self.hi[level]):
+            if a < c:
+                intervals.append((a, c - 1))
+            a = d + 1
+        if a <= self.hi[level]:
+            intervals.append((a, self.hi[level]))
+        return intervals
+
+    def restrict(self, intervals, level: int):
+        self.__drop(level)
+        intervals = [(max(a, self.domMin), min(b, self.domMax)) for a, b in sorted(intervals)]
+        intervals = [(a, b) for a, b in intervals if a <= b]
+        if not intervals:
+            self.lo[level], self.hi[level] = self.domMin, self.domMin - 1
+            self.current_dom_size[level] = 0
+            return
+        self.lo[level], self.hi[level] = intervals[0][0], intervals[-1][1]
+        size = 0
+        for i, (a, b) in enumerate(intervals):
+            size += b - a + 1
+            if i + 1 < len(intervals) and b + 1 < intervals[i + 1][0]:
+                self.gaps.append((b + 1, intervals[i + 1][0] - 1, level))
+        self.current_dom_size[level] = size
+
+
 class LinearExpr(object):
 
     def __init__(self, var1=None, var2=None, coef1=0., coef2=0., constant=0.):
@@ -114,47 +356,30 @@ class LinearExpr(object):
         if isinstance(other, numbers.Number):
             return LinearExpr(self.var1, self.var2, self.coef1, self.coef2, self.constant + other)
 
-        elif isinstance(other, Variable):
-            if self.var1.id == other.id:
-                return LinearExpr(self.var1, self.var2, self.coef1 + 1, self.coef2, self.constant)
-            elif self.var2.id == other.id:
-                return LinearExpr(self.var1, self.var2, self.coef1, self.coef2 + 1, self.constant)
-            elif self.var1 is None:
-                return LinearExpr(other, self.var2, 1, self.coef2, self.constant)
-            elif self.var2 is None:
-                return LinearExpr(self.var1, other, self.coef1, 1, self.constant)
-            else:
-                raise ValueError("Trying to add a variable to an expression already containing 2")
-
-        elif isinstance(other, LinearExpr):
-            if self.var1 is None and self.var2 is None:
-                return other + self.constant
-            elif other.var1 is None and other.var2 is None:
-                return self + other.constant
-            elif self.var1 is None and (other.var2 is None or self.var2.id == other.var2.id):
-                return LinearExpr(other.var1, self.var2, other.coef1, self.coef2 + other.coef2, self.constant + other.constant)
-            elif self.var1 is None and (other.var1 is None or self.var2.id == other.var1.id):
-                return LinearExpr(other.var2, self.var2, other.coef2, self.coef2 + other.coef1, self.constant + other.constant)
-            elif self.var2 is None and (other.var1 is None or self.var1.id == other.var1.id):
-                return LinearExpr(self.var1, other.var2, self.coef1 + other.coef1, other.coef2, self.constant + other.constant)
-            elif self.var2 is None and (other.var2 is None or self.var1.id == other.var2.id):
-                return LinearExpr(self.var1, other.var1, self.coef1 + other.coef2, other.coef1, self.constant + other.constant)
-            if self.var1.id == other.var1.id and self.var2.id == other.var2.id:
-                return LinearExpr(self.var1, self.var2, self.coef1 + other.coef1, self.coef2 + other.coef2, self.constant + other.constant)
-            elif self.var2.id == other.var1.id and self.var1.id == other.var2.id:
-                return LinearExpr(self.var1, self.var2, self.coef1 + other.coef2, self.coef2 + other.coef1, self.constant + other.constant)
-            else:
-                raise ValueError("Trying to add a variable to an expression already containing 2")
+        total = LinearSum.of(self) + other
+        if isinstance(other, LinearSum) or len(total.vars) > 2:
+            return total
+        vars = total.vars + [None] * (2 - len(total.vars))
+        coefs = total.coefs + [0.] * (2 - len(total.coefs))
+        return LinearExpr(vars[0], vars[1], coefs[0], coefs[1], total.constant)
+
+    def __radd__(self, other):
+        return self + other
 
     def __mul__(self, other):
         if isinstance(other, numbers.Number):
             return LinearExpr(self.var1, self.var2, self.coef1 * other, self.coef2 * other, self.constant * other)
 
+    def __rmul__(self, other):
+        return self * other
+
     def __sub__(self, other):
         return self + other * -1
 
     def __eq__(self, other):
         expr = self - other
+        if isinstance(expr, LinearSum):
+            return LinearSum.of(self) == other
         return Constraint.ConstraintLinear(
             id=-1,
             var1=expr.var1, var2=expr.var2,
@@ -164,6 +389,8 @@ class LinearExpr(object):
 
     def __ne__(self, other):
         expr = self - other
+        if isinstance(expr, LinearSum):
+            return LinearSum.of(self) != other
         return Constraint.ConstraintLinear(
             id=-1,
             var1=expr.var1, var2=expr.var2,
@@ -173,6 +400,8 @@ class LinearExpr(object):
 
     def __lt__(self, other):
         expr = self - other
+        if isinstance(expr, LinearSum):
+            return LinearSum.of(self) < other
         return Constraint.ConstraintLinear(
             id=-1,
             var1=expr.var1, var2=expr.var2,
@@ -182,6 +411,8 @@ class LinearExpr(object):
 
     def __le__(self, other):
         expr = self - other
+        if isinstance(expr, LinearSum):
+            return LinearSum.of(self) <= other
         return Constraint.ConstraintLinear(
             id=-1,
             var1=expr.var1, var2=expr.var2,
@@ -191,6 +422,8 @@ class LinearExpr(object):
 
     def __gt__(self, other):
         expr = self - other
+        if isinstance(expr, LinearSum):
+            return LinearSum.of(self) > other
         return Constraint.ConstraintLinear(
             id=-1,
             var1=expr.var1, var2=expr.var2,
@@ -200,9 +433,91 @@ class LinearExpr(object):
 
     def __ge__(self, other):
         expr = self - other
+        if isinstance(expr, LinearSum):
+            return LinearSum.of(self) >= other
         return Constraint.ConstraintLinear(
             id=-1,
             var1=expr.var1, var2=expr.var2,
             coef1=expr.coef1, coef2=expr.coef2, rhs=-expr.constant,
             type="geq"
         )
+
+
+class LinearSum(object):
+    """ Linear expression over any number of variables, built when a LinearExpr would contain more than 2. """
+
+    def __init__(self, vars=None, coefs=None, constant=0.):
+        self.vars = list(vars) if vars is not None else []
+        self.coefs = list(coefs) if coefs is not None else []
+        self.constant = constant
+
+    @staticmethod
+    def of(expr):
+        """ Convert a Variable, a LinearExpr or a number to a LinearSum. """
+        if isinstance(expr, LinearSum):
+            return expr
+        if isinstance(expr, Variable):
+            return LinearSum([expr], [1])
+        if isinstance(expr, LinearExpr):
+            vars, coefs = [], []
+            for var, coef in ((expr.var1, expr.coef1), (expr.var2, expr.coef2)):
+                if var is not None:
+                    vars.append(var)
+                    coefs.append(coef)
+            return LinearSum(vars, coefs, expr.constant)
+        return LinearSum(constant=expr)
+
+    def __repr__(self):
+        return " + ".join(["{} * {}".format(coef, var.name) for var, coef in zip(self.vars, self.coefs)] +
+                          [str(self.constant)])
+
+    def __add__(self, other):
+        if isinstance(other, numbers.Number):
+            return LinearSum(self.vars, self.coefs, self.constant + other)
+
+        other = LinearSum.of(other)
+        index = {var.id: i for i, var in enumerate(self.vars)}
+        vars, coefs = self.vars[:], self.coefs[:]
+        for var, coef in zip(other.vars, other.coefs):
+            if var.id in index:
+                coefs[index[var.id]] += coef
+            else:
+                index[var.id] = len(vars)
+                vars.append(var)
+                coefs.append(coef)
+        return LinearSum(vars, coefs, self.constant + other.constant)
+
+    def __radd__(self, other):
+        return self + other
+
+    def __mul__(self, other):
+        if isinstance(other, numbers.Number):
+            return LinearSum(self.vars, [coef * other for coef in self.coefs], self.constant * other)
+
+    def __rmul__(self, other):
+        return self * other
+
+    def __sub__(self, other):
+        return self + LinearSum.of(other) * -1
+
+    def __constraint(self, other, type: str):
+        expr = self - other
+        return Constraint.ConstraintSum(id=-1, vars=expr.vars, coefs=expr.coefs, rhs=-expr.constant, type=type)
+
+    def __eq__(self, other):
+        return self.__constraint(other, "eq")
+
+    def __ne__(self, other):
+        return self.__constraint(other, "neq")
+
+    def __lt__(self, other):
+        return self.__constraint(other, "l")
+
+    def __le__(self, other):
+        return self.__constraint(other, "leq")
+
+    def __gt__(self, other):
+        return self.__constraint(other, "g")
+
+    def __ge__(self, other):
+        return self.__constraint(other, "geq")
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import math
+import time
+
+from arc_consistency import ac3
+
+
+class AdaptivePropagation(object):
+    """ Chooses at each node of the search between forward checking (FC) and maintaining arc consistency (MAC3).
+
+    MAC is used :
+        - near the root, at the levels below rootDepth, where a pruned value cuts the largest subtrees
+        - in the subtree of a node where FC wiped out a domain, until the search backtracks above it
+        - elsewhere, when it prunes more values per second than FC. The rates are moving averages of the values pruned
+          and of the time spent over the last nodes each propagator ran at.
+    FC is used otherwise. The stats keep the nodes, values pruned, time and wipe-outs of each propagator, why MAC was
+    chosen and how many times the search switched between both.
+
+    Below a node where MAC succeeded, the domains are arc-consistent already : MAC only revises the arcs pointing to
+    the variables changed by the assignment.
+    """
+
+    def __init__(self, csp, rootDepth=None, decay=0.9):
+        """Initialize the controller of a search.
+
+        Args:
+            csp (CSP.CSP): A CSP solver, whose domains are built
+            rootDepth (int): MAC is always used above this level, log2 of the number of variables if None
+            decay (float): weight of the past nodes in the moving averages
+        """
+        self.csp = csp
+        self.rootDepth = max(1, int(math.log2(csp.nbVars + 1))) if rootDepth is None else rootDepth
+        self.decay = decay
+        self.wipeoutLevel = None  # level of the highest node whose subtree uses MAC after a FC wipe-out
+        self.pruned = {"FC": None, "MAC": None}  # moving averages of the values pruned
+        self.seconds = {"FC": None, "MAC": None}  # moving averages of the time spent
+        self.last = None  # propagator of the last node
+        # consistent[level] : the domains at this level are arc-consistent (MAC succeeded at the parent node)
+        self.consistent = [False] * (csp.nbVars + 2)
+        self.consistent[0] = any(csp.param["root"].values())
+
+        self.stats = {
+            method: {"nodes": 0, "pruned": 0, "time": 0.0, "wipeouts": 0} for method in ("FC", "MAC")
+        }
+        self.stats.update({"switches": 0, "reasons": {"root": 0, "wipeout": 0, "rate": 0}})
+
+    def rate(self, method: str) -> float:
+        """ Return the moving average of the values pruned per second by the propagator, 0 if it never ran. """
+        if self.seconds[method] is None:
+            return 0.
+        return self.pruned[method] / max(self.seconds[method], 1e-9)
+
+    def choose(self, level: int) -> str:
+        """ Return the propagator ("FC" or "MAC") of a node of the given level, counting why MAC is chosen. """
+        if self.wipeoutLevel is not None and level < self.wipeoutLevel:
+            self.wipeoutLevel = None  # the search left the subtree
+        reasons = self.stats["reasons"]
+        if level < self.rootDepth:
+            reasons["root"] += 1
+            return "MAC"
+        if self.wipeoutLevel is not None:
+            reasons["wipeout"] += 1
+            return "MAC"
+        if self.seconds["FC"] is not None and self.rate("MAC") > self.rate("FC"):
+            reasons["rate"] += 1
+            return "MAC"
+        return "FC"
+
+    def propagate(self, level: int, varId: int, var) -> bool:
+        """Propagate the assignment of var at a node of the given level, with the propagator chosen for it.
+
+        Returns:
+            (bool): False if a domain was wiped out, True otherwise
+        """
+        from backtrack import forward_checking, propagate_n_ary  # to avoid circular imports
+
+        csp = self.csp
+        method = self.choose(level)
+        if self.last is not None and method != self.last:
+            self.stats["switches"] += 1
+        self.last = method
+
+        start = time.perf_counter()
+        if method == "FC":
+            feasible = forward_checking(csp, level, varId, var)
+        else:
+            feasible = propagate_n_ary(csp, level, varId, var)
+            if feasible:
+                changed = None
+                if self.consistent[level]:
+                    changed = [v.id for v in csp.vars if v.current_dom_size[level + 1] != v.current_dom_size[level]]
+                feasible = ac3(csp, level, changed)
+        seconds = time.perf_counter() - start
+        self.consistent[level + 1] = feasible and method == "MAC"
+        # the values removed by the assignment itself are not counted
+        pruned = int(sum(v.current_dom_size[level] - v.current_dom_size[level + 1] for v in csp.vars)
+                     - var.current_dom_size[level] + 1)
+
+        stats = self.stats[method]
+        stats["nodes"] += 1
+        stats["pruned"] += pruned
+        stats["time"] += seconds
+        if self.seconds[method] is None:
+            self.pruned[method], self.seconds[method] = pruned, seconds
+        else:
+            self.pruned[method] = self.decay * self.pruned[method] + (1 - self.decay) * pruned
+            self.seconds[method] = self.decay * self.seconds[method] + (1 - self.decay) * seconds
+
+        if not feasible:
+            stats["wipeouts"] += 1
+            if method == "FC" and (self.wipeoutLevel is None or level < self.wipeoutLevel):
+                self.wipeoutLevel = level
+        return feasible
@@ -1,86 +1,108 @@
 from Constraint import ConstraintBinary
 
 
+BULK_DOMAIN = 512  # arcs with larger domains are revised by ac3 after the bulk revision
+BULK_CHUNK = 1 << 22  # number of matrix cells multiplied at once by ac_bulk
 
-def ac3(csp, level=-1):
+
+def binary_arcs(csp):
+    """Returns the arcs of the binary constraints of a csp, both directions, built once and cached in the csp.
+
+    Args:
+        csp (CSP.CSP): A CSP solver
+    Returns:
+        (list, list): the arcs (constraints and their reverse), and arcs_to[x] = indices of the arcs (z, x)
+    """
+    if csp.arcs is None or len(csp.arcs[2]) != csp.nbVars:
+        csp.arcs = (0, [], [list() for _ in range(csp.nbVars)])
+
+    nbConstrs, constrs, arcs_to = csp.arcs
+    if nbConstrs < csp.nbConstrs:  # only the constraints added since the last call are reversed
+        for constr in csp.constrs[nbConstrs:]:
+            if isinstance(constr, ConstraintBinary):  # Does not check all diff constraints for simplicity
+                for c in (constr, constr.reverse()):
+                    arcs_to[c.var2.id].append(len(constrs))
+                    constrs.append(c)
+        csp.arcs = (csp.nbConstrs, constrs, arcs_to)
+    return constrs, arcs_to
+
+
+def ac3(csp, level=-1, changed=None):
     """Removes all arc-inconsistent values for each variable of a csp
     Args:
         csp (CSP.CSP): A CSP solver
         level (int): depth level at which arc-consistency is verified in a backtracking tree
+        changed (list of int): if given, only the arcs pointing to these variables are revised first, the domains of
+            the other variables are assumed to be arc-consistent already
     Returns:
         (bool): False if the problem is found unfeasible, True otherwise.
             True does not mean that the problem is feasible, just that unfeasibility was not proven yet
     """
-    constrs = []
-    for constr in csp.constrs:
-        if isinstance(constr, ConstraintBinary):  # Does not check all diff constraints for simplicity
-            constrs.append(constr)
-            constrs.append(constr.reverse())
+    constrs, arcs_to = binary_arcs(csp)
 
-    to_test = constrs[:]
+    if changed is None:
+        to_test = list(range(len(constrs)))
+    else:
+        to_test = [j for varId in changed for j in arcs_to[varId]]
+    in_queue = [False] * len(constrs)
+    for j in to_test:
+        in_queue[j] = True
     while to_test:
 
-        c_xy = to_test.pop()
+        i = to_test.pop()
+        in_queue[i] = False
+        c_xy = constrs[i]
         x = c_xy.var1
         y = c_xy.var2
 
-        dom_x = x.dom(level + 1)
-        for a in dom_x:
-            supported = False
-
-            dom_y = y.dom(level + 1)
-            for b in dom_y:
-                if c_xy.is_feasible([a, b]):
-                    supported = True
-                    break
-
-            if not supported:
-                # print("ac3 remove {} of {} from {}".format(a, x.name, x.dom(level)))
+        if x.lazy or y.lazy:
+            # the lazy domains are not enumerated, the constraint revises the bounds (see ConstraintLinear.revise)
+            size = x.current_dom_size[level + 1]
+            if not c_xy.revise(x, level):
+                return False
+            removed = x.current_dom_size[level + 1] != size
+        else:
+            removed = c_xy.unsupported(x, x.dom(level + 1), y.dom(level + 1)).tolist()
+            for a in removed:
                 x.remove_value(a, level + 1)
 
                 if x.current_dom_size[level + 1] == 0:
                     return False
 
-                for c_zx in constrs:
-                    if c_zx.var2.id == x.id and c_zx.var1.id != y.id:
-                        if c_zx not in to_test:
-                            to_test.append(c_zx)
+        if removed:
+            for j in arcs_to[x.id]:
+                # an arc and its reverse are stored side by side, only the reverse of c_xy can be skipped :
+                # another constraint between x and y may have lost supports
+                if j != i ^ 1 and not in_queue[j]:
+                    to_test.append(j)
+                    in_queue[j] = True
 
     return True
 
 
 def init_ac4(csp, level=-1):
+    import numpy as np
     Q = []
     supporters = {(id, a): list() for id in range(csp.nbVars) for a in csp.vars[id].dom(level)}
     counters = {}
 
-    constrs = []
-    for constr in csp.constrs:
-        if isinstance(constr, ConstraintBinary):
-            constrs.append(constr)
-            constrs.append(constr.reverse())
+    constrs, _ = binary_arcs(csp)
 
     contradiction = False
-    for c in constrs:
+    for i, c in enumerate(constrs):  # the counters are kept by arc, two constraints may link the same variables
         x = c.var1
         y = c.var2
 
         dom_x = x.dom(level + 1)
-        for a in dom_x:
-            total = 0
+        dom_y = y.dom(level + 1)
+        feasible = c.is_feasible_batch([np.array(dom_x, dtype=np.int64)[:, None], np.array(dom_y, dtype=np.int64)])
+        for ia, ib in np.argwhere(feasible).tolist():
+            supporters[(y.id, dom_y[ib])].append((i, x.id, dom_x[ia]))
 
-            dom_y = y.dom(level + 1)
-            for b in dom_y:
-                if c.is_feasible([a, b]):
-                    total += 1
-                    # l = supporters[(y.id, b)]
-                    # l.append((x.id, a))
-                    # supporters.update({(y.id, b): l})
-                    supporters[(y.id, b)].append((x.id, a))
+        for a, total in zip(dom_x, feasible.sum(axis=1).tolist()):
+            counters.update({(i, a): total})
 
-            counters.update({(x.id, y.id, a): total})
-
-            if counters[(x.id, y.id, a)] == 0:
+            if counters[(i, a)] == 0 and x.contains(a, level + 1):
                 x.remove_value(a, level + 1)
                 Q.append((x.id, a))
 
@@ -101,12 +123,11 @@ def ac4(csp, level=-1):
         element = Q.pop(0)
         y_id = element[0]
         for support in supporters[element]:
-            x_id = support[0]
-            a = support[1]
+            i, x_id, a = support
 
-            counters[(x_id, y_id, a)] -= 1
+            counters[(i, a)] -= 1
 
-            if counters[(x_id, y_id, a)] == 0:  # and a in csp.vars[x_id].dom(level + 1):
+            if counters[(i, a)] == 0 and csp.vars[x_id].contains(a, level + 1):
                 csp.vars[x_id].remove_value(a, level + 1)
                 Q.append((x_id, a))
 
@@ -115,3 +136,156 @@ def ac4(csp, level=-1):
                     break
 
     return not contradiction
+
+
+def bulk_arcs(csp):
+    """Returns the arcs of the binary constraints of a csp as stacked compatibility blocks, built once and cached.
+
+    The arcs of lazy variables are left out, and so are the arcs of domains larger than BULK_DOMAIN.
+
+    Args:
+        csp (CSP.CSP): A CSP solver
+    Returns:
+        (tuple): heads, tails and blockIds (int arrays, the arc (heads[i], tails[i]) has the compatibility block
+            blocks[blockIds[i]]), blocks (bool array (K, D, D), blocks[k][a - x.domMin, b - y.domMin] = True if a of
+            the head x and b of the tail y are compatible, D the largest domain), and the ids of the variables of the
+            arcs left out
+    """
+    import numpy as np
+    if csp.blocks is not None and csp.blocks[0] == (csp.nbVars, csp.nbConstrs):
+        return csp.blocks[1]
+
+    size = max([var.dom_size for var in csp.vars if not var.lazy and var.dom_size <= BULK_DOMAIN], default=1)
+    keys = dict()  # bytes of a compatibility matrix => its block, the != of a coloring share a single one
+    blocks, heads, tails, blockIds, others = [], [], [], [], set()
+    for c in csp.constrs:
+        if not isinstance(c, ConstraintBinary):
+            continue
+        if c.var1.lazy or c.var2.lazy:
+            continue
+        if c.var1.dom_size > BULK_DOMAIN or c.var2.dom_size > BULK_DOMAIN:
+            others.update([c.var1.id, c.var2.id])
+            continue
+        mat = c.compatibility_matrix()
+        for x, y, m in ((c.var1, c.var2, mat), (c.var2, c.var1, mat.T)):
+            key = (m.shape, np.packbits(m).tobytes())
+            if key not in keys:
+                keys[key] = len(blocks)
+                block = np.zeros((size, size), dtype=bool)
+                block[:m.shape[0], :m.shape[1]] = m
+                blocks.append(block)
+            heads.append(x.id)
+            tails.append(y.id)
+            blockIds.append(keys[key])
+
+    arcs = (np.array(heads, dtype=np.int64), np.array(tails, dtype=np.int64), np.array(blockIds, dtype=np.int64),
+            np.array(blocks, dtype=bool).reshape(-1, size, size), sorted(others))
+    csp.blocks = ((csp.nbVars, csp.nbConstrs), arcs)
+    return arcs
+
+
+def supports(blocks, blockIds, tails, masks, arcs):
+    """Returns supported[i][a] = True if the value a of the head of the arc arcs[i] has a support in its tail domain.
+
+    Args:
+        blocks, blockIds, tails: see bulk_arcs
+        masks (numpy.ndarray): masks[y][b - y.domMin] = True if b is in the domain of y
+        arcs (numpy.ndarray): indices of the arcs
+    """
+    import numpy as np
+    keys = blockIds[arcs]
+    size = blocks.shape[1]
+    supported = np.empty((len(arcs), size), dtype=bool)
+    shared, first = np.unique(keys, return_index=True)
+    if len(shared) * 8 < len(arcs):
+        # few distinct blocks : a product (tail domains of the arcs) x block^T for each of them
+        order = np.argsort(keys, kind="stable")
+        bounds = np.searchsorted(keys[order], shared).tolist() + [len(arcs)]
+        for k, start, end in zip(shared.tolist(), bounds[:-1], bounds[1:]):
+            rows = order[start:end]
+            supported[rows] = masks[tails[arcs[rows]]].astype(np.float32) @ blocks[k].T.astype(np.float32) > 0
+    else:
+        step = max(1, BULK_CHUNK // (size * size))
+        for start in range(0, len(arcs), step):
+            part = slice(start, start + step)
+            domains = masks[tails[arcs[part]]].astype(np.float32)[:, :, None]
+            supported[part] = np.matmul(blocks[keys[part]].astype(np.float32), domains)[:, :, 0] > 0
+    return supported
+
+
+_worker_arcs = None
+
+
+def _init_worker(arcs):
+    global _worker_arcs
+    _worker_arcs = arcs
+
+
+def _supports_task(task):
+    """ Worker side : the supports of a batch of arcs, for the given domains. """
+    masks, arcs = task
+    heads, tails, blockIds, blocks, _ = _worker_arcs
+    return supports(blocks, blockIds, tails, masks, arcs)
+
+
+def ac_bulk(csp, level=-1, changed=None, workers=1):
+    """Removes all arc-inconsistent values of a csp, revising all the arcs at once with matrix products
+
+    The domains are boolean masks, each pass computes the supports of all the arcs whose tail domain changed (see
+    supports) and removes the values losing one of them, until no domain changes. The arcs of large domains are then
+    revised by ac3, the arcs of lazy domains are left to the search. With workers > 1, the arcs of each pass are split
+    across a process pool.
+
+    Args:
+        csp (CSP.CSP): A CSP solver
+        level (int): depth level at which arc-consistency is verified in a backtracking tree
+        changed (list of int): if given, only the arcs pointing to these variables are revised first, the domains of
+            the other variables are assumed to be arc-consistent already
+        workers (int): number of processes computing the supports
+    Returns:
+        (bool): False if the problem is found unfeasible, True otherwise.
+            True does not mean that the problem is feasible, just that unfeasibility was not proven yet
+    """
+    import multiprocessing
+    import numpy as np
+    heads, tails, blockIds, blocks, others = bulk_arcs(csp)
+    size = blocks.shape[1]
+    masks = np.zeros((csp.nbVars, size), dtype=bool)
+    varIds = np.unique(np.concatenate([heads, tails]))
+    for varId in varIds.tolist():
+        var = csp.vars[varId]
+        masks[varId, np.array(var.dom(level + 1), dtype=np.int64) - var.domMin] = True
+    initial = masks.copy()
+    active = np.ones(len(heads), dtype=bool) if changed is None else np.isin(tails, changed)
+
+    pool = None
+    if workers > 1 and len(heads) > 0:
+        pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=((heads, tails, blockIds, blocks, others),))
+    try:
+        while active.any():
+            arcs = np.flatnonzero(active)
+            if pool is None:
+                supported = supports(blocks, blockIds, tails, masks, arcs)
+            else:
+                batches = np.array_split(arcs, workers * 4)
+                supported = np.concatenate(pool.map(_supports_task, [(masks, batch) for batch in batches]))
+
+            removed = np.zeros_like(masks)
+            np.logical_or.at(removed, heads[arcs], masks[heads[arcs]] & ~supported)
+            changedVars = removed.any(axis=1)
+            masks &= ~removed
+            if not masks[changedVars].any(axis=1).all():
+                return False
+            active = changedVars[tails]
+    finally:
+        if pool is not None:
+            pool.terminate()
+
+    for varId in np.flatnonzero((initial & ~masks).any(axis=1)).tolist():
+        var = csp.vars[varId]
+        for value in (np.flatnonzero(initial[varId] & ~masks[varId]) + var.domMin).tolist():
+            var.remove_value(value, level + 1)
+
+    if others:
+        return ac3(csp, level, others)
+    return True
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import asyncio
+import time
+from collections import namedtuple
+
+
+# Snapshot of a running search. The best bound of a satisfaction search is the deepest partial assignment reached.
+# isFeasible is only known once the search is done, and not if it was interrupted or timed out before a solution.
+ProgressEvent = namedtuple("ProgressEvent", ["exploredNodes", "depth", "maxDepth", "elapsed", "done", "isFeasible",
+                                             "interrupted"])
+
+
+def _snapshot(csp, begin: float, done: bool):
+    interrupted = done and not csp.isFeasible and (csp.interrupted or csp.timeOut)
+    return ProgressEvent(
+        exploredNodes=csp.exploredNodes,
+        depth=csp.depth,
+        maxDepth=csp.maxDepth,
+        elapsed=round(time.time() - begin, 3),
+        done=done,
+        isFeasible=csp.isFeasible if done and not interrupted else None,
+        interrupted=interrupted
+    )
+
+
+async def solve_events(csp, period: float = 0.1, executor=None):
+    """Solve the CSP in a worker thread and yield its progress.
+
+    The search runs through CSP.solve() in the given executor (the default thread pool of the running loop if None),
+    so the event loop stays free while the tree is explored. If the consuming task is cancelled, the search is
+    interrupted at its next node and the worker is awaited before the cancellation is propagated. csp.interrupted is
+    cleared once the worker is over, the next solves of the CSP are not interrupted.
+
+    Args:
+        csp (CSP.CSP): a CSP solver, parameters already set
+        period (float): seconds between two progress events
+        executor (concurrent.futures.Executor): executor running the search
+
+    Yields:
+        (ProgressEvent): progress of the search, the last event has done=True
+    """
+    loop = asyncio.get_running_loop()
+    csp.interrupted = False
+    begin = time.time()
+    future = loop.run_in_executor(executor, csp.solve)
+
+    try:
+        while not future.done():
+            await asyncio.wait({future}, timeout=period)
+            if not future.done():
+                yield _snapshot(csp, begin, False)
+
+        future.result()  # raise the solver's exception, if any
+        yield _snapshot(csp, begin, True)
+
+    finally:
+        if future.done():
+            csp.interrupted = False
+        else:
+            csp.interrupted = True
+            # cleared once the search is over, even if this task is cancelled again while waiting for it
+            future.add_done_callback(lambda _: setattr(csp, "interrupted", False))
+            await asyncio.shield(future)
+
+
+async def solve_async(csp, on_progress=None, period: float = 0.1, executor=None):
+    """Solve the CSP without blocking the event loop, the search can be stopped with task.cancel().
+
+    Args:
+        csp (CSP.CSP): a CSP solver, parameters already set
+        on_progress (function): called with each ProgressEvent, may be a coroutine function
+        period (float): seconds between two progress events
+        executor (concurrent.futures.Executor): executor running the search
+
+    Returns:
+        (bool): True if the CSP admits at least one feasible solution, False otherwise (see csp.timeOut and the
+            interrupted field of the last event for the searches stopped before their end).
+    """
+    async for event in solve_events(csp, period, executor):
+        if on_progress is not None:
+            ret = on_progress(event)
+            if asyncio.iscoroutine(ret):
+                await ret
+    return csp.isFeasible
@@ -1,11 +1,17 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import itertools
+
 import CSP
 from arc_consistency import ac3, ac4
+from checkpoint import write_checkpoint
 import time
 
 
+CLOCK_PERIOD = 1024  # values tried between two checks of the time limit, a lazy domain may have millions of them
+
+
 def forward_checking(csp: CSP.CSP, level: int, varId, var) -> bool:
     # Forward-checking
     for c in csp.all_associated_constrs(varId):
@@ -14,16 +20,10 @@ def forward_checking(csp: CSP.CSP, level: int, varId, var) -> bool:
     return True
 
 
-def bt(csp: CSP.CSP, varId) -> bool:
-    """ Return True, if the assignment of the given variable leads to a contradiction. """
-    for c in csp.all_associated_assigned_constrs(varId):
-
-        if isinstance(c, CSP.ConstraintBinary):
-            feasible = c.is_feasible([csp.assignments[c.var1.id], csp.assignments[c.var2.id]])
-        else:
-            feasible = c.is_feasible([csp.assignments[var.id] for var in c.vars])
-
-        if not feasible:
+def propagate_n_ary(csp: CSP.CSP, level: int, varId, var) -> bool:
+    # arc consistency only handles binary constraints, the others are propagated as in forward checking
+    for c in csp.graph.nAry[varId]:
+        if not c.propagate_assignment(var, csp.assignments, level):
             return False
     return True
 
@@ -50,28 +50,70 @@ def backtracking(csp: CSP.CSP, level: int) -> bool:
     if csp.nb_assigned == csp.nbVars:
         return True
 
-    if time.time() - csp.start > csp.timeLimit:
+    if csp.interrupted or (csp.parent is not None and csp.parent.interrupted):
+        if csp.param["checkpoint"] is not None:
+            write_checkpoint(csp, level)
+        return False
+
+    now = time.time()
+    if now - csp.start > csp.timeLimit:
         csp.timeOut = True
+        if csp.param["checkpoint"] is not None:
+            write_checkpoint(csp, level)
+        return False
+
+    if csp.param["checkpoint"] is not None and now - csp.lastCheckpoint > csp.param["period"]:
+        write_checkpoint(csp, level)
+
+    if level == csp.cubeDepth:  # cube and conquer : the subtree is solved by a worker
+        csp.cubes.append([var.intervals(level) for var in csp.vars])
         return False
-    
+
     csp.exploredNodes += 1  # arrived at a new node
+    csp.depth = level
+    if level > csp.maxDepth:
+        csp.maxDepth = level
 
     # Propagate domain updates to (potential) children nodes
     for var_to_update in csp.vars:
         var_to_update.current_dom_size[level + 1] = var_to_update.current_dom_size[level]
-
-    # pick up a variable
-    varId = csp.select_unassigned_varId(level)
+    for var_to_update in csp.intervalVars:
+        var_to_update.copy_level(level, level + 1)
+
+    # pick up a variable, the one of the checkpointed branch when resuming
+    replay = csp.resumeStack is not None and level < len(csp.resumeStack)
+    if replay:
+        varId, values_order, first = csp.resumeStack[level]
+    else:
+        csp.resumeStack = None
+        varId = csp.select_unassigned_varId(level)
     var = csp.vars[varId]
     # print("picked var : {}, current domain : {}".format(var.name, var.dom(level)))
     var.level = level
     csp.nb_assigned += 1
+    csp.graph.assign(varId)
 
     # try values affections
-    values_order = csp.select_values(varId, level)
-    for value in values_order:
-        if value not in var.dom(level):  # if the value was removed
+    if not replay:
+        values_order = csp.select_values(varId, level)
+        first = 0
+    decision = csp.decisions[level] = [varId, values_order, first]
+    for index, value in enumerate(itertools.islice(values_order, first, None), first):
+        decision[2] = index
+        if index > first:  # out of the checkpointed branch
+            csp.resumeStack = None
+        if csp.interrupted or csp.timeOut or (csp.parent is not None and csp.parent.interrupted):
+            # stop unwinding without propagating the remaining values
+            break
+        if (index - first) % CLOCK_PERIOD == CLOCK_PERIOD - 1 and time.time() - csp.start > csp.timeLimit:
+            csp.timeOut = True
+            if csp.param["checkpoint"] is not None:
+                write_checkpoint(csp, level + 1)  # the search resumes at this value
+            break
+        if not var.contains(value, level):  # if the value was removed
             continue
+        csp.lastNodeId += 1  # a new branch, the incremental states of the previous value are left (see Trail)
+        csp.nodeIds[level] = csp.lastNodeId
         # print("affecting val{} to {} dom {} ".format(value, var.name, var.dom(level + 1)))
         csp.assignments[varId] = value
         var.remove_all_values_except(value, level + 1)
@@ -79,27 +121,38 @@ def backtracking(csp: CSP.CSP, level: int) -> bool:
         contradiction = False
 
         if csp.param["look-ahead"]["BT"]:
-            contradiction = not bt(csp, varId)
+            contradiction = not csp.checker.assign(varId, value)
         elif csp.param["look-ahead"]["FC"]:
             contradiction = not forward_checking(csp, level, varId, var)
         elif csp.param["look-ahead"]["MAC3"]:
-            contradiction = not ac3(csp, level)
+            contradiction = not (propagate_n_ary(csp, level, varId, var) and ac3(csp, level))
         elif csp.param["look-ahead"]["MAC4"]:
-            contradiction = not ac4(csp, level)
+            contradiction = not (propagate_n_ary(csp, level, varId, var) and ac4(csp, level))
+        elif csp.param["look-ahead"]["ADAPT"]:
+            contradiction = not csp.adaptive.propagate(level, varId, var)
+        elif csp.param["look-ahead"]["ENGINE"]:
+            contradiction = not csp.engine.propagate(level, var)
 
         if not contradiction:
+            if csp.param["phase"]:  # phase saving
+                csp.phaseHint[varId] = value
             if backtracking(csp, level + 1):
                 return True
             # else contradiction found further down the tree, so try another value
             # print("backtracking from value {} for variable {}".format(csp.assignments[varId], var.name))
 
         # A contradiction was found, reset domains and try a different value
+        if csp.param["look-ahead"]["BT"]:
+            csp.checker.unassign(varId, value)
         for var_to_update in csp.vars:
             var_to_update.current_dom_size[level + 1] = var_to_update.current_dom_size[level]
+        for var_to_update in csp.intervalVars:
+            var_to_update.copy_level(level, level + 1)
 
     # All values for selected variable lead to a contradiction, current partial assignment is not feasible
     var.level = -1
     csp.assignments[varId] = None
     csp.nb_assigned -= 1
+    csp.graph.unassign(varId)
 
     return False
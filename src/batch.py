@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import contextlib
+import json
+import os
+import time
+import traceback
+
+
+# A job is a dict, e.g.
+#   {"problem": "coloring", "instance": "../instances/myciel3.col", "colors": 4, "settings": ["AC4", "FC"]}
+#   {"problem": "nqueens", "N": 12, "settings": ["FC"], "variable": 1, "value": 1, "timeLimit": 60}
+#   {"problem": "xcsp", "instance": "model.xml", "settings": ["FC"]}
+# "settings", "variable", "value", "timeLimit", "cache" (and "preprocess" for coloring, "checkpoint" for xcsp) are
+# optional and default to the solve functions' ones. An xcsp job with a checkpoint file resumes its search when the
+# batch is rerun, the jobs with a cache file (see result_cache.py) reuse the outcomes of the models solved before.
+
+GRACE = 10  # seconds given to a job after its time limit before its process is killed
+
+
+def job_key(job: dict) -> str:
+    """ Return an identifier of the job, independent of the keys order. """
+    import hashlib
+    return hashlib.sha1(json.dumps(job, sort_keys=True).encode()).hexdigest()
+
+
+def read_manifest(path: str):
+    """ Return the list of jobs described in a JSONL manifest, one job per line. """
+    if not os.path.exists(path): raise Exception("The manifest {} doesn't exist !".format(path))
+    with open(path, 'r') as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def write_manifest(jobs, path: str):
+    with open(path, 'w') as file:
+        for job in jobs:
+            file.write(json.dumps(job) + "\n")
+
+
+def read_results(path: str):
+    """ Lazily iterate over the records of a JSONL results file, ignoring a truncated last line. """
+    if not os.path.exists(path):
+        return
+    with open(path, 'r') as file:
+        for line in file:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def completed_keys(path: str):
+    """ Return the keys of the jobs already recorded in the results file, failed jobs excepted. """
+    return {record["key"] for record in read_results(path) if record["status"] != "error"}
+
+
+def solve_function(problem: str):
+    """ Import the modules solving the given problem and return its solve function. """
+    if problem == "coloring":
+        from coloring import solve_coloring
+        return solve_coloring
+    if problem == "nqueens":
+        from n_queens import solve_nqueens
+        return solve_nqueens
+    if problem == "xcsp":
+        from xcsp import solve_xcsp
+        return solve_xcsp
+    raise ValueError("Unknown problem {}.".format(problem))
+
+
+def run_job(job: dict) -> dict:
+    """ Solve one job in the current process and return its statistics, with the time spent importing the solver. """
+    timeLimit = job.get("timeLimit", 300)
+    varOpt = job.get("variable", 1)
+    valOpt = job.get("value", 1)
+
+    start = time.perf_counter()
+    solve = solve_function(job["problem"])
+    importTime = time.perf_counter() - start
+
+    if job["problem"] == "coloring":
+        nodes, edges, isFeasible, exploredNodes, exploreTime, timeOut = solve(
+            job["instance"], job["colors"], job.get("settings"), varOpt, valOpt, timeLimit, job.get("preprocess", True),
+            job.get("cache")
+        )
+        result = {"nodes": nodes, "edges": edges}
+    elif job["problem"] == "nqueens":
+        exploredNodes, exploreTime, isFeasible, timeOut = solve(
+            job["N"], job.get("settings"), varOpt, valOpt, timeLimit, job.get("cache")
+        )
+        result = {}
+    else:
+        csp = solve(job["instance"], job.get("settings"), varOpt, valOpt, timeLimit, job.get("checkpoint"),
+                    job.get("cache"))
+        exploredNodes, exploreTime, isFeasible, timeOut = csp.exploredNodes, csp.exploreTime, csp.isFeasible, csp.timeOut
+        result = {"variables": csp.nbVars, "constraints": csp.nbConstrs}
+        if csp.propagationStats is not None:
+            result["propagation"] = csp.propagationStats
+
+    if isFeasible:
+        status = "solved"
+    elif timeOut:
+        status = "timeout"
+    else:
+        status = "infeasible"
+    result.update({
+        "status": status, "isFeasible": isFeasible, "timeOut": timeOut,
+        "exploredNodes": exploredNodes, "exploreTime": exploreTime, "importTime": round(importTime, 4)
+    })
+    return result
+
+
+def _worker(job: dict, conn):
+    """ Process entry point: run the job quietly and send back its result, or the error raised. """
+    try:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            result = run_job(job)
+    except Exception:
+        result = {"status": "error", "error": traceback.format_exc()}
+    conn.send(result)
+    conn.close()
+
+
+def run_batch(jobs, results_path: str, workers=None, timeout=None):
+    """Solve the jobs in parallel processes and append each result to a JSONL file as soon as it is known.
+
+    Every job runs in its own process, so that a crash or a hang only loses that job. Jobs already recorded in
+    results_path are skipped, hence an interrupted batch is resumed by running it again.
+
+    Args:
+        jobs (list of dict): jobs to solve
+        results_path (str): JSONL file the results are appended to
+        workers (int): number of jobs solved at the same time, the number of CPUs if None
+        timeout (float): default time limit (s) of the jobs without "timeLimit"
+
+    Returns:
+        (int): number of jobs solved during this run
+    """
+    import multiprocessing
+    from multiprocessing.connection import wait
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    done = completed_keys(results_path)
+    pending = []
+    for job in jobs:
+        if timeout is not None and "timeLimit" not in job:
+            job = dict(job, timeLimit=timeout)
+        key = job_key(job)
+        if key not in done:
+            done.add(key)  # duplicated jobs are solved once
+            pending.append((key, job))
+    pending.reverse()
+
+    running = dict()  # sentinel => (key, job, process, connection, start)
+    nbSolved = 0
+
+    with open(results_path, 'a') as output:
+        while pending or running:
+            while pending and len(running) < workers:
+                key, job = pending.pop()
+                recv, send = multiprocessing.Pipe(duplex=False)
+                process = multiprocessing.Process(target=_worker, args=(job, send), daemon=True)
+                process.start()
+                send.close()
+                running[process.sentinel] = (key, job, process, recv, time.time())
+
+            wait(list(running.keys()), timeout=1)
+
+            for sentinel in list(running.keys()):
+                key, job, process, recv, start = running[sentinel]
+                elapsed = time.time() - start
+                result = None
+
+                if recv.poll():
+                    try:
+                        result = recv.recv()
+                    except EOFError:
+                        result = {"status": "error", "error": "Worker exited with code {}".format(process.exitcode)}
+                elif not process.is_alive():
+                    result = {"status": "error", "error": "Worker exited with code {}".format(process.exitcode)}
+                elif elapsed > job.get("timeLimit", 300) + GRACE:
+                    process.kill()
+                    result = {"status": "timeout", "isFeasible": False, "timeOut": True}
+                if result is None:
+                    continue
+
+                process.join()
+                recv.close()
+                del running[sentinel]
+
+                record = {"key": key, "job": job, "wallTime": round(elapsed, 3)}
+                record.update(result)
+                output.write(json.dumps(record) + "\n")
+                output.flush()
+                nbSolved += 1
+                print("[{}/{}] {} : {}".format(nbSolved, nbSolved + len(pending) + len(running),
+                                               _job_name(job), record["status"]))
+
+    return nbSolved
+
+
+def run_series(series, results_path: str, workers=1):
+    """Solve series of jobs of increasing difficulty, appending each result to a JSONL file as soon as it is known.
+
+    The series are solved in waves, the i-th jobs of all the series still running (workers at most at the same time).
+    A series stops at its first job not solved, e.g. the larger N-Queens are not tried once a method timed out. As in
+    run_batch, the jobs already recorded are skipped : a benchmark interrupted is resumed by running it again.
+
+    Args:
+        series (list of list of dict): jobs of each series, in the order they are solved
+        results_path (str): JSONL file the results are appended to
+        workers (int): number of jobs solved at the same time, 1 so that the times are not biased by each other
+
+    Returns:
+        (int): number of jobs solved during this run
+    """
+    nbSolved = 0
+    running = [jobs for jobs in series if jobs]
+    i = 0
+    while running:
+        nbSolved += run_batch([jobs[i] for jobs in running], results_path, workers)
+        status = {record["key"]: record["status"] for record in read_results(results_path)}  # the last ones win
+        running = [jobs for jobs in running if status.get(job_key(jobs[i])) == "solved" and i + 1 < len(jobs)]
+        i += 1
+    return nbSolved
+
+
+def _job_name(job: dict) -> str:
+    if job["problem"] == "coloring":
+        return "{} with {} colors".format(os.path.basename(job["instance"]), job["colors"])
+    if job["problem"] == "xcsp":
+        return os.path.basename(job["instance"])
+    return "{}-Queens".format(job.get("N"))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Solve the jobs of a JSONL manifest in a process pool.")
+    parser.add_argument("manifest")
+    parser.add_argument("results")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=None)
+    args = parser.parse_args()
+
+    run_batch(read_manifest(args.manifest), args.results, args.workers, args.timeout)
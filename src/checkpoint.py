@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import pickle
+import random
+import time
+
+
+VERSION = 2
+
+
+def _flatten(lists):
+    """ Pack a list of int lists into one array of values and the offsets of each list. """
+    import numpy as np
+    offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(values) for values in lists])
+    values = np.fromiter((v for values in lists for v in values), dtype=np.int64, count=int(offsets[-1]))
+    return values, offsets
+
+
+def _unflatten(values, offsets):
+    values = values.tolist()
+    return [values[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+
+def write_checkpoint(csp, level: int):
+    """Write the search frontier of csp to the file csp.param["checkpoint"], when the search is at a node of level.
+
+    The file holds the decisions of the current branch (the variable of each level, its values order and the index of
+    the value explored), the root domains as intervals, the counters and the states of the random generators. The
+    nodes below the branch are rebuilt by propagating the decisions again (see resume_state). It is replaced
+    atomically, a search killed while writing keeps the previous checkpoint.
+    """
+    import numpy as np
+    path = csp.param["checkpoint"]
+    decisions = csp.decisions[:level]
+    domains, domainOffsets = _flatten([[bound for interval in var.intervals(0) for bound in interval]
+                                       for var in csp.vars])
+    state = {
+        "version": VERSION,
+        "model": (csp.nbVars, csp.nbConstrs),
+        "variables": np.array([varId for varId, _, _ in decisions], dtype=np.int32),
+        "indices": np.array([index for _, _, index in decisions], dtype=np.int32),
+        "orders": [values for _, values, _ in decisions],  # lists, or ranges for the lazy domains
+        "domains": (domains, domainOffsets),
+        "phaseHint": csp.phaseHint,
+        "exploredNodes": csp.exploredNodes,
+        "maxDepth": csp.maxDepth,
+        "elapsed": time.time() - csp.start,
+        "random": random.getstate(),
+        "numpy": np.random.get_state(),
+    }
+
+    with open(path + ".tmp", 'wb') as file:
+        pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(path + ".tmp", path)
+    csp.lastCheckpoint = time.time()
+
+
+def load_checkpoint(csp, path: str) -> dict:
+    """ Read a checkpoint written by write_checkpoint for the same model as csp. """
+    with open(path, 'rb') as file:
+        state = pickle.load(file)
+    if state.get("version") != VERSION:
+        raise ValueError("Checkpoint {} has version {}, expected {}".format(path, state.get("version"), VERSION))
+    if state["model"] != (csp.nbVars, csp.nbConstrs):
+        raise ValueError("Checkpoint {} was written for {} variables and {} constraints, not {} and {}".format(
+            path, *state["model"], csp.nbVars, csp.nbConstrs
+        ))
+    return state
+
+
+def restore_domains(csp, state: dict):
+    """ Make the root domains of the checkpoint the root domains of csp. """
+    csp.set_root_domains([list(zip(bounds[0::2], bounds[1::2])) for bounds in _unflatten(*state["domains"])])
+
+
+def resume_state(csp, state: dict):
+    """ Restore the counters and the random generators, and the decisions the search replays before going on. """
+    import numpy as np
+    csp.phaseHint = state["phaseHint"]
+    csp.exploredNodes = state["exploredNodes"]
+    csp.maxDepth = state["maxDepth"]
+    csp.start = time.time() - state["elapsed"]
+    random.setstate(state["random"])
+    np.random.set_state(state["numpy"])
+
+    csp.resumeStack = list(zip(state["variables"].tolist(), state["orders"], state["indices"].tolist()))
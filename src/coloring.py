@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 from CSP import *
+from coloring_preprocess import adjacency, greedy_clique, peel, reinsert
 import os
 
 
@@ -40,35 +41,59 @@ def verification(assignment, matrix) -> bool:
     return True
 
 
-def solve_coloring(path: str, colors):
-    """ Solve the (simple undirected) graph coloring problem with a default given chromatic number. """
+def solve_coloring(path: str, colors, settings=None, varOpt=1, valOpt=1, timeLimit=300, preprocess=True, cache=None):
+    """ Solve the (simple undirected) graph coloring problem with a default given chromatic number.
+
+    With preprocess, the vertices with less than colors neighbours are peeled off and colored greedily after the
+    search, and a clique found by a greedy heuristic gives a lower bound (the instance is infeasible if the clique
+    is larger than colors) and the fixed colors of its vertices. With a cache file, the result of the search is looked
+    up in (and stored to) this result cache.
+    """
     matrix, nodes, edges = lecture(path)
 
     # if upperB == 0:
     #     upperB = max(list(map(sum, matrix))) + 1  # set upper bound as the maximum degree + 1
 
+    adj = adjacency(matrix)
+    core, peeled, clique = list(range(nodes)), [], []
+    if preprocess:
+        clique = greedy_clique(adj)
+        print("Clique of size {} found.".format(len(clique)))
+        if len(clique) > colors:
+            print("Sol is feasible ? False (the graph contains a clique larger than {})".format(colors))
+            return nodes, edges, False, 0, 0, False
+        core, peeled = peel(adj, colors)
+        print("{} vertices peeled off, {} left to search.".format(len(peeled), len(core)))
+
     # mobilization
     csp_solver = CSP()
 
-    # variables
-    x = []
-    for i in range(nodes):
-        x.append(csp_solver.add_variable("x{}".format(i), 1, colors))
+    # variables, the vertices of the clique are given distinct colors to break the symmetries
+    fixed = {u: c + 1 for c, u in enumerate(clique)}
+    x = dict()
+    for u in core:
+        if u in fixed:
+            x[u] = csp_solver.add_variable("x{}".format(u), fixed[u], fixed[u])
+        else:
+            x[u] = csp_solver.add_variable("x{}".format(u), 1, colors)
 
     # constraints
-    for u in range(nodes-1):
-        for v in range(u+1, nodes):
-            if matrix[u][v]:  # if u, v are adjacent
+    for u in core:
+        for v in adj[u]:
+            if u < v and v in x:  # if u, v are adjacent
                 csp_solver.add_constraint(x[u] != x[v])
 
     # parameters setting
-    # csp_solver.set_AC3()
-    # csp_solver.set_BT()
-    csp_solver.set_AC4()
-    csp_solver.set_FC()
+    # by default, we use forward checking after a root AC4
+    if settings is None:
+        settings = ["AC4", "FC"]
+    csp_solver.set_parameters(settings)
 
-    csp_solver.set_variable_selection(1)
-    csp_solver.set_value_selection(1)
+    csp_solver.set_variable_selection(varOpt)
+    csp_solver.set_value_selection(valOpt)
+    csp_solver.timeLimit = timeLimit
+    if cache is not None:
+        csp_solver.set_result_cache(cache)
 
     # solve
     isFeasible = csp_solver.solve()
@@ -77,13 +102,22 @@ def solve_coloring(path: str, colors):
     print("Total {}s used in the tree exploration.".format(csp_solver.exploreTime))
     print("Sol is feasible ? {}".format(csp_solver.isFeasible))
 
-    if isFeasible != verification(csp_solver.assignments, matrix):
+    assignment = [None for _ in range(nodes)]
+    if isFeasible:
+        for u in core:
+            assignment[u] = csp_solver.assignments[x[u].id]
+        reinsert(adj, peeled, assignment, colors)
+
+    if isFeasible != verification(assignment, matrix):
         isFeasible = False
         print("The solution found by Solver is not valid ! ")
     return nodes, edges, isFeasible, csp_solver.exploredNodes, csp_solver.exploreTime, csp_solver.timeOut
 
 
 if __name__ == "__main__":
+    from batch import run_batch
+    from report import write_coloring_table
+
     chromaticsKnown = {"myciel3.col": 4, "myciel3.col": 3, "myciel4.col": 5, "myciel4.col": 4
     , "myciel5.col": 6, "myciel6.col": 7, "myciel7.col": 8,
         "anna.col" : 11, "david.col": 11, "homer.col": 13, "le450_15b.col": 15, "huck.col": 11, "jean.col": 10,
@@ -92,56 +126,8 @@ if __name__ == "__main__":
         "miles1000.col": 42}
 
     directory = "../instances/"
+    jobs = [{"problem": "coloring", "instance": directory + instance, "colors": colors}
+            for instance, colors in chromaticsKnown.items()]
 
-    with open('../results/Coloring.tex', 'w') as f:
-        latex = r"""\documentclass{article}
-
-\usepackage[french]{babel}
-\usepackage [utf8] {inputenc} % utf-8 / latin1
-\usepackage{multicol}
-
-\setlength{\hoffset}{-18pt}
-\setlength{\oddsidemargin}{0pt} % Marge gauche sur pages impaires
-\setlength{\evensidemargin}{9pt} % Marge gauche sur pages paires
-\setlength{\marginparwidth}{54pt} % Largeur de note dans la marge
-\setlength{\textwidth}{481pt} % Largeur de la zone de texte (17cm)
-\setlength{\voffset}{-18pt} % Bon pour DOS
-\setlength{\marginparsep}{7pt} % Séparation de la marge
-\setlength{\topmargin}{0pt} % Pas de marge en haut
-\setlength{\headheight}{13pt} % Haut de page
-\setlength{\headsep}{10pt} % Entre le haut de page et le texte
-\setlength{\footskip}{27pt} % Bas de page + séparation
-\setlength{\textheight}{668pt} % Hauteur de la zone de texte (25cm)
-
-\begin{document}
-\begin{center}
-\renewcommand{\arraystretch}{1.4}
- \begin{tabular}{lcccccc}
-	\hline
-\textbf{Instance}  & \textbf{vertices} & \textbf{edges}  & \textbf{Chromatic Number} & \textbf{Feasible?} & \textbf{Time(s)} & \textbf{Explored Nodes} \\\hline
-
-"""
-        f.write(latex)
-
-        for instance in chromaticsKnown.items():
-            nodes, edges, isFeasible, exploredNodes, exploreTime, timeOut = solve_coloring(directory + instance[0], instance[1])
-            f.write(r"{} & {} & {} & {} & ".format(instance[0], nodes, edges, instance[1]))
-            if isFeasible:
-                f.write("Y & ")
-            elif timeOut:
-                f.write("TO & ")
-            else:
-                f.write("N & ")
-            f.write("{} & {} \\\\ \n".format(exploreTime, exploredNodes))
-        
-        latex = r"""
-\\
-\hline\end{tabular}
-\end{center}
-
-
-\end{document}"""
-        f.write(latex)
-
-    
-
+    run_batch(jobs, '../results/Coloring.jsonl')
+    write_coloring_table('../results/Coloring.jsonl', '../results/Coloring.tex')
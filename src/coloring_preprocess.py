@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+def adjacency(matrix):
+    """ Return the adjacency lists of the graph given by its incidence matrix. """
+    return [[v for v in range(len(matrix)) if matrix[u][v]] for u in range(len(matrix))]
+
+
+def greedy_clique(adj):
+    """Find a large clique of the graph with a greedy heuristic.
+
+    From every vertex, the clique is extended with the candidate (a vertex adjacent to the whole clique) having the
+    most neighbours among the other candidates, until no candidate is left. The largest clique found is returned.
+
+    Args:
+        adj (list of list): adjacency lists of the graph
+
+    Returns:
+        (list): vertices of the clique
+    """
+    neighbors = [set(l) for l in adj]
+    best = []
+    for start in sorted(range(len(adj)), key=lambda u: len(adj[u]), reverse=True):
+        if len(adj[start]) < len(best):  # cannot lead to a larger clique
+            break
+        clique = [start]
+        candidates = set(neighbors[start])
+        while candidates:
+            u = max(candidates, key=lambda w: len(neighbors[w] & candidates))
+            clique.append(u)
+            candidates &= neighbors[u]
+        if len(clique) > len(best):
+            best = clique
+    return best
+
+
+def peel(adj, colors: int):
+    """Remove repeatedly the vertices with less than colors neighbours left, they can always be colored last.
+
+    Args:
+        adj (list of list): adjacency lists of the graph
+        colors (int): number of colors
+
+    Returns:
+        (list, list): vertices left (the core of the graph), and removed vertices in order of removal
+    """
+    degree = [len(l) for l in adj]
+    removed = [False] * len(adj)
+    order = []
+    stack = [u for u in range(len(adj)) if degree[u] < colors]
+    for u in stack:
+        removed[u] = True
+    while stack:
+        u = stack.pop()
+        order.append(u)
+        for v in adj[u]:
+            degree[v] -= 1
+            if not removed[v] and degree[v] < colors:
+                removed[v] = True
+                stack.append(v)
+    return [u for u in range(len(adj)) if not removed[u]], order
+
+
+def reinsert(adj, order, assignment, colors: int):
+    """Color the peeled vertices greedily, in reverse order of removal.
+
+    Each vertex had less than colors neighbours when it was removed, and only those are colored before it.
+
+    Args:
+        adj (list of list): adjacency lists of the graph
+        order (list): removed vertices in order of removal
+        assignment (list): colors of the core vertices, None for the removed ones (updated)
+        colors (int): number of colors
+    """
+    for u in reversed(order):
+        used = {assignment[v] for v in adj[u]}
+        assignment[u] = next(c for c in range(1, colors + 1) if c not in used)
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from Constraint import Constraint, VALUE, GLOBAL
+from reversible import Trail
+import Variable
+
+
+class ReversibleSparseBitSet(object):
+    """ Set of tuple indices stored as 64 bits words, restored when the search goes back up the tree.
+
+    index[:limit] are the indices of the non-zero words. Every modification is recorded on an undo log, restore(mark)
+    undoes the modifications made since mark() was called.
+    """
+
+    def __init__(self, nbBits: int):
+        nbWords = (nbBits + 63) // 64
+        self.words = np.full(nbWords, np.iinfo(np.uint64).max, dtype=np.uint64)
+        if nbBits % 64:
+            self.words[-1] = np.uint64((1 << (nbBits % 64)) - 1)
+        self.index = np.arange(nbWords)
+        self.limit = nbWords
+        self.trail = []  # (ids of the modified words, their old values, old limit)
+
+    def is_empty(self) -> bool:
+        return self.limit == 0
+
+    def mark(self) -> int:
+        return len(self.trail)
+
+    def restore(self, mark: int):
+        while len(self.trail) > mark:
+            ids, old, limit = self.trail.pop()
+            self.words[ids] = old
+            self.limit = limit
+
+    def intersect_with(self, mask):
+        """ Keep only the bits of the words also in mask. """
+        active = self.index[:self.limit]
+        old = self.words[active]
+        new = old & mask[active]
+        changed = new != old
+        if not changed.any():
+            return
+        self.trail.append((active[changed], old[changed], self.limit))
+        self.words[active] = new
+        nonzero = new != 0
+        self.index[:self.limit] = np.concatenate([active[nonzero], active[~nonzero]])
+        self.limit = int(np.count_nonzero(nonzero))
+
+    def intersect_index(self, mask) -> int:
+        """ Return the index of a word sharing a bit with mask, -1 if none. """
+        active = self.index[:self.limit]
+        hits = np.flatnonzero(self.words[active] & mask[active])
+        return int(active[hits[0]]) if len(hits) else -1
+
+
+class ConstraintTable(Constraint):
+    """ n-ary extensional constraint filtered to generalized arc consistency with the Compact-Table algorithm. """
+    EVENT = VALUE
+    PRIORITY = GLOBAL
+    IDEMPOTENT = True  # the values removed have no tuple left in the current table
+
+    def __init__(self, id: int, vars, table):
+        """Initializes a constraint from its allowed tuples.
+
+        Args:
+            id (int): id of the constraint, should be unique inside a CSP
+            vars (list of variable.Variable): variables of the constraint
+            table (numpy.ndarray): allowed tuples, one row per tuple and one column per variable. Tuples with a value
+                out of the initial domains are ignored.
+        """
+        super().__init__(id)
+        self.vars = vars
+        self.vars_ids = dict.fromkeys([var.id for var in vars])
+
+        table = np.asarray(table, dtype=np.int64).reshape(-1, len(vars))
+        valid = np.ones(len(table), dtype=bool)
+        for i, var in enumerate(vars):
+            valid &= (table[:, i] >= var.domMin) & (table[:, i] <= var.domMax)
+        self.table = table[valid]
+        self.tuples = None  # set of allowed tuples, built on the first feasibility check
+
+        # supports[i][a - domMin] = bitset of the tuples with value a for the i-th variable
+        nbTuples = len(self.table)
+        nbWords = max((nbTuples + 63) // 64, 1)
+        rows = np.arange(nbTuples)
+        bits = np.left_shift(np.uint64(1), (rows % 64).astype(np.uint64))
+        self.supports = []
+        for i, var in enumerate(vars):
+            support = np.zeros((var.dom_size, nbWords), dtype=np.uint64)
+            np.bitwise_or.at(support, (self.table[:, i] - var.domMin, rows // 64), bits)
+            self.supports.append(support)
+
+        self.currTable = ReversibleSparseBitSet(nbTuples)
+        self.residues = [np.zeros(var.dom_size, dtype=np.int64) for var in vars]
+        self.lastSize = [var.dom_size for var in vars]  # domain sizes the current table was computed with
+        self.trail = Trail()
+        self.trail.register(self.currTable)
+
+    def __repr__(self):
+        return "constraint {0} : table ({1}) of {2} tuples".format(
+            self.id, [var.name for var in self.vars], len(self.table)
+        )
+
+    def contains_var(self, varId: int):
+        return varId in self.vars_ids
+
+    def scope(self):
+        return self.vars
+
+    def copy_with(self, vars: dict):
+        return ConstraintTable(self.id, [vars[var.id] for var in self.vars], self.table)
+
+    def is_assigned(self, assignments):
+        for varId in self.vars_ids:
+            if assignments[varId] is None:
+                return False
+        return True
+
+    def is_feasible(self, values):
+        if len(self.vars) != len(values):
+            raise ValueError("{} variables but {} values given".format(len(self.vars), len(values)))
+        if self.tuples is None:
+            self.tuples = set(map(tuple, self.table.tolist()))
+        return tuple(values) in self.tuples
+
+    def signature(self):
+        # the allowed tuples, without duplicates and sorted, are summed up by their digest
+        import hashlib
+        rows = np.unique(self.table, axis=0) if len(self.table) else self.table
+        return "table", [var.id for var in self.vars], len(rows), hashlib.sha1(rows.tobytes()).hexdigest()
+
+    def is_feasible_batch(self, values: list):
+        # intersection of the bitsets of the tuples supporting each value, the values out of the domains have none
+        if len(self.vars) != len(values):
+            raise ValueError("{} variables but {} values given".format(len(self.vars), len(values)))
+        columns = np.broadcast_arrays(*[np.asarray(column) for column in values])
+        inside = np.ones(columns[0].shape, dtype=bool)
+        common = None
+        for var, support, column in zip(self.vars, self.supports, columns):
+            inside &= (column >= var.domMin) & (column <= var.domMax)
+            words = support[np.clip(column - var.domMin, 0, var.dom_size - 1)]
+            common = words if common is None else common & words
+        return inside & (common != 0).any(axis=-1)
+
+    def attach(self, csp):
+        self.trail.attach(csp)
+
+    def __update_table(self, level: int) -> bool:
+        """ Remove from the current table the tuples with a value removed since the last call. """
+        for i, var in enumerate(self.vars):
+            size = var.current_dom_size[level + 1]
+            if size == self.lastSize[i]:
+                continue
+
+            # removed values are swapped at the end of the domain, after the current size
+            removed = [] if var.lazy else np.array(var._dom[size:self.lastSize[i]], dtype=np.int64) - var.domMin
+            if 0 < len(removed) < size:
+                mask = ~np.bitwise_or.reduce(self.supports[i][removed], axis=0)
+            else:
+                kept = np.array(var.dom(level + 1), dtype=np.int64) - var.domMin
+                mask = np.bitwise_or.reduce(self.supports[i][kept], axis=0)
+            self.currTable.intersect_with(mask)
+            self.trail.set(self.lastSize, i, size)
+
+            if self.currTable.is_empty():
+                return False
+        return True
+
+    def __filter_domains(self, level: int) -> bool:
+        """ Remove the values without support in the current table. """
+        words = self.currTable.words
+        for i, var in enumerate(self.vars):
+            if var.current_dom_size[level + 1] <= 1:  # an assigned variable is supported by a non-empty table
+                continue
+            supports = self.supports[i]
+            residues = self.residues[i]
+            for value in var.dom(level + 1):
+                a = value - var.domMin
+                if words[residues[a]] & supports[a][residues[a]]:
+                    continue
+                index = self.currTable.intersect_index(supports[a])
+                if index >= 0:
+                    residues[a] = index
+                else:
+                    var.remove_value(value, level + 1)
+                    if var.current_dom_size[level + 1] == 0:
+                        return False
+            self.trail.set(self.lastSize, i, var.current_dom_size[level + 1])
+        return True
+
+    def propagate_assignment(self, assigned_var: Variable.Variable, assignments: list, level: int):
+        if assignments[assigned_var.id] is None:
+            raise ValueError("Variable {} should have an assigned value".format(assigned_var.name))
+
+        self.trail.sync(level)
+        return self.__update_table(level) and self.__filter_domains(level)
+
+    def propagate(self, level: int, changed: list):
+        self.trail.sync(level)
+        return self.__update_table(level) and self.__filter_domains(level)
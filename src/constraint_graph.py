@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import bisect
+
+from Constraint import ConstraintBinary
+
+
+class ConstraintGraph(object):
+    """ Sparse index of the constraint graph of a CSP, built once before the search.
+
+    Two variables are adjacent if they are linked by a binary constraint (all diff and other n-ary constraints are only
+    listed in the per-variable constraint lists, to keep the adjacency in O(n + e)). The adjacency is stored in CSR
+    format : the neighbours of variable v are indices[indptr[v]:indptr[v + 1]], plus overflow[v] for the ones added
+    since the CSR was built (see compact). The degrees count the other variables of the n-ary constraints too.
+    """
+
+    def __init__(self, csp):
+        """Build the index of the given CSP.
+
+        Args:
+            csp (CSP.CSP): A CSP solver
+        """
+        self.nbVars = csp.nbVars
+        self.constrs = [list() for _ in range(csp.nbVars)]  # constrs[v] = all constraints containing v
+        self.nAry = [list() for _ in range(csp.nbVars)]  # nAry[v] = the constraints containing v not binary
+
+        heads, tails = [], []
+        for c in csp.constrs:
+            if isinstance(c, ConstraintBinary):
+                self.constrs[c.var1.id].append(c)
+                self.constrs[c.var2.id].append(c)
+                heads.append(c.var1.id)
+                tails.append(c.var2.id)
+            else:
+                for var in c.vars:
+                    self.constrs[var.id].append(c)
+                    self.nAry[var.id].append(c)
+
+        self.__build_csr(heads, tails)
+        self.degree = [self.indptr[v + 1] - self.indptr[v] for v in range(self.nbVars)]  # number of neighbours
+        for v in range(self.nbVars):
+            self.degree[v] += sum(len(c.vars) - 1 for c in self.nAry[v])
+        self.futureDegree = self.degree[:]  # number of unassigned neighbours of each variable
+        self.overflow = [list() for _ in range(self.nbVars)]  # overflow[v] = neighbours of v not in the CSR yet
+        self.nbOverflow = 0
+        self.__neighbors = [self.indices[self.indptr[v]:self.indptr[v + 1]] for v in range(self.nbVars)]
+
+    def __build_csr(self, heads, tails):
+        # each directed edge (u, v) is encoded as u * n + v, so that sorting groups the edges by their first variable
+        # (lists rather than numpy arrays, so that building the index of a small model doesn't load numpy)
+        n = max(self.nbVars, 1)
+        edges = sorted({u * n + v for u, v in zip(heads + tails, tails + heads)})
+
+        self.indices = [edge % n for edge in edges]
+        self.indptr = [0] * (self.nbVars + 1)
+        for edge in edges:
+            self.indptr[edge // n + 1] += 1
+        for v in range(self.nbVars):
+            self.indptr[v + 1] += self.indptr[v]
+
+    def add_constraint(self, c):
+        """ Index a constraint added after the graph was built, its edge goes to the overflow lists. """
+        if not isinstance(c, ConstraintBinary):
+            for var in c.vars:
+                self.constrs[var.id].append(c)
+                self.nAry[var.id].append(c)
+                self.degree[var.id] += len(c.vars) - 1
+                self.futureDegree[var.id] += len(c.vars) - 1
+            return
+
+        self.constrs[c.var1.id].append(c)
+        self.constrs[c.var2.id].append(c)
+        u, v = c.var1.id, c.var2.id
+        if u == v or v in self.overflow[u]:
+            return
+        start, end = self.indptr[u], self.indptr[u + 1]
+        i = bisect.bisect_left(self.indices, v, start, end)  # the rows of the CSR are sorted
+        if i < end and self.indices[i] == v:
+            return
+        for x, y in ((u, v), (v, u)):
+            self.overflow[x].append(y)
+            self.__neighbors[x].append(y)
+            self.degree[x] += 1
+            self.futureDegree[x] += 1
+        self.nbOverflow += 1
+
+    def compact(self):
+        """ Merge the overflow lists into the CSR, once per solve rather than once per added constraint. """
+        if self.nbOverflow == 0:
+            return
+        heads = [x for x in range(self.nbVars) for _ in range(self.indptr[x + 1] - self.indptr[x])]
+        tails = self.indices[:]
+        for x in range(self.nbVars):
+            heads += [x] * len(self.overflow[x])
+            tails += self.overflow[x]
+            self.overflow[x] = []
+        self.__build_csr(heads, tails)
+        self.nbOverflow = 0
+        self.__neighbors = [self.indices[self.indptr[v]:self.indptr[v + 1]] for v in range(self.nbVars)]
+
+    def reset_future_degree(self):
+        """ Reset the future degrees, all variables being unassigned. """
+        self.futureDegree = self.degree[:]
+
+    def neighbors(self, varId: int):
+        """ Return the ids of the variables linked to the given one by a binary constraint. """
+        return self.__neighbors[varId]
+
+    def assign(self, varId: int):
+        """ Update the future degrees after the given variable was assigned. """
+        for n in self.__neighbors[varId]:
+            self.futureDegree[n] -= 1
+        for c in self.nAry[varId]:
+            for var in c.vars:
+                self.futureDegree[var.id] -= 1
+            self.futureDegree[varId] += 1
+
+    def unassign(self, varId: int):
+        """ Update the future degrees after the given variable was unassigned. """
+        for n in self.__neighbors[varId]:
+            self.futureDegree[n] += 1
+        for c in self.nAry[varId]:
+            for var in c.vars:
+                self.futureDegree[var.id] += 1
+            self.futureDegree[varId] -= 1
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import multiprocessing
+import time
+
+
+def components(csp):
+    """Split the variables of a csp into the connected components of its constraint graph.
+
+    Args:
+        csp (CSP.CSP): A CSP solver
+
+    Returns:
+        (list of list): ids of the variables of each component, and (list of list) the constraints of each component
+    """
+    parent = list(range(csp.nbVars))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for c in csp.constrs:
+        scope = c.scope()
+        root = find(scope[0].id)
+        for var in scope[1:]:
+            other = find(var.id)
+            if other != root:
+                parent[other] = root
+
+    index = dict()  # root => component index
+    varIds, constrs = [], []
+    for varId in range(csp.nbVars):
+        root = find(varId)
+        if root not in index:
+            index[root] = len(varIds)
+            varIds.append([])
+            constrs.append([])
+        varIds[index[root]].append(varId)
+    for c in csp.constrs:
+        constrs[index[find(c.scope()[0].id)]].append(c)
+    return varIds, constrs
+
+
+def sub_problem(csp, varIds, constrs):
+    """ Build the CSP of one component, with the root domains, parameters and phase hint of the whole csp. """
+    from CSP import CSP  # to avoid circular imports
+
+    sub = CSP()
+    vars = dict()  # id in csp => variable of sub
+    for varId in varIds:
+        var = csp.vars[varId]
+        vars[varId] = sub.add_variable(var.name, var.domMin, var.domMax, var.lazy)
+    for c in constrs:
+        sub.add_constraint(c.copy_with(vars))
+
+    sub.param = {key: (value.copy() if isinstance(value, dict) else value) for key, value in csp.param.items()}
+    sub.param["decompose"] = False
+    sub.param["workers"] = 1
+    sub.param["checkpoint"] = None
+    sub.timeLimit = csp.timeLimit
+
+    if csp.compiled:  # keep the values removed from the root domains
+        for varId in varIds:
+            root = set(csp.vars[varId].dom(0))
+            for value in csp.vars[varId].dom(-1):
+                if value not in root:
+                    sub.remove_value(vars[varId].id, value)
+    if csp.phaseHint is not None:
+        sub.phaseHint = [csp.phaseHint[varId] for varId in varIds]
+    return sub
+
+
+def _solve_sub(sub, deadline=None):
+    """ Worker side : solve one component and send back what the whole csp needs, within the deadline if given
+        (a time.time(), the component may wait in the pool queue). """
+    if deadline is not None:
+        sub.timeLimit = deadline - time.time()
+    sub.solve()
+    return sub.isFeasible, sub.assignments, sub.exploredNodes, sub.timeOut
+
+
+def solve_components(csp, varIds, constrs):
+    """Solve each connected component as its own CSP, and merge their assignments in csp.assignments.
+
+    Components without constraint are assigned directly. The others are solved from the smallest to the largest, in
+    a process pool if csp.param["workers"] > 1. The search stops as soon as one component is proven unfeasible.
+
+    Args:
+        csp (CSP.CSP): A CSP solver, whose assignments are initialized
+        varIds (list of list): ids of the variables of each component
+        constrs (list of list): constraints of each component
+
+    Returns:
+        (bool): True if every component admits a feasible solution, False otherwise.
+    """
+    subs = []
+    for ids, cs in sorted(zip(varIds, constrs), key=lambda comp: len(comp[0])):
+        if cs:
+            subs.append((ids, sub_problem(csp, ids, cs)))
+            continue
+        for varId in ids:  # isolated variable
+            dom = csp.vars[varId].dom(0) if csp.compiled else csp.vars[varId].dom(-1)
+            if not dom:
+                return False
+            hint = csp.phaseHint[varId] if csp.phaseHint is not None else None
+            csp.assignments[varId] = hint if hint in dom else dom[0]
+
+    def merge(ids, result):
+        isFeasible, assignments, exploredNodes, timeOut = result
+        csp.exploredNodes += exploredNodes
+        csp.timeOut = csp.timeOut or timeOut
+        if isFeasible:
+            for i, varId in enumerate(ids):
+                csp.assignments[varId] = assignments[i]
+        return isFeasible
+
+    if csp.param["workers"] <= 1 or len(subs) <= 1:
+        for ids, sub in subs:
+            sub.parent = csp  # the sub-problem stops when csp is interrupted
+            sub.timeLimit = csp.timeLimit - (time.time() - csp.start)
+            if not merge(ids, _solve_sub(sub)):
+                return False
+        return True
+
+    pool = multiprocessing.Pool(min(csp.param["workers"], len(subs)))
+    try:
+        deadline = csp.start + csp.timeLimit
+        pending = [(ids, pool.apply_async(_solve_sub, (sub, deadline))) for ids, sub in subs]
+        while pending:
+            if csp.interrupted:
+                return False
+            if time.time() > deadline:
+                csp.timeOut = True
+                return False
+            for ids, result in pending[:]:
+                if not result.ready():
+                    continue
+                pending.remove((ids, result))
+                if not merge(ids, result.get()):
+                    return False
+            if pending:
+                pending[0][1].wait(0.05)
+        return True
+    finally:
+        pool.terminate()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import collections
+import multiprocessing
+import queue
+import secrets
+import threading
+import time
+from multiprocessing.connection import Listener, Client, wait
+
+# Messages, as tuples whose first item is the kind :
+#   coordinator => worker : ("model", csp), ("cube", index, domains, timeLimit), ("stop",)
+#   worker => coordinator : ("result", index, isFeasible, assignments, exploredNodes, timeOut)
+
+
+def split(csp, depth: int):
+    """Explore the search tree of csp down to the given depth, and return the domains of the nodes at this depth.
+
+    Each cube is the list of the domains of all the variables at one node (as intervals, see Variable.intervals), the
+    assignments of the branch leading to it included. The cubes are in the order the search met them.
+
+    Returns:
+        (list): the cubes, None if a solution was found before the depth (stored in csp.assignments)
+    """
+    decompose, checkpoint, cache = csp.param["decompose"], csp.param["checkpoint"], csp.param["cache"]
+    csp.param["decompose"] = False  # the components are split like a single csp
+    csp.param["checkpoint"] = None
+    csp.param["cache"] = None  # the search stopped at the cubes has no outcome
+    csp.cubeDepth = depth
+    csp.cubes = []
+    try:
+        isFeasible = csp.solve()
+        cubes = csp.cubes
+    finally:
+        csp.param["decompose"] = decompose
+        csp.param["checkpoint"] = checkpoint
+        csp.param["cache"] = cache
+        csp.cubeDepth = None
+        csp.cubes = None
+    return None if isFeasible else cubes
+
+
+def worker(address, authkey: bytes):
+    """Connect to a coordinator and solve the cubes it sends, until it stops or the connection is lost.
+
+    Args:
+        address (tuple): (host, port) of the coordinator
+        authkey (bytes): key shared with the coordinator
+    """
+    conn = Client(address, authkey=authkey)
+    csp = None
+    try:
+        while True:
+            message = conn.recv()
+            if message[0] == "stop":
+                return
+            if message[0] == "model":
+                csp = message[1]
+                csp.param["cube"] = None  # solve the cubes here
+                csp.param["workers"] = 1
+                csp.param["checkpoint"] = None
+                csp.param["cache"] = None
+                continue
+
+            _, index, domains, timeLimit = message
+            csp.set_root_domains(domains)
+            csp.timeLimit = timeLimit
+
+            # the coordinator sends "stop" during the search when another worker found a solution
+            done = threading.Event()
+
+            def watch():
+                while not done.is_set():
+                    if conn.poll(0.05):
+                        csp.interrupted = True
+                        return
+
+            watcher = threading.Thread(target=watch, daemon=True)
+            watcher.start()
+            csp.solve()
+            done.set()
+            watcher.join()
+            if csp.interrupted:
+                return
+            conn.send(("result", index, csp.isFeasible, csp.assignments, csp.exploredNodes, csp.timeOut))
+    except (EOFError, OSError):
+        return
+    finally:
+        conn.close()
+
+
+def _accept(listener, incoming):
+    """ Accept the workers connecting to the listener, until it is closed. """
+    while True:
+        try:
+            incoming.put(listener.accept())
+        except multiprocessing.AuthenticationError:
+            continue
+        except OSError:
+            return
+
+
+def _conquer(csp, cubes, incoming, start) -> bool:
+    """ Send the cubes to the connected workers until one of them finds a solution, or all of them are solved. """
+    idle, busy = [], dict()  # busy : connection => index of its cube
+    todo = collections.deque(range(len(cubes)))
+    remaining = len(cubes)
+    try:
+        while remaining > 0:
+            while not incoming.empty():
+                conn = incoming.get()
+                try:
+                    conn.send(("model", csp))
+                    idle.append(conn)
+                except OSError:
+                    conn.close()
+
+            elapsed = time.time() - start
+            if csp.interrupted:
+                return False
+            if elapsed > csp.timeLimit:
+                csp.timeOut = True
+                return False
+
+            while idle and todo:
+                conn = idle.pop()
+                index = todo.popleft()
+                try:
+                    conn.send(("cube", index, cubes[index], csp.timeLimit - elapsed))
+                    busy[conn] = index
+                except OSError:
+                    todo.appendleft(index)
+                    conn.close()
+
+            if not busy:
+                time.sleep(0.05)
+                continue
+            for conn in wait(list(busy.keys()), timeout=0.05):
+                index = busy.pop(conn)
+                try:
+                    _, index, isFeasible, assignments, exploredNodes, timeOut = conn.recv()
+                except (EOFError, OSError):  # worker lost, its cube is solved by another one
+                    todo.appendleft(index)
+                    conn.close()
+                    continue
+                idle.append(conn)
+                csp.exploredNodes += exploredNodes
+                csp.timeOut = csp.timeOut or timeOut
+                remaining -= 1
+                if isFeasible:
+                    csp.assignments = assignments
+                    csp.nb_assigned = csp.nbVars
+                    return True
+        return False
+    finally:
+        for conn in idle + list(busy.keys()):
+            try:
+                conn.send(("stop",))
+                conn.close()
+            except OSError:
+                pass
+
+
+def solve_distributed(csp, depth=4, workers=2, address=("localhost", 0), authkey=None) -> bool:
+    """Cube and conquer : split the search of csp into subproblems, solved by workers connected over TCP.
+
+    The coordinator explores the search tree down to depth with the search settings of csp, and sends each node (the
+    domains of all variables) to an idle worker. Local workers are started as processes, remote ones connect with
+    `python distributed.py host port --authkey key`. A cube lost with its worker is sent to another one. The search
+    stops as soon as a worker finds a solution, stored in csp.assignments, or when csp.timeLimit is reached.
+
+    Args:
+        csp (CSP.CSP): A CSP solver, with its search parameters set
+        depth (int): level of the search tree the cubes are taken at
+        workers (int): number of local worker processes, 0 to only wait for remote ones
+        address (tuple): (host, port) the coordinator listens on, port 0 picks a free one
+        authkey (bytes): key the workers must give to connect, a random one for this run if None (local workers only)
+
+    Returns:
+        (bool): True if the CSP admits at least one feasible solution, False otherwise.
+    """
+    if csp.param["look-ahead"]["LS"]:
+        raise ValueError("The local search can't be split into cubes")
+    if authkey is None:
+        if workers == 0:
+            raise ValueError("The remote workers need an explicit authkey")
+        authkey = secrets.token_bytes(32)
+
+    start = time.time()
+    listener = Listener(address, authkey=authkey)
+    incoming = queue.Queue()
+    threading.Thread(target=_accept, args=(listener, incoming), daemon=True).start()
+    processes = [multiprocessing.Process(target=worker, args=(listener.address, authkey), daemon=True)
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+
+    try:
+        cubes = split(csp, depth)
+        if cubes is None:
+            csp.isFeasible = True
+        elif csp.timeOut:
+            csp.isFeasible = False
+        else:  # the nodes explored by the workers are added to the ones above the cubes
+            csp.isFeasible = _conquer(csp, cubes, incoming, start)
+    finally:
+        listener.close()
+        for process in processes:
+            process.join(1)
+            if process.is_alive():
+                process.kill()
+
+    if csp.isFeasible:
+        csp.phaseHint = csp.assignments[:]
+    csp.exploreTime = round(time.time() - start, 3)
+    return csp.isFeasible
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Worker of a cube and conquer search, see CSP.set_cube_and_conquer.")
+    parser.add_argument("host")
+    parser.add_argument("port", type=int)
+    parser.add_argument("--authkey", required=True, help="key given to the coordinator, see set_cube_and_conquer")
+    args = parser.parse_args()
+
+    worker((args.host, args.port), args.authkey.encode())
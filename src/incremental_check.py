@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from Constraint import ConstraintBinary, ConstraintAllDiff
+
+
+class IncrementalChecker(object):
+    """ Consistency checks of the plain backtracking (BT look-ahead), updated at each assignment.
+
+    Each constraint keeps the number of its assigned variables, so a binary constraint is only checked when its other
+    variable is already assigned, and each all diff constraint keeps a counter of its used values. Checking an
+    assignment therefore costs O(degree) and builds no list. The other constraints are checked once all their
+    variables are assigned.
+    """
+
+    def __init__(self, csp):
+        """Index the constraints of each variable of the given CSP.
+
+        Args:
+            csp (CSP.CSP): A CSP solver, whose assignments are initialized
+        """
+        self.assignments = csp.assignments
+        self.nbAssigned = [0] * len(csp.constrs)  # number of assigned variables of each constraint
+        self.used = [None] * len(csp.constrs)  # used[k][v] = number of variables of all diff k with value + offset v
+
+        self.binary = [list() for _ in range(csp.nbVars)]  # binary[x] = [(k, constraint, is x its first variable)]
+        self.allDiff = [list() for _ in range(csp.nbVars)]  # allDiff[x] = [(k, offset of x)]
+        self.others = [list() for _ in range(csp.nbVars)]  # others[x] = [(k, constraint)]
+        for k, c in enumerate(csp.constrs):
+            if isinstance(c, ConstraintBinary):
+                self.binary[c.var1.id].append((k, c, True))
+                self.binary[c.var2.id].append((k, c, False))
+            elif isinstance(c, ConstraintAllDiff):
+                self.used[k] = dict()
+                for var, offset in zip(c.vars, c.offsets):
+                    self.allDiff[var.id].append((k, offset))
+            else:
+                for var in c.scope():
+                    self.others[var.id].append((k, c))
+
+    def assign(self, varId: int, value: int) -> bool:
+        """Record the assignment of a variable, and check it against the constraints already assigned.
+
+        The assignment is recorded even if it is infeasible, it must be undone with unassign before trying another
+        value.
+
+        Returns:
+            (bool): False if the assignment violates a constraint, True otherwise
+        """
+        feasible = True
+        nbAssigned = self.nbAssigned
+        assignments = self.assignments
+
+        for k, c, first in self.binary[varId]:
+            if feasible and nbAssigned[k] == 1:  # the other variable is assigned
+                if first:
+                    feasible = c.is_feasible_pair(value, assignments[c.var2.id])
+                else:
+                    feasible = c.is_feasible_pair(assignments[c.var1.id], value)
+            nbAssigned[k] += 1
+
+        for k, offset in self.allDiff[varId]:
+            used = self.used[k]
+            count = used.get(value + offset, 0)
+            if count > 0:
+                feasible = False
+            used[value + offset] = count + 1
+            nbAssigned[k] += 1
+
+        for k, c in self.others[varId]:
+            nbAssigned[k] += 1
+            scope = c.scope()
+            if feasible and nbAssigned[k] == len(scope):
+                feasible = c.is_feasible([assignments[var.id] for var in scope])
+
+        return feasible
+
+    def unassign(self, varId: int, value: int):
+        """ Undo the assignment of the given variable to the given value. """
+        for k, c, first in self.binary[varId]:
+            self.nbAssigned[k] -= 1
+
+        for k, offset in self.allDiff[varId]:
+            self.used[k][value + offset] -= 1
+            self.nbAssigned[k] -= 1
+
+        for k, c in self.others[varId]:
+            self.nbAssigned[k] -= 1
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import random
+import time
+
+import numpy as np
+
+from Constraint import ConstraintBinary, ConstraintAllDiff
+
+
+CANDIDATES = 64  # values scored by a move, in the domains larger than this (see MinConflicts)
+
+
+class IndexedSet(object):
+    """ Set of ints with O(1) insertion, removal and random choice. """
+
+    def __init__(self, items=()):
+        self.items = list(items)
+        self.index = {x: i for i, x in enumerate(self.items)}
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, x: int):
+        if x not in self.index:
+            self.index[x] = len(self.items)
+            self.items.append(x)
+
+    def remove(self, x: int):
+        i = self.index.pop(x)
+        last = self.items.pop()
+        if last != x:
+            self.items[i] = last
+            self.index[last] = i
+
+    def choice(self, rng):
+        return self.items[rng.randrange(len(self.items))]
+
+
+class MinConflicts(object):
+    """ Min-conflicts local search over the root domains of a CSP, with a tabu list and random walk moves.
+
+    Every variable has a value. At each move, a variable in a violated constraint is picked at random and given the
+    candidate value violating the fewest constraints (not tabu), or a random value with probability walk. The
+    candidates are the whole root domain if it has at most CANDIDATES values. Otherwise they are the current value,
+    values completing a free key of the all diff constraints of the variable (e.g. a free column or diagonal of the
+    N-Queens) and random values, CANDIDATES in all. The conflicts are kept per key of the constraints, and a move
+    only updates the keys it changes :
+        - binary constraints : the values of the neighbours, checked in their incompatibility matrix
+        - all diff constraints : counts[k][v] = number of variables of k with value + offset = v, and free[k] the
+          keys v with no variable
+        - the other constraints are checked on demand.
+    A move costs O(degree * CANDIDATES), whatever the size of the domains, and the memory of the search is linear in
+    the number of variables and constraints (plus the incompatibility matrices).
+    """
+
+    def __init__(self, csp, tabu=10, walk=0.02, seed=None):
+        """Index the constraints of the given CSP.
+
+        Args:
+            csp (CSP.CSP): A CSP solver, whose root domains are built
+            tabu (int): number of moves a variable can't take back the value it left
+            walk (float): probability of a random move
+            seed (int): seed of the random generator
+        """
+        self.csp = csp
+        self.tabu = tabu
+        self.walk = walk
+        self.rng = random.Random(seed)
+        self.domMin = [var.domMin for var in csp.vars]
+        # root domains with holes, None if the root domain is the initial one (see domain)
+        self.values = [None if var.current_dom_size[0] == var.dom_size else
+                       np.sort(np.array(var.dom(0), dtype=np.int64)) for var in csp.vars]
+        self.bounds = [(var.domMin, var.domMax) for var in csp.vars]
+
+        # binary[x] = [(y, incompatibility matrix, rows indexed by the values of x)]
+        self.binary = [list() for _ in range(csp.nbVars)]
+        # allDiff[x] = [(k, offset of x)], counts[k] and free[k] indexed by value + offset - keyMin[k]
+        self.allDiff = [list() for _ in range(csp.nbVars)]
+        self.counts, self.free, self.keyMin, self.members = [], [], [], []
+        self.others = [list() for _ in range(csp.nbVars)]
+
+        for c in csp.constrs:
+            if isinstance(c, ConstraintBinary):
+                mat = ~c.compatibility_matrix()
+                self.binary[c.var1.id].append((c.var2.id, mat))
+                self.binary[c.var2.id].append((c.var1.id, mat.T))
+            elif isinstance(c, ConstraintAllDiff):
+                k = len(self.counts)
+                keys = [(var.domMin + o, var.domMax + o) for var, o in zip(c.vars, c.offsets)]
+                lo = min(key[0] for key in keys)
+                size = max(key[1] for key in keys) - lo + 1
+                self.counts.append(np.zeros(size, dtype=np.int64))
+                self.free.append(IndexedSet(range(size)))
+                self.keyMin.append(lo)
+                self.members.append(dict())  # key => ids of the variables with this key
+                for var, o in zip(c.vars, c.offsets):
+                    self.allDiff[var.id].append((k, o))
+            else:
+                for var in c.scope():
+                    self.others[var.id].append(c)
+
+        self.assignments = [None] * csp.nbVars
+        self.conflicted = IndexedSet()  # variables maybe in a violated constraint, cleaned lazily
+        self.tabuUntil = [dict() for _ in range(csp.nbVars)]  # tabuUntil[x][a] = first move when x can take a again
+
+    # ------------------------------------------------------------------------------------------------ assignments
+
+    def domain(self, x: int):
+        """ Return the sorted array of the values of the root domain of x. """
+        values = self.values[x]
+        if values is None:
+            return np.arange(self.bounds[x][0], self.bounds[x][1] + 1, dtype=np.int64)
+        return values
+
+    def random_value(self, x: int) -> int:
+        values = self.values[x]
+        if values is None:
+            return self.rng.randint(*self.bounds[x])
+        return int(values[self.rng.randrange(len(values))])
+
+    def candidates(self, x: int):
+        """ Return the sorted array of the values of x a move chooses from, see the class. """
+        values = self.values[x]
+        lo, hi = self.bounds[x]
+        if (hi - lo + 1 if values is None else len(values)) <= CANDIDATES:
+            return self.domain(x)
+        var = self.csp.vars[x]
+        picked = [] if self.assignments[x] is None else [self.assignments[x]]
+        share = CANDIDATES // (len(self.allDiff[x]) + 1)
+        for k, o in self.allDiff[x]:
+            free = self.free[k]
+            for _ in range(min(share, len(free))):
+                a = free.choice(self.rng) + self.keyMin[k] - o
+                if lo <= a <= hi and (values is None or var.contains(a, 0)):
+                    picked.append(a)
+        while len(picked) < CANDIDATES:
+            picked.append(self.random_value(x))
+        return np.unique(np.array(picked, dtype=np.int64))
+
+    def scores(self, x: int, values=None):
+        """ Return the number of violated constraints of x for each of the given values (by default, its root
+            domain), the other values fixed. """
+        if values is None:
+            values = self.domain(x)
+        current = self.assignments[x]
+        scores = np.zeros(len(values), dtype=np.int64)
+        for y, mat in self.binary[x]:
+            b = self.assignments[y]
+            if b is not None:
+                scores += mat[values - self.domMin[x], b - self.domMin[y]]
+        for k, o in self.allDiff[x]:
+            scores += self.counts[k][values + o - self.keyMin[k]]
+            if current is not None:
+                scores[values == current] -= 1  # x itself
+        for c in self.others[x]:
+            scope = c.scope()
+            if any(self.assignments[var.id] is None for var in scope if var.id != x):
+                continue
+            for i, a in enumerate(values.tolist()):
+                self.assignments[x] = a
+                scores[i] += not c.is_feasible([self.assignments[var.id] for var in scope])
+            self.assignments[x] = current
+        return scores
+
+    def is_conflicted(self, x: int) -> bool:
+        a = self.assignments[x]
+        for y, mat in self.binary[x]:
+            b = self.assignments[y]
+            if b is not None and mat[a - self.domMin[x], b - self.domMin[y]]:
+                return True
+        for k, o in self.allDiff[x]:
+            if self.counts[k][a + o - self.keyMin[k]] > 1:
+                return True
+        for c in self.others[x]:
+            if not c.is_feasible([self.assignments[var.id] for var in c.scope()]):
+                return True
+        return False
+
+    def assign(self, x: int, a: int):
+        """ Give the value a to x (unassigned or not), and update the keys of its constraints it leaves and takes. """
+        old = self.assignments[x]
+        self.assignments[x] = a
+        for y, mat in self.binary[x]:
+            b = self.assignments[y]
+            if b is not None and mat[a - self.domMin[x], b - self.domMin[y]]:
+                self.conflicted.add(y)
+        for k, o in self.allDiff[x]:
+            counts, members, keyMin = self.counts[k], self.members[k], self.keyMin[k]
+            if old is not None:
+                key = old + o
+                counts[key - keyMin] -= 1
+                members[key].remove(x)
+                if counts[key - keyMin] == 0:
+                    del members[key]
+                    self.free[k].add(key - keyMin)
+            key = a + o
+            counts[key - keyMin] += 1
+            if counts[key - keyMin] == 1:
+                members[key] = [x]
+                self.free[k].remove(key - keyMin)
+            else:
+                members[key].append(x)
+                for y in members[key]:
+                    self.conflicted.add(y)
+        for c in self.others[x]:
+            for var in c.scope():
+                if self.assignments[var.id] is not None:
+                    self.conflicted.add(var.id)
+        self.conflicted.add(x)
+
+    def best_value(self, x: int, values, scores, move: int) -> int:
+        """ Return a value of x with the fewest conflicts among the given ones, not tabu (unless they solve all its
+            conflicts). """
+        allowed = np.ones(len(scores), dtype=bool)
+        tabu = self.tabuUntil[x]
+        for a, until in list(tabu.items()):
+            if until <= move:
+                del tabu[a]
+                continue
+            i = np.searchsorted(values, a)
+            # aspiration : a tabu value solving the conflicts of x is allowed
+            if i < len(values) and values[i] == a and scores[i] > 0:
+                allowed[i] = False
+        if not allowed.any():
+            allowed[:] = True
+        best = scores[allowed].min()
+        candidates = np.flatnonzero(allowed & (scores == best))
+        return int(values[candidates[self.rng.randrange(len(candidates))]])
+
+    def initialize(self, hint=None):
+        """ Assign the variables one by one, each to its hinted value if any, else to a value with fewest conflicts. """
+        order = list(range(self.csp.nbVars))
+        self.rng.shuffle(order)
+        for x in order:
+            if self.csp.vars[x].current_dom_size[0] == 0:
+                return False
+            if hint is not None and hint[x] is not None and self.csp.vars[x].contains(hint[x], 0):
+                self.assign(x, hint[x])
+            else:
+                values = self.candidates(x)
+                self.assign(x, self.best_value(x, values, self.scores(x, values), 0))
+        return True
+
+    # ------------------------------------------------------------------------------------------------------ search
+
+    def run(self, timeLimit: float, hint=None) -> bool:
+        """Search for a solution until the time limit.
+
+        Returns:
+            (bool): True if a solution was found (in self.assignments), False otherwise
+        """
+        csp = self.csp
+        if not self.initialize(hint):
+            return False
+
+        move = 0
+        while True:
+            # pick a variable of a violated constraint, dropping the ones not conflicted anymore
+            x = None
+            while len(self.conflicted) > 0:
+                x = self.conflicted.choice(self.rng)
+                if self.is_conflicted(x):
+                    break
+                self.conflicted.remove(x)
+                x = None
+            if x is None:
+                return True
+
+            if move % 100 == 0:
+                if csp.interrupted or (csp.parent is not None and csp.parent.interrupted):
+                    return False
+                if time.time() - csp.start > timeLimit:
+                    csp.timeOut = True
+                    return False
+
+            move += 1
+            csp.exploredNodes += 1
+            old = self.assignments[x]
+            if self.rng.random() < self.walk:
+                a = self.random_value(x)
+            else:
+                values = self.candidates(x)
+                a = self.best_value(x, values, self.scores(x, values), move)
+            if a != old:
+                self.tabuUntil[x][old] = move + self.tabu
+                self.assign(x, a)
+
+
+def min_conflicts(csp) -> bool:
+    """Local search for a solution of csp, within csp.timeLimit, the solution found being stored in csp.assignments.
+
+    The search is incomplete : False means that no solution was found in time, not that there is none.
+
+    Args:
+        csp (CSP.CSP): A CSP solver, whose root domains are built
+
+    Returns:
+        (bool): True if a solution was found, False otherwise.
+    """
+    search = MinConflicts(csp, csp.param["tabu"], csp.param["walk"])
+    if search.run(csp.timeLimit, csp.phaseHint):
+        csp.assignments = [int(a) for a in search.assignments]
+        csp.nb_assigned = csp.nbVars
+        return True
+    return False
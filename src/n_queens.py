@@ -2,7 +2,6 @@
 # -*- coding: utf-8 -*-
 
 from CSP import *
-import matplotlib.pyplot as plt
 
 
 
@@ -12,18 +11,18 @@ def constr_nqueens(x: int, y: int, a: int, b: int):
 def verification(assignment: list) -> bool:
     """ Verify if the given solution is satisfied by N-Queens problem. """
     N = len(assignment)
-    for i in range(N-1):
-        for j in range(i+1, N):
-            if assignment[i] is None or assignment[j] is None: return False
-            if not constr_nqueens(i, j, assignment[i], assignment[j]):
-                return False
+    if None in assignment: return False
+    # one queen per column and per diagonal
+    for offsets in ([0] * N, range(N), range(0, -N, -1)):
+        if len({a + o for a, o in zip(assignment, offsets)}) != N:
+            return False
     return True
 
 def display_sol_nqueens(csp: CSP, N: int):
     """ Display the solution information of n-Queens problem solved by CSP solver. """
 
     print("\n \nSolution of {}-Queens problem : ".format(N))
-    for i in range(N):
+    for i in range(N if N <= 50 else 0):  # no board for the large instances
         for j in range(1, N + 1):
             if csp.assignments[i] == j: 
                 print('Q ', end='')
@@ -36,44 +35,35 @@ def display_sol_nqueens(csp: CSP, N: int):
     print("Sol is feasible ? {}".format(csp.isFeasible))
     
 
-def solve_nqueens(N: int, settings=None, varOpt=1, valOpt=1):
+def solve_nqueens(N: int, settings=None, varOpt=1, valOpt=1, timeLimit=300, cache=None):
     # modelization
     csp_solver = CSP()
 
     # N variables, (i, xi) position of each queen
+    # (lazy domains for the local search, which never enumerates them : N = 100000 fits in a few hundred MB)
+    lazy = settings is not None and "LS" in settings
     x = []
     for i in range(N):
-        x.append(csp_solver.add_variable("x{}".format(i+1), 1, N))
+        x.append(csp_solver.add_variable("x{}".format(i+1), 1, N, lazy or None))
     
-    # constraints, for every two distinct queens
-    for i in range(N-1):
-        for j in range(i+1, N):
-            csp_solver.add_constraint_enum(i, j, constr_nqueens)
-            # csp_solver.add_constraint(x[i] - x[j] != j - i)  # Using 2 constraints is slightly less efficient
-            # csp_solver.add_constraint(x[j] - x[i] != j - i)
+    # constraints, one queen per column and per diagonal : x[i], x[i] + i and x[i] - i are all different
+    # (rather than N(N-1)/2 binary constraints csp_solver.add_constraint_enum(i, j, constr_nqueens))
     csp_solver.add_all_diff(x)
+    csp_solver.add_all_diff(x, offsets=range(N))
+    csp_solver.add_all_diff(x, offsets=range(0, -N, -1))
 
     # parameters settings
     # by default, we use the backtracking algorithm
     if settings is None:
         csp_solver.set_BT()
     else:
-        for param in settings:
-            if param == "BT":
-                csp_solver.set_BT()
-            if param == "FC":
-                csp_solver.set_FC()
-            if param == "MAC3":
-                csp_solver.set_MAC3()
-            if param == "MAC4":
-                csp_solver.set_MAC4()
-            if param == "AC3":
-                csp_solver.set_AC3()
-            if param == "AC4":
-                csp_solver.set_AC4()
+        csp_solver.set_parameters(settings)
 
     csp_solver.set_variable_selection(varOpt)
     csp_solver.set_value_selection(valOpt)  
+    csp_solver.timeLimit = timeLimit
+    if cache is not None:  # SQLite file of a result cache
+        csp_solver.set_result_cache(cache)
 
     isFeasible = csp_solver.solve()
     display_sol_nqueens(csp_solver, N)
@@ -84,74 +74,46 @@ def solve_nqueens(N: int, settings=None, varOpt=1, valOpt=1):
     return csp_solver.exploredNodes, csp_solver.exploreTime, isFeasible, csp_solver.timeOut
 
 
-def benchmarking_consistency():
-    instances = dict()  # algo (string) => instance size (list)
-    usedTimes = dict()  # algo (string) => times (list)
-    nodes = dict()  # algo (string) => nb nodes (list)
+SIZES = [*range(5, 20), *range(20, 50, 5)]  # sizes of the N-Queens of the benchmarks
+
 
-    for lookAhead in ["BT", "FC", "MAC3", "MAC4"]:
+def consistency_series():
+    """ Return the jobs of the comparison of the look-ahead methods, one series of increasing sizes per method. """
+    series = []
+    for lookAhead in ["BT", "FC", "MAC3", "MAC4", "ADAPT", "ENGINE"]:
         for root in [None, "AC3", "AC4"]:
 
-            if lookAhead == "MAC3" or lookAhead == "MAC4":
+            if lookAhead == "MAC3" or lookAhead == "MAC4" or lookAhead == "ADAPT" or lookAhead == "ENGINE":
                 if not root is None:
                     break
-            
-            method = lookAhead
-            if not root is None:
-                method += " + " + root
-            sizes = []
-            t = []
-            n = []
-
-            for N in [*list(range(5, 20)), *range(20, 50, 5)]:
-                exploredNodes, exploreTime, isFeasible, timeOut = solve_nqueens(N, [lookAhead, root])
-                if isFeasible:
-                    sizes.append(N)
-                    t.append(exploreTime)
-                    n.append(exploredNodes)
-                elif timeOut:
-                    break
-                else:
-                    raise Exception("Solver cannot solve the {}-Queens problem".format(N))
-            
-            instances[method] = sizes
-            usedTimes[method] = t
-            nodes[method] = n
-
-
-    # generate picture times
-    for method in instances.keys():
-        plt.plot(instances[method], usedTimes[method], label = method)
-
-    plt.legend()
-    plt.yscale("log")
-    plt.xscale("log")
-    plt.title("Comparison of computation times between look-ahead methods on N-Queens")
-    plt.xlabel("Number of queens")
-    plt.ylabel("Time(s)")
-    plt.savefig('../results/N-Queens_impact_consistent_times.png')
-    plt.close()
-
-    # generate picture nodes
-    for method in instances.keys():
-        plt.plot(instances[method], nodes[method], label = method)
-
-    plt.legend()
-    plt.yscale("log")
-    plt.xscale("log")
-    plt.title("Comparison of explored nodes between look-ahead methods on N-Queens")
-    plt.xlabel("Number of queens")
-    plt.ylabel("Number of nodes explored")
-    plt.savefig('../results/N-Queens_impact_consistent_nodes.png')
-    plt.close()
-
-
-
-def benchmarking_heuristics(selections: list, heurictics: str):
-    select = dict()  # variable selection (string) => instance size (list)
-    usedTimes = dict()  # variable selection (string) => times (list)
-    nodes = dict()  # variable selection (string) => nb nodes (list)
 
+            settings = [lookAhead] if root is None else [lookAhead, root]
+            series.append([{"problem": "nqueens", "N": N, "settings": settings} for N in SIZES])
+    return series
+
+
+def benchmarking_consistency(results_path='../results/N-Queens_impact_consistent.jsonl', workers=1):
+    """Compare the look-ahead methods on N-Queens of increasing sizes, until they time out.
+
+    Each solve is appended to results_path as soon as it is over, and the solves already recorded are skipped : an
+    interrupted benchmark goes on where it stopped when it is run again. The figures are then drawn from the file.
+    """
+    from batch import run_series
+    run_series(consistency_series(), results_path, workers)
+    render_consistency(results_path)
+
+
+def render_consistency(results_path='../results/N-Queens_impact_consistent.jsonl'):
+    """ Draw the figures and the table of the comparison of the look-ahead methods from its results file. """
+    from report import plot_nqueens, write_nqueens_table
+    plot_nqueens(results_path, '../results/N-Queens_impact_consistent_{}.png',
+                 "Comparison of {} between look-ahead methods on N-Queens")
+    write_nqueens_table(results_path, '../results/N-Queens_impact_consistent.tex')
+
+
+def heuristics_series(selections: list, heurictics: str):
+    """ Return the jobs of the comparison of the variables or values order heuristics, one series per heuristic. """
+    series = []
     for option in range(len(selections)):
         if heurictics == "variables":
             varOpt = option
@@ -160,53 +122,29 @@ def benchmarking_heuristics(selections: list, heurictics: str):
         if heurictics == "values":
             valOpt = option
         else: valOpt = 0
-        
-        method = selections[option]
-        sizes = []
-        t = []
-        n = []
-
-        for N in [*list(range(5, 20)), *range(20, 50, 5)]: 
-            exploredNodes, exploreTime, isFeasible, timeOut = solve_nqueens(N, ["FC", "AC4"], varOpt, valOpt)
-            if isFeasible:
-                sizes.append(N)
-                t.append(exploreTime)
-                n.append(exploredNodes)
-            elif timeOut:
-                break
-            else:
-                raise Exception("Solver cannot solve the {}-Queens problem".format(N))
-        
-        select[method] = sizes
-        usedTimes[method] = t
-        nodes[method] = n
-
-
-    # generate picture times
-    for method in select.keys():
-        plt.plot(select[method], usedTimes[method], label = method)
-
-    plt.legend()
-    plt.yscale("log")
-    plt.xscale("log")
-    plt.title("Comparison of computation times between {} order heuristics on N-Queens".format(heurictics))
-    plt.xlabel("Number of queens")
-    plt.ylabel("Time(s)")
-    plt.savefig('../results/N-Queens_{}_heuristics_times.png'.format(heurictics))
-    plt.close()
-
-    # generate picture nodes
-    for method in select.keys():
-        plt.plot(select[method], nodes[method], label = method)
-
-    plt.legend()
-    plt.yscale("log")
-    plt.xscale("log")
-    plt.title("Comparison of explored nodes between variables order heuristics on N-Queens")
-    plt.xlabel("Number of queens")
-    plt.ylabel("Number of nodes explored")
-    plt.savefig('../results/N-Queens_{}_heuristics_nodes.png'.format(heurictics))
-    plt.close()
+
+        series.append([{"problem": "nqueens", "N": N, "settings": ["FC", "AC4"], "variable": varOpt, "value": valOpt}
+                       for N in SIZES])
+    return series
+
+
+def benchmarking_heuristics(selections: list, heurictics: str, workers=1):
+    """ Compare the variables or values order heuristics on N-Queens, streamed as benchmarking_consistency. """
+    from batch import run_series
+    run_series(heuristics_series(selections, heurictics), '../results/N-Queens_{}_heuristics.jsonl'.format(heurictics),
+               workers)
+    render_heuristics(selections, heurictics)
+
+
+def render_heuristics(selections: list, heurictics: str):
+    """ Draw the figures and the table of the comparison of the heuristics from its results file. """
+    from report import plot_nqueens, write_nqueens_table
+    option = "variable" if heurictics == "variables" else "value"
+    label = lambda job: selections[job[option]]
+    results_path = '../results/N-Queens_{}_heuristics.jsonl'.format(heurictics)
+    plot_nqueens(results_path, '../results/N-Queens_{}_heuristics_{{}}.png'.format(heurictics),
+                 "Comparison of {{}} between {} order heuristics on N-Queens".format(heurictics), label)
+    write_nqueens_table(results_path, '../results/N-Queens_{}_heuristics.tex'.format(heurictics), label)
 
 
 if __name__ == "__main__":
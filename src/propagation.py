@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import collections
+
+from Constraint import ASSIGNED, BOUNDS, VALUE, GLOBAL
+
+
+class PropagationEngine(object):
+    """ Event-driven propagation of all the constraints of a CSP, to a fixpoint.
+
+    Each constraint subscribes to the domain events of its variables (Constraint.register) : assigned, bounds changed
+    or value removed. When a domain changes, the constraints subscribed to its event are queued, once with all their
+    changed variables, in the queue of their cost class (Constraint.PRIORITY). A queue is only served when the cheaper
+    ones are empty : the binary constraints are filtered first, then the sums, and the global constraints (tables,
+    all diff) last. The changes a constraint makes queue it again, the propagation stops at a wipe-out or when all
+    the queues are empty, unless it is idempotent (Constraint.IDEMPOTENT).
+
+    The bounds of the enumerated domains are not tracked : any change of them wakes up the bounds subscribers.
+    """
+
+    def __init__(self, csp):
+        """Subscribe the constraints of the given CSP.
+
+        Args:
+            csp (CSP.CSP): A CSP solver, whose domains are built
+        """
+        self.csp = csp
+        self.subscribers = [list() for _ in range(csp.nbVars)]  # subscribers[x] = [(constraint, event)]
+        self.queues = [collections.deque() for _ in range(GLOBAL + 1)]  # constraints of each cost class
+        self.pending = dict()  # queued constraint => its changed variables, by id
+        for c in csp.constrs:
+            c.register(self)
+
+    def subscribe(self, constr, var, event: int):
+        """ Propagate constr when the domain of var has the given event, or a stronger one. """
+        self.subscribers[var.id].append((constr, event))
+
+    def schedule(self, constr, var):
+        changed = self.pending.get(constr)
+        if changed is None:
+            self.pending[constr] = {var.id: var}
+            self.queues[constr.PRIORITY].append(constr)
+        else:
+            changed[var.id] = var
+
+    def notify(self, var, level: int, bounds=None, source=None):
+        """Queue the subscribers of the change of the domain of var at level + 1.
+
+        Args:
+            var (variable.Variable): the changed variable
+            level (int): Depth on the current branch in backtracking
+            bounds (tuple): bounds of a lazy domain before the change
+            source (Constraint.Constraint): the idempotent constraint which made the change, not queued again
+        """
+        if var.current_dom_size[level + 1] == 1:
+            event = ASSIGNED
+        elif var.lazy and bounds == (var.dom_min(level + 1), var.dom_max(level + 1)):
+            event = VALUE
+        else:
+            event = BOUNDS
+        for constr, subscribed in self.subscribers[var.id]:
+            if event <= subscribed and constr is not source:
+                self.schedule(constr, var)
+
+    def clear(self):
+        for queue in self.queues:
+            queue.clear()
+        self.pending.clear()
+
+    def run(self, level: int) -> bool:
+        """Propagate the queued constraints until no domain changes.
+
+        Returns:
+            (bool): False if a domain was wiped out, True otherwise
+        """
+        while True:
+            for queue in self.queues:  # the cheapest cost class first
+                if queue:
+                    break
+            else:
+                return True
+            constr = queue.popleft()
+            changed = list(self.pending.pop(constr).values())
+
+            scope = constr.scope()
+            sizes = [var.current_dom_size[level + 1] for var in scope]
+            bounds = [(var.dom_min(level + 1), var.dom_max(level + 1)) if var.lazy else None for var in scope]
+            if not constr.propagate(level, changed):
+                self.clear()
+                return False
+            for var, size, bound in zip(scope, sizes, bounds):
+                if var.current_dom_size[level + 1] != size:
+                    self.notify(var, level, bound, constr if constr.IDEMPOTENT else None)
+
+    def propagate(self, level: int, var) -> bool:
+        """ Propagate the assignment of var at a node of the given level. """
+        self.notify(var, level)
+        return self.run(level)
+
+    def propagate_all(self, level=-1) -> bool:
+        """ Propagate all the constraints, by default on the root domains. """
+        for c in self.csp.constrs:
+            for var in c.scope():
+                self.schedule(c, var)
+        return self.run(level)
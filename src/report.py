@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+
+from batch import read_results
+
+
+DOCUMENT_HEADER = r"""\documentclass{article}
+
+\usepackage[french]{babel}
+\usepackage [utf8] {inputenc} % utf-8 / latin1
+\usepackage{multicol}
+
+\setlength{\hoffset}{-18pt}
+\setlength{\oddsidemargin}{0pt} % Marge gauche sur pages impaires
+\setlength{\evensidemargin}{9pt} % Marge gauche sur pages paires
+\setlength{\marginparwidth}{54pt} % Largeur de note dans la marge
+\setlength{\textwidth}{481pt} % Largeur de la zone de texte (17cm)
+\setlength{\voffset}{-18pt} % Bon pour DOS
+\setlength{\marginparsep}{7pt} % Séparation de la marge
+\setlength{\topmargin}{0pt} % Pas de marge en haut
+\setlength{\headheight}{13pt} % Haut de page
+\setlength{\headsep}{10pt} % Entre le haut de page et le texte
+\setlength{\footskip}{27pt} % Bas de page + séparation
+\setlength{\textheight}{668pt} % Hauteur de la zone de texte (25cm)
+
+\begin{document}
+\begin{center}
+\renewcommand{\arraystretch}{1.4}
+"""
+
+COLORING_HEADER = DOCUMENT_HEADER + r""" \begin{tabular}{lcccccc}
+	\hline
+\textbf{Instance}  & \textbf{vertices} & \textbf{edges}  & \textbf{Chromatic Number} & \textbf{Feasible?} & \textbf{Time(s)} & \textbf{Explored Nodes} \\\hline
+
+"""
+
+NQUEENS_HEADER = DOCUMENT_HEADER + r""" \begin{tabular}{lcccc}
+	\hline
+\textbf{Method} & \textbf{N} & \textbf{Feasible?} & \textbf{Time(s)} & \textbf{Explored Nodes} \\\hline
+
+"""
+
+COLORING_FOOTER = r"""
+\\
+\hline\end{tabular}
+\end{center}
+
+
+\end{document}"""
+
+NQUEENS_FOOTER = COLORING_FOOTER
+
+
+STATUS_MARKS = {"solved": "Y", "timeout": "TO", "infeasible": "N"}  # in the tables, "ERR" otherwise
+
+
+def latest_records(results_path: str, problem: str):
+    """ Return the last record of every job of the given problem, in order of first appearance. """
+    records = dict()
+    for record in read_results(results_path):
+        if record["job"]["problem"] == problem:
+            records[record["key"]] = record
+    return list(records.values())
+
+
+def write_coloring_table(results_path: str, tex_path: str):
+    """ Render the coloring results stored in a JSONL file as a LaTeX table. """
+    with open(tex_path, 'w') as f:
+        f.write(COLORING_HEADER)
+
+        for record in latest_records(results_path, "coloring"):
+            job = record["job"]
+            f.write(r"{} & {} & {} & {} & ".format(
+                os.path.basename(job["instance"]), record.get("nodes", "-"), record.get("edges", "-"), job["colors"]
+            ))
+            f.write("{} & ".format(STATUS_MARKS.get(record["status"], "ERR")))
+            f.write("{} & {} \\\\ \n".format(record.get("exploreTime", "-"), record.get("exploredNodes", "-")))
+
+        f.write(COLORING_FOOTER)
+
+
+
+def settings_label(job: dict) -> str:
+    """ Name of the series of a job by its look-ahead and root consistency, e.g. "FC + AC4". """
+    return " + ".join(job.get("settings") or ["BT"])
+
+
+def nqueens_series(results_path: str, label=settings_label):
+    """Return the solved N-Queens of a JSONL results file, grouped in series.
+
+    Args:
+        results_path (str): JSONL file of the results
+        label (function): name of the series of a job
+
+    Returns:
+        (dict): series name => (sizes, times, nodes), three lists in increasing sizes
+    """
+    series = dict()
+    for record in latest_records(results_path, "nqueens"):
+        if record["status"] == "solved":
+            series.setdefault(label(record["job"]), []).append(
+                (record["job"]["N"], record["exploreTime"], record["exploredNodes"])
+            )
+    return {name: tuple(list(values) for values in zip(*sorted(points))) for name, points in series.items()}
+
+
+def plot_nqueens(results_path: str, figure_path: str, title: str, label=settings_label):
+    """Draw the times and the explored nodes of the N-Queens series stored in a JSONL file.
+
+    Args:
+        results_path (str): JSONL file of the results
+        figure_path (str): path of the figures, formatted with "times" and "nodes"
+        title (str): title of the figures, formatted with "computation times" and "explored nodes"
+        label (function): name of the series of a job
+    """
+    import matplotlib.pyplot as plt  # only loaded to draw the figures
+
+    series = nqueens_series(results_path, label)
+    for measure, index, name, ylabel in (("times", 1, "computation times", "Time(s)"),
+                                          ("nodes", 2, "explored nodes", "Number of nodes explored")):
+        for method, values in series.items():
+            plt.plot(values[0], values[index], label=method)
+
+        plt.legend()
+        plt.yscale("log")
+        plt.xscale("log")
+        plt.title(title.format(name))
+        plt.xlabel("Number of queens")
+        plt.ylabel(ylabel)
+        plt.savefig(figure_path.format(measure))
+        plt.close()
+
+
+def write_nqueens_table(results_path: str, tex_path: str, label=settings_label):
+    """ Render the N-Queens results stored in a JSONL file as a LaTeX table, by series and increasing N. """
+    records = sorted(latest_records(results_path, "nqueens"), key=lambda record: (label(record["job"]),
+                                                                                record["job"]["N"]))
+    with open(tex_path, 'w') as f:
+        f.write(NQUEENS_HEADER)
+
+        for record in records:
+            f.write("{} & {} & {} & {} & {} \\\\ \n".format(
+                label(record["job"]), record["job"]["N"], STATUS_MARKS.get(record["status"], "ERR"),
+                record.get("exploreTime", "-"), record.get("exploredNodes", "-")
+            ))
+
+        f.write(NQUEENS_FOOTER)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Render the results of a JSONL file as a LaTeX table.")
+    parser.add_argument("results")
+    parser.add_argument("tex")
+    parser.add_argument("--problem", choices=["coloring", "nqueens"], default="coloring")
+    parser.add_argument("--figures", default=None,
+                        help="N-Queens : path of the figures, with {} replaced by times and nodes")
+    args = parser.parse_args()
+
+    if args.problem == "coloring":
+        write_coloring_table(args.results, args.tex)
+    else:
+        write_nqueens_table(args.results, args.tex)
+        if args.figures is not None:
+            plot_nqueens(args.results, args.figures, "Comparison of {} between methods on N-Queens")
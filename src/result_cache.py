@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import contextlib
+import hashlib
+import json
+import sqlite3
+import time
+
+
+# parameters which don't change the outcome of a solve, left out of the keys
+IGNORED_PARAMETERS = ("workers", "address", "authkey", "checkpoint", "period", "cache", "cacheEntries")
+
+
+def _plain(value):
+    """ json.dumps fallback for the numpy numbers of the models. """
+    return value.item()
+
+
+def model_key(csp):
+    """Return a canonical hash of the model of csp and of its solver parameters, None if it can't be cached.
+
+    The model is described by the root domains of the variables (as intervals) and the signature of every constraint
+    (see Constraint.signature), sorted so that the order the constraints were added in doesn't matter. The names of the
+    variables and the ids of the constraints are left out.
+    """
+    digest = hashlib.sha256()
+    level = 0 if csp.compiled else -1
+    for var in csp.vars:
+        digest.update(json.dumps([var.id, var.intervals(level)]).encode())
+
+    signatures = []
+    for c in csp.constrs:
+        signature = c.signature()
+        if signature is None:
+            return None
+        signatures.append(json.dumps(signature, default=_plain))
+    for signature in sorted(signatures):
+        digest.update(signature.encode())
+
+    param = {name: value for name, value in csp.param.items() if name not in IGNORED_PARAMETERS}
+    digest.update(json.dumps(param, sort_keys=True, default=_plain).encode())
+    return digest.hexdigest()
+
+
+class ResultCache(object):
+    """ Outcomes of solves stored in a SQLite database, the least recently used ones are dropped above maxEntries.
+
+    Each entry holds the outcome of a model (feasible or not), the solution found and the statistics of the search. The
+    database is opened for each operation only, so that the solves of a batch (see batch.py) can share it.
+    """
+
+    def __init__(self, path: str, maxEntries=10000):
+        """Open the cache, creating the database if needed.
+
+        Args:
+            path (str): SQLite file of the cache
+            maxEntries (int): number of results kept
+        """
+        if maxEntries < 1:
+            raise ValueError("The cache should keep at least one result, not {}.".format(maxEntries))
+        self.path = path
+        self.maxEntries = maxEntries
+        with self.__connect() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, feasible INTEGER, assignment TEXT, "
+                       "stats TEXT, used REAL)")
+
+    @contextlib.contextmanager
+    def __connect(self):
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            with connection:  # commits, or rolls back on an error
+                yield connection
+        finally:
+            connection.close()
+
+    def get(self, key: str):
+        """ Return the entry (feasible, assignment, stats) of the key, None if it is not cached. """
+        with self.__connect() as db:
+            row = db.execute("SELECT feasible, assignment, stats FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            db.execute("UPDATE results SET used = ? WHERE key = ?", (time.time(), key))
+        return bool(row[0]), json.loads(row[1]), json.loads(row[2])
+
+    def put(self, key: str, feasible: bool, assignment: list, stats: dict):
+        """ Store the result of a solve, dropping the least recently used entries beyond maxEntries. """
+        with self.__connect() as db:
+            db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)", (
+                key, int(feasible), json.dumps(assignment, default=_plain), json.dumps(stats, default=_plain),
+                time.time()
+            ))
+            db.execute("DELETE FROM results WHERE key NOT IN (SELECT key FROM results ORDER BY used DESC LIMIT ?)",
+                       (self.maxEntries,))
+
+    def discard(self, key: str):
+        with self.__connect() as db:
+            db.execute("DELETE FROM results WHERE key = ?", (key,))
+
+    def __len__(self):
+        with self.__connect() as db:
+            return db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
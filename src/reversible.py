@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+class Trail(object):
+    """ Undo log of the incremental state of a constraint, restored when the search leaves the branch it was set on.
+
+    The search doesn't tell the constraints when it backtracks. Instead, each checkpoint keeps the level and the id of
+    the branch it was made on (csp.nodeIds, one per value tried at a node), and is undone once that branch is left.
+    The root domains are the branch csp.nodeIds[-1], renewed when they get values back.
+    """
+
+    def __init__(self):
+        self.csp = None
+        self.entries = []  # (container, key, old value)
+        self.reversibles = []  # objects with their own undo log, see register
+        self.checkpoints = []  # (level, node, number of entries, marks of the reversible objects)
+
+    def attach(self, csp):
+        self.csp = csp
+
+    def register(self, reversible):
+        """ Restore also an object with methods mark() -> position in its undo log, and restore(mark). """
+        self.reversibles.append(reversible)
+
+    def set(self, container, key, value):
+        """ container[key] = value, undone when the search leaves the current branch. """
+        self.entries.append((container, key, container[key]))
+        container[key] = value
+
+    def sync(self, level: int):
+        """ Undo the modifications made outside the current branch, before updating the state at level. The state
+            reached at the current node is kept, so that a constraint propagated again at the same node only applies
+            the new changes. """
+        nodeIds = self.csp.nodeIds
+        checkpoints = self.checkpoints
+        while checkpoints and (checkpoints[-1][0] > level or nodeIds[checkpoints[-1][0]] != checkpoints[-1][1]):
+            _, _, size, marks = checkpoints.pop()
+            while len(self.entries) > size:
+                container, key, old = self.entries.pop()
+                container[key] = old
+            for reversible, mark in zip(self.reversibles, marks):
+                reversible.restore(mark)
+        if not checkpoints or checkpoints[-1][0] < level:
+            checkpoints.append((level, nodeIds[level], len(self.entries), [r.mark() for r in self.reversibles]))
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import multiprocessing
+
+from propagation import PropagationEngine
+
+
+def probe(engine, varId: int, value: int, level=-1):
+    """ Return True if the domains at level + 1 stay consistent after the assignment varId = value. """
+    csp = engine.csp
+    for var in csp.vars:
+        var.copy_level(level + 1, level + 2)
+    csp.lastNodeId += 1  # a new branch, the incremental states of the previous probe are left (see Trail)
+    csp.nodeIds[level + 1] = csp.lastNodeId
+    csp.vars[varId].remove_all_values_except(value, level + 2)
+    return engine.propagate(level + 1, csp.vars[varId])
+
+
+def failed_probes(engine, varIds, level=-1):
+    """ Return the pairs (varId, value) of the given variables whose singleton assignment is inconsistent. """
+    failed = []
+    for varId in varIds:
+        for value in engine.csp.vars[varId].dom(level + 1):
+            if not probe(engine, varId, value, level):
+                failed.append((varId, value))
+    return failed
+
+
+_worker_engine = None
+
+
+def _init_worker(csp):
+    global _worker_engine
+    _worker_engine = PropagationEngine(csp)
+
+
+def _failed_probes_task(task):
+    """ Worker side : load the root domains of the pass, then probe the values of the given variables. """
+    domains, varIds = task
+    _worker_engine.csp.set_root_domains(domains)
+    return failed_probes(_worker_engine, varIds)
+
+
+def sac(csp, workers=1):
+    """Enforces singleton consistency (SAC-1) on the root domains of a csp.
+
+    Each value of each domain is tentatively assigned, and removed if the propagation of all the constraints (see
+    propagation.PropagationEngine) then wipes out a domain. Passes are repeated until no value is removed. The probes
+    of a pass are independent, with workers > 1 they are split across a process pool.
+
+    This is SAC-1 on purpose : each pass probes every value again. SAC-Opt only probes again the values whose
+    propagation used a removed value, but it keeps the domains reached by each probe, O(n^2 d^2) memory for n
+    variables of d values, and doesn't split across processes as simply.
+
+    Args:
+        csp (CSP.CSP): A CSP solver
+        workers (int): number of processes running the probes
+    Returns:
+        (bool): False if the problem is found unfeasible, True otherwise.
+    """
+    engine = PropagationEngine(csp)
+    if not engine.propagate_all():
+        return False
+    if csp.nbVars == 0:
+        return True
+
+    pool = None
+    if workers > 1:
+        pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(csp,))
+
+    try:
+        while True:
+            varIds = [var.id for var in csp.vars if var.current_dom_size[0] > 1]
+
+            if pool is None:
+                failed = failed_probes(engine, varIds)
+            else:
+                domains = [var.intervals(0) for var in csp.vars]
+                chunks = [varIds[i::workers * 4] for i in range(workers * 4)]
+                failed = [pair for part in pool.map(_failed_probes_task, [(domains, chunk) for chunk in chunks])
+                          for pair in part]
+
+            if not failed:
+                return True
+
+            for varId, value in failed:
+                var = csp.vars[varId]
+                if var.contains(value, 0):
+                    var.remove_value(value, 0)
+                    if var.current_dom_size[0] == 0:
+                        return False
+                    engine.notify(var, -1)
+            if not engine.run(-1):
+                return False
+    finally:
+        if pool is not None:
+            pool.terminate()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Command line solver, e.g.
+#   python solve.py nqueens 12 --settings FC AC4 --variable 1 --value 1
+#   python solve.py coloring ../instances/myciel4.col 5 --timeout 60 --quiet
+# The solving core (CSP, variables, constraints, backtracking) is the only part imported at startup : numpy is loaded
+# by the features using it (tables, bulk arc consistency, most supported values...) and matplotlib by the figures of
+# n_queens.
+
+import time
+
+START = time.perf_counter()  # before the solver modules are imported
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+
+from batch import run_job
+
+
+def build_job(args) -> dict:
+    """ Return the batch job (see batch.py) described by the parsed command line. """
+    job = {"problem": args.problem, "variable": args.variable, "value": args.value, "timeLimit": args.timeout}
+    if args.settings is not None:
+        job["settings"] = args.settings
+    if args.cache is not None:
+        job["cache"] = args.cache
+    if args.problem == "nqueens":
+        job["N"] = args.N
+    else:
+        job.update({"instance": args.instance, "colors": args.colors, "preprocess": not args.no_preprocess})
+    return job
+
+
+def main(argv=None) -> dict:
+    """Solve the problem given on the command line and print its result.
+
+    The result is the record of batch.run_job, with the startup time : the time spent before the search, by the
+    imports of this script and of the solver (the interpreter start excepted). With --quiet, the output of the solve
+    functions is dropped and the result is printed as a JSON line.
+    """
+    parser = argparse.ArgumentParser(description="Solve a N-Queens or a graph coloring problem.")
+    problems = parser.add_subparsers(dest="problem", required=True)
+    nqueens = problems.add_parser("nqueens", help="place N queens on a N x N board")
+    nqueens.add_argument("N", type=int)
+    coloring = problems.add_parser("coloring", help="color the graph of a DIMACS file with K colors")
+    coloring.add_argument("instance")
+    coloring.add_argument("colors", type=int)
+    coloring.add_argument("--no-preprocess", action="store_true", help="neither peel the graph nor fix a clique")
+    for sub in (nqueens, coloring):
+        sub.add_argument("--settings", nargs="*", default=None,
+                         help="look-ahead and root consistency, e.g. FC AC4 (default : BT for nqueens, FC AC4 for "
+                              "coloring)")
+        sub.add_argument("--variable", type=int, default=1, help="variable selection, index in VARIABLES_SELECTION")
+        sub.add_argument("--value", type=int, default=1, help="value selection, index in VALUES_SELECTION")
+        sub.add_argument("--timeout", type=float, default=300)
+        sub.add_argument("--cache", default=None, help="SQLite file of a result cache, see result_cache.py")
+        sub.add_argument("--quiet", action="store_true", help="only print the result, as a JSON line")
+    args = parser.parse_args(argv)
+
+    job = build_job(args)
+    parsed = time.perf_counter() - START
+    if args.quiet:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            result = run_job(job)
+    else:
+        result = run_job(job)
+    result["startupTime"] = round(parsed + result["importTime"], 4)
+
+    if args.quiet:
+        print(json.dumps(dict(job=job, **result)))
+    else:
+        print("\n{} : {} nodes, {}s of search, {}s of startup".format(
+            result["status"], result["exploredNodes"], result["exploreTime"], result["startupTime"]
+        ))
+    return result
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
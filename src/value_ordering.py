@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from Constraint import ConstraintBinary
+
+
+class HintFirst(object):
+    """ The values of a range, one of them (the hint) first : an order of a lazy domain that is not enumerated. """
+
+    def __init__(self, hint: int, values: range):
+        self.hint = hint
+        self.values = values
+
+    def __len__(self):
+        return len(self.values)
+
+    def __iter__(self):
+        yield self.hint
+        for value in self.values:
+            if value != self.hint:
+                yield value
+
+
+class SupportCounter(object):
+    """ Number of supports of each value in the current domains of the neighbouring variables.
+
+    counts[x][a - domMin] is the sum, over the binary constraints c(x, y), of the values b in the current domain of y
+    such that (a, b) is feasible. Each variable's domain is kept as a boolean mask, the domain the counts were computed
+    with. When a variable is synchronized with its domain at a given level, only the values removed or restored since
+    its last synchronization are added to or subtracted from its neighbours' counts.
+    """
+
+    def __init__(self, csp, level: int = 0):
+        """Build the compatibility matrices of all binary constraints and the counts of the domains at given level.
+
+        Args:
+            csp (CSP.CSP): A CSP solver
+            level (int): depth level of the domains the counts are initialized with
+        """
+        self.vars = csp.vars
+        self.graph = csp.graph
+        self.arcs = [list() for _ in range(csp.nbVars)]  # arcs[y] = [(x, mat)] with mat[a][b] for a in x, b in y
+
+        self.live = [self.__mask(var, level) for var in self.vars]
+        self.counts = [np.zeros(var.dom_size, dtype=np.int64) for var in self.vars]
+        for c in csp.constrs:
+            self.add_constraint(c)
+
+    def add_constraint(self, c):
+        """ Add the supports given by a constraint, with respect to the domains the counts were computed with. """
+        if not isinstance(c, ConstraintBinary):  # does not count all diff constraints for simplicity
+            return
+        mat = c.compatibility_matrix().astype(np.int64)
+        self.arcs[c.var2.id].append((c.var1.id, mat))
+        self.arcs[c.var1.id].append((c.var2.id, mat.T))
+        self.counts[c.var1.id] += mat @ self.live[c.var2.id]
+        self.counts[c.var2.id] += mat.T @ self.live[c.var1.id]
+
+    def __mask(self, var, level: int):
+        mask = np.zeros(var.dom_size, dtype=np.int64)
+        mask[np.array(var.dom(level), dtype=int) - var.domMin] = 1
+        return mask
+
+    def sync(self, varId: int, level: int):
+        """ Update the neighbours' counts with the values removed from or restored to the domain at given level. """
+        mask = self.__mask(self.vars[varId], level)
+        diff = mask - self.live[varId]
+        changed = np.flatnonzero(diff)
+        if len(changed) == 0:
+            return
+        for x, mat in self.arcs[varId]:
+            self.counts[x] += mat[:, changed] @ diff[changed]
+        self.live[varId] = mask
+
+    def order(self, varId: int, level: int):
+        """ Return the values of the current domain, from the most supported to the least supported. """
+        for y in self.graph.neighbors(varId):
+            self.sync(y, level)
+
+        var = self.vars[varId]
+        values = np.sort(np.array(var.dom(level), dtype=int))
+        support = self.counts[varId][values - var.domMin]
+        return values[np.argsort(-support, kind="stable")].tolist()
@@ -0,0 +1,478 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import functools
+import itertools
+import operator
+import os
+import re
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+from CSP import CSP
+from Constraint import ConstraintSum
+from Variable import Variable, LinearSum
+
+
+# Subset of XCSP3 (http://xcsp.org) read by load_xcsp :
+#   variables : <var> and <array> (any dimension), domains given as values and ranges "0..3 5 7..9"
+#   constraints : <intension>, <extension> (supports or conflicts, no wildcard), <allDifferent> over a list,
+#   <sum> with an optional <coeffs> and a condition (op,k) or (op,var), inside <block> and <group> elements.
+# The file is parsed as a stream, each constraint being built then dropped, so the memory used is bounded by the
+# largest element (e.g. the largest table) rather than by the whole file.
+
+MAX_ENUMERATION = 10 ** 6  # maximal number of tuples enumerated to turn a constraint into a table
+
+FUNCTIONS = {
+    "neg": operator.neg, "abs": abs, "add": lambda *args: sum(args), "sub": operator.sub,
+    "mul": lambda *args: functools.reduce(operator.mul, args), "div": operator.floordiv, "mod": operator.mod,
+    "sqr": lambda a: a * a, "pow": operator.pow, "min": min, "max": max, "dist": lambda a, b: abs(a - b),
+    "lt": operator.lt, "le": operator.le, "ge": operator.ge, "gt": operator.gt, "ne": operator.ne, "eq": operator.eq,
+    "not": operator.not_, "and": lambda *args: all(args), "or": lambda *args: any(args),
+    "xor": lambda *args: sum(map(bool, args)) % 2 == 1, "iff": lambda *args: len(set(map(bool, args))) == 1,
+    "imp": lambda a, b: not a or b, "if": lambda a, b, c: b if a else c,
+}
+
+# the same functions over numpy arrays, to evaluate an expression on all the tuples of a constraint at once
+ARRAY_FUNCTIONS = dict(FUNCTIONS, **{
+    "neg": np.negative, "abs": np.abs, "div": np.floor_divide, "mod": np.mod, "pow": np.power,
+    "min": lambda *args: functools.reduce(np.minimum, args), "max": lambda *args: functools.reduce(np.maximum, args),
+    "dist": lambda a, b: np.abs(a - b), "not": np.logical_not,
+    "and": lambda *args: functools.reduce(np.logical_and, args),
+    "or": lambda *args: functools.reduce(np.logical_or, args),
+    "xor": lambda *args: functools.reduce(np.logical_xor, args),
+    "iff": lambda *args: functools.reduce(np.logical_and, [np.equal(np.asarray(arg, dtype=bool), args[0] != 0)
+                                                           for arg in args[1:]]),
+    "imp": lambda a, b: np.logical_or(np.logical_not(a), b), "if": np.where,
+})
+
+COMPARISONS = {"lt": "l", "le": "leq", "ge": "geq", "gt": "g", "ne": "neq", "eq": "eq"}  # => ConstraintLinear types
+
+TUPLE_SEPARATORS = str.maketrans("(),", "   ")
+
+
+class Loader(object):
+    """ Builds a CSP from the elements of an XCSP3 instance, in the order they are read. """
+
+    def __init__(self):
+        self.csp = CSP()
+        self.arrays = dict()  # id => (shape, flat list of variables)
+        self.values = dict()  # id => domain values, of the <var> elements
+        self.removals = []  # (variable, value) out of the domains, applied once all the constraints are added
+
+    # ---------------------------------------------------------------------------------------------------- variables
+
+    def add_var(self, name: str, values):
+        values = sorted(set(values))
+        if not values:
+            raise ValueError("Empty domain for variable {}".format(name))
+        var = self.csp.add_variable(name, values[0], values[-1])
+        if len(values) < values[-1] - values[0] + 1:  # the CSP domains are ranges
+            kept = set(values)
+            self.removals += [(var, v) for v in range(values[0], values[-1] + 1) if v not in kept]
+        return var
+
+    def var(self, elem):
+        if elem.get("as") is not None:  # same domain as another variable
+            values = self.values[elem.get("as")]
+        else:
+            values = parse_values(elem.text)
+        self.values[elem.get("id")] = values
+        self.arrays[elem.get("id")] = ((), [self.add_var(elem.get("id"), values)])
+
+    def array(self, elem):
+        name = elem.get("id")
+        shape = tuple(int(s) for s in re.findall(r"\[(\d+)\]", elem.get("size")))
+        domains = {}  # suffix "[i][j]" => values, for the arrays with a <domain> per group of cells
+        default = parse_values(elem.text) if elem.text and elem.text.strip() else None
+        for child in elem.findall("domain"):
+            values = parse_values(child.text)
+            for ref in child.get("for").split():
+                if ref == "others":
+                    default = values
+                else:
+                    for index in expand_indices(ref[len(name):], shape):
+                        domains[index] = values
+
+        vars = []
+        for index in itertools.product(*[range(n) for n in shape]):
+            values = domains.get(index, default)
+            if values is None:
+                raise ValueError("No domain for {}{}".format(name, "".join("[{}]".format(i) for i in index)))
+            vars.append(self.add_var(name + "".join("[{}]".format(i) for i in index), values))
+        self.arrays[name] = (shape, vars)
+
+    def resolve(self, text: str):
+        """ Return the variables of a list of references, e.g. "x[0] x[2..4] y[][1] z". """
+        vars = []
+        for ref in text.split():
+            name, _, suffix = ref.partition("[")
+            if name not in self.arrays:
+                raise ValueError("Unknown variable {}".format(ref))
+            shape, flat = self.arrays[name]
+            if not suffix:
+                vars += flat
+                continue
+            for index in expand_indices("[" + suffix, shape):
+                vars.append(flat[int(np.ravel_multi_index(index, shape))])
+        return vars
+
+    # -------------------------------------------------------------------------------------------------- constraints
+
+    def constraint(self, c: dict):
+        """ Add the constraint described by c : its tag, its text and the text of its children, by tag. """
+        handler = getattr(self, "c_" + c["tag"], None)
+        if handler is None:
+            raise ValueError("Unsupported XCSP3 constraint <{}>".format(c["tag"]))
+        handler(c)
+
+    def c_allDifferent(self, c: dict):
+        if "except" in c:
+            raise ValueError("Unsupported XCSP3 constraint <allDifferent> with <except>")
+        self.csp.add_all_diff(self.resolve(c.get("list", c["text"])))
+
+    def c_sum(self, c: dict):
+        vars = self.resolve(c["list"])
+        coefs = [int(v) for v in c["coeffs"].split()] if "coeffs" in c else [1] * len(vars)
+        op, rhs = c["condition"].strip().strip("()").split(",")
+        if op.strip() not in COMPARISONS:
+            raise ValueError("Unsupported XCSP3 sum condition {}".format(c["condition"]))
+        rhs = rhs.strip()
+        if re.fullmatch(r"-?\d+", rhs):
+            rhs = int(rhs)
+        else:  # sum <op> variable
+            vars, coefs, rhs = vars + self.resolve(rhs), coefs + [-1], 0
+        self.csp.add_constraint(ConstraintSum(-1, vars, coefs, rhs, COMPARISONS[op.strip()]))
+
+    def c_extension(self, c: dict):
+        vars = self.resolve(c["list"])
+        if "supports" in c:
+            text, supports = c["supports"], True
+        else:
+            text, supports = c["conflicts"], False
+        if "*" in text:
+            raise ValueError("Unsupported XCSP3 extension with short tuples (*)")
+        table = np.fromstring(text.translate(TUPLE_SEPARATORS), dtype=np.int64, sep=" ").reshape(-1, len(vars))
+
+        if not supports:
+            table = remove_rows(enumerate_tuples(vars), table)
+        if len(vars) == 1:
+            self.filter_domain(vars[0], set(table[:, 0].tolist()).__contains__)
+        else:
+            self.csp.add_table(vars, table)
+
+    def c_intension(self, c: dict):
+        tree = parse_expression(c.get("function", c["text"]), self)
+        vars = list({var.id: var for var in expression_vars(tree)}.values())
+
+        if len(vars) == 1:
+            self.filter_domain(vars[0], lambda a: evaluate(tree, {vars[0].id: a}))
+            return
+
+        constr = linear_constraint(tree)
+        if constr is not None:
+            self.csp.add_constraint(constr)
+        else:  # the expression is evaluated on the product of the domains at once
+            tuples = enumerate_tuples(vars)
+            feasible = evaluate_tuples(tree, {var.id: tuples[:, i] for i, var in enumerate(vars)})
+            self.csp.add_table(vars, tuples[feasible])
+
+    def filter_domain(self, var: Variable, keep):
+        """ Remove from the domain of var the values v such that keep(v) is False. """
+        self.removals += [(var, v) for v in var.dom(-1) if not keep(v)]
+
+    def finish(self):
+        for var, value in self.removals:
+            self.csp.remove_value(var.id, value)
+        self.removals = []
+        return self.csp
+
+
+def parse_values(text: str):
+    """ Return the values of a domain such as "0..3 5 7..9". """
+    values = []
+    for token in text.split():
+        if ".." in token:
+            lo, hi = token.split("..")
+            values += range(int(lo), int(hi) + 1)
+        else:
+            values.append(int(token))
+    return values
+
+
+def expand_indices(suffix: str, shape):
+    """ Return the indices of the cells of an array designated by a suffix such as "[2][]" or "[0..3]". """
+    ranges = []
+    for dim, part in enumerate(re.findall(r"\[([^\]]*)\]", suffix)):
+        if part == "":
+            ranges.append(range(shape[dim]))
+        elif ".." in part:
+            lo, hi = part.split("..")
+            ranges.append(range(int(lo), int(hi) + 1))
+        else:
+            ranges.append([int(part)])
+    return list(itertools.product(*ranges))
+
+
+def enumerate_tuples(vars):
+    """ Return all the tuples of values of the variables, as an array with one row per tuple. """
+    size = int(np.prod([var.dom_size for var in vars], dtype=np.float64))
+    if size > MAX_ENUMERATION:
+        raise ValueError("Too many tuples ({}) to enumerate over {}".format(size, [var.name for var in vars]))
+    grids = np.meshgrid(*[np.arange(var.domMin, var.domMax + 1) for var in vars], indexing="ij")
+    return np.stack([g.ravel() for g in grids], axis=1)
+
+
+def remove_rows(tuples, rows):
+    """ Return the tuples not in rows, both arrays having one tuple per row. """
+    if len(rows) == 0:
+        return tuples
+    lo = np.minimum(tuples.min(axis=0), rows.min(axis=0))
+    base = np.maximum(tuples.max(axis=0), rows.max(axis=0)) - lo + 1
+
+    def encode(a):  # mixed radix, one integer per tuple
+        return np.ravel_multi_index((a - lo).T, base)
+
+    return tuples[~np.isin(encode(tuples), encode(rows))]
+
+
+# -------------------------------------------------------------------------------------------------------- expressions
+# An expression is a tree of tuples : ("int", value), ("var", Variable) or (function name, child, child...)
+
+TOKEN = re.compile(r"\s*(?:(-?\d+)|([A-Za-z_][\w\[\]\.]*)|(.))")
+
+
+def parse_expression(text: str, loader: Loader):
+    tokens = [t for t in TOKEN.findall(text) if any(t)]
+    pos = 0
+
+    def parse():
+        nonlocal pos
+        number, name, symbol = tokens[pos]
+        pos += 1
+        if number:
+            return "int", int(number)
+        if symbol:
+            raise ValueError("Unexpected {} in expression {}".format(symbol, text))
+        if pos < len(tokens) and tokens[pos][2] == "(":  # function call
+            if name not in FUNCTIONS:
+                raise ValueError("Unsupported XCSP3 function {}".format(name))
+            pos += 1
+            args = [parse()]
+            while tokens[pos][2] == ",":
+                pos += 1
+                args.append(parse())
+            pos += 1  # ")"
+            return (name,) + tuple(args)
+        vars = loader.resolve(name)
+        if len(vars) != 1:
+            raise ValueError("{} is not a single variable in expression {}".format(name, text))
+        return "var", vars[0]
+
+    return parse()
+
+
+def expression_vars(tree):
+    if tree[0] == "var":
+        return [tree[1]]
+    if tree[0] == "int":
+        return []
+    return [var for child in tree[1:] for var in expression_vars(child)]
+
+
+def evaluate(tree, values: dict):
+    """ Return the value of the expression, values giving the value of each variable by id. """
+    if tree[0] == "int":
+        return tree[1]
+    if tree[0] == "var":
+        return values[tree[1].id]
+    return FUNCTIONS[tree[0]](*[evaluate(child, values) for child in tree[1:]])
+
+
+def evaluate_tuples(tree, columns: dict):
+    """ Return the boolean mask of the tuples satisfying the expression, columns giving the values of each variable
+        by id (one array per variable, one row per tuple). The tuples dividing by 0 are not satisfied. """
+    shape = next(iter(columns.values())).shape
+    undefined = np.zeros(shape, dtype=bool)
+
+    def evaluate_array(tree):
+        nonlocal undefined
+        if tree[0] == "int":
+            return tree[1]
+        if tree[0] == "var":
+            return columns[tree[1].id]
+        args = [evaluate_array(child) for child in tree[1:]]
+        if tree[0] in ("div", "mod"):
+            undefined = undefined | (np.asarray(args[1]) == 0)
+        return ARRAY_FUNCTIONS[tree[0]](*args)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mask = np.broadcast_to(np.asarray(evaluate_array(tree), dtype=bool), shape)
+    return mask & ~undefined
+
+
+def linear(tree):
+    """ Return the expression as a number, Variable, LinearExpr or LinearSum, or None if it is not linear. """
+    if tree[0] == "int":
+        return tree[1]
+    if tree[0] == "var":
+        return tree[1]
+    args = [linear(child) for child in tree[1:]]
+    if any(arg is None for arg in args):
+        return None
+    if tree[0] == "add":
+        return sum(args[1:], LinearSum.of(args[0]))
+    if tree[0] == "sub":
+        return LinearSum.of(args[0]) - args[1]
+    if tree[0] == "neg":
+        return LinearSum.of(args[0]) * -1
+    if tree[0] == "mul" and len(args) == 2 and isinstance(args[1], int):
+        return LinearSum.of(args[0]) * args[1]
+    if tree[0] == "mul" and len(args) == 2 and isinstance(args[0], int):
+        return LinearSum.of(args[1]) * args[0]
+    return None
+
+
+def linear_constraint(tree):
+    """ Return a ConstraintLinear or ConstraintSum for a comparison of linear expressions, None otherwise. """
+    if tree[0] not in COMPARISONS or len(tree) != 3:
+        return None
+    lhs, rhs = linear(tree[1]), linear(tree[2])
+    if lhs is None or rhs is None:
+        return None
+    expr = LinearSum.of(lhs) - rhs
+    vars = [var for var, coef in zip(expr.vars, expr.coefs) if coef != 0]
+    if len(vars) != 2:
+        return ConstraintSum(-1, expr.vars, expr.coefs, -expr.constant, COMPARISONS[tree[0]])
+
+    terms = {var.id: coef for var, coef in zip(expr.vars, expr.coefs)}
+    binary = vars[0] * terms[vars[0].id] + vars[1] * terms[vars[1].id]
+    return getattr(binary, "__{}__".format(tree[0]))(-expr.constant)
+
+
+# ------------------------------------------------------------------------------------------------------------ reading
+
+def load_xcsp(path: str) -> CSP:
+    """Read an XCSP3 instance (see the subset above) as a stream and build its CSP.
+
+    Args:
+        path (str): path of the XML file
+
+    Returns:
+        (CSP.CSP): the CSP, its variables named as in the file (e.g. "x[2][3]")
+    """
+    if not os.path.exists(path): raise Exception("The input file {} doesn't exist !".format(path))
+    print("Reading file {}".format(path))
+
+    loader = Loader()
+    stack = []  # open elements
+    section = None  # "variables" or "constraints"
+    template = None  # constraint of the current group
+
+    for event, elem in ET.iterparse(path, events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            if elem.tag in ("variables", "constraints"):
+                section = elem.tag
+            continue
+
+        stack.pop()
+        parent = stack[-1] if stack else None
+        done = False  # True if the element was used and can be dropped
+
+        if section == "variables" and elem.tag in ("var", "array"):
+            getattr(loader, elem.tag)(elem)
+            done = True
+        elif section == "constraints" and parent is not None:
+            if parent.tag == "group":
+                if elem.tag == "args":
+                    loader.constraint(instantiate(template, elem.text.split(), loader))
+                else:
+                    template = describe(elem)
+                done = True
+            elif parent.tag in ("constraints", "block") and elem.tag not in ("group", "block"):
+                loader.constraint(describe(elem))
+                done = True
+            elif elem.tag in ("group", "block"):
+                done = True
+        if elem.tag in ("variables", "constraints"):
+            section = None
+
+        if done:
+            elem.clear()
+            parent.remove(elem)
+
+    csp = loader.finish()
+    print("Instance has {} variables and {} constraints .".format(csp.nbVars, csp.nbConstrs))
+    return csp
+
+
+def describe(elem) -> dict:
+    """ Return the tag, the text and the text of each child of a constraint element. """
+    c = {"tag": elem.tag, "text": (elem.text or "").strip()}
+    for child in elem:
+        c[child.tag] = (child.text or "").strip()
+    return c
+
+
+def instantiate(template: dict, args, loader: Loader) -> dict:
+    """ Replace the parameters %0, %1... and %... of a group template by the given arguments. """
+    args = [var.name for arg in args for var in loader.resolve(arg)] if "[]" in " ".join(args) else args
+
+    def replace(text):
+        text = re.sub(r"%(\d+)", lambda m: args[int(m.group(1))], text)
+        if "%..." in text:
+            used = [int(i) for i in re.findall(r"%(\d+)", " ".join(template.values()))]
+            text = text.replace("%...", " ".join(args[max(used, default=-1) + 1:]))
+        return text
+
+    return {key: (value if key == "tag" else replace(value)) for key, value in template.items()}
+
+
+def solve_xcsp(path: str, settings=None, varOpt=1, valOpt=1, timeLimit=300, checkpoint=None, cache=None):
+    """ Solve an XCSP3 instance. With a checkpoint file, the search is saved to it and resumed from it if it exists.
+        With a cache file, the result is looked up in (and stored to) this result cache. """
+    csp_solver = load_xcsp(path)
+    csp_solver.set_parameters(settings if settings is not None else ["AC4", "FC"])
+    csp_solver.set_variable_selection(varOpt)
+    csp_solver.set_value_selection(valOpt)
+    csp_solver.timeLimit = timeLimit
+    if cache is not None:
+        csp_solver.set_result_cache(cache)
+
+    if checkpoint is not None:
+        csp_solver.set_checkpoint(checkpoint)
+        isFeasible = csp_solver.resume()
+    else:
+        isFeasible = csp_solver.solve()
+    print("CSP solver explored {} nodes in the research tree.".format(csp_solver.exploredNodes))
+    print("Total {}s used in the tree exploration.".format(csp_solver.exploreTime))
+    if csp_solver.propagationStats is not None:
+        for method in ("FC", "MAC"):
+            stats = csp_solver.propagationStats[method]
+            print("{} ran at {} nodes, pruned {} values in {}s, wiped out {} domains.".format(
+                method, stats["nodes"], stats["pruned"], round(stats["time"], 3), stats["wipeouts"]
+            ))
+        print("MAC chosen for {}, {} switches.".format(
+            csp_solver.propagationStats["reasons"], csp_solver.propagationStats["switches"]
+        ))
+    print("Sol is feasible ? {}".format(isFeasible))
+    return csp_solver
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Solve an XCSP3 instance.")
+    parser.add_argument("instance")
+    parser.add_argument("--settings", nargs="*", default=None)
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--checkpoint", default=None, help="file the search is saved to, and resumed from if it exists")
+    parser.add_argument("--cache", default=None, help="SQLite file of a result cache")
+    args = parser.parse_args()
+
+    csp = solve_xcsp(args.instance, args.settings, timeLimit=args.timeout, checkpoint=args.checkpoint, cache=args.cache)
+    if csp.isFeasible:
+        for var in csp.vars:
+            print("{} = {}".format(var.name, csp.assignments[var.id]))
@@ -0,0 +1,61 @@
+import os
+import sys
+
+import pytest
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+INSTANCES = os.path.join(os.path.dirname(SRC), "instances")
+sys.path.insert(0, SRC)  # the solver modules import each other as top level modules
+
+from CSP import CSP  # noqa: E402  (CSP before Variable, see CSP.py)
+
+
+def configure(csp, settings, varOpt, valOpt):
+    csp.set_parameters(settings)
+    csp.set_variable_selection(varOpt)
+    csp.set_value_selection(valOpt)
+
+
+def build_queens(N: int, settings, varOpt=1, valOpt=1):
+    """ N-Queens with the three all diff of n_queens.solve_nqueens. """
+    csp = CSP()
+    x = [csp.add_variable("x{}".format(i + 1), 1, N) for i in range(N)]
+    csp.add_all_diff(x)
+    csp.add_all_diff(x, offsets=range(N))
+    csp.add_all_diff(x, offsets=range(0, -N, -1))
+    configure(csp, settings, varOpt, valOpt)
+    return csp
+
+
+def build_coloring(name: str, colors: int, settings, varOpt=1, valOpt=1):
+    """ Coloring of a DIMACS instance with binary != constraints, as coloring.solve_coloring. """
+    from coloring import lecture
+    matrix, nodes, _ = lecture(os.path.join(INSTANCES, name))
+    csp = CSP()
+    x = [csp.add_variable("x{}".format(u), 1, colors) for u in range(nodes)]
+    for u in range(nodes):
+        for v in range(u + 1, nodes):
+            if matrix[u][v]:
+                csp.add_constraint(x[u] != x[v])
+    configure(csp, settings, varOpt, valOpt)
+    return csp
+
+
+def satisfies(csp) -> bool:
+    """ True if the assignments of csp are complete, in the root domains and satisfy every constraint. """
+    values = csp.assignments
+    if values is None or None in values:
+        return False
+    if not all(var.domMin <= value <= var.domMax for var, value in zip(csp.vars, values)):
+        return False
+    return all(c.is_feasible([values[var.id] for var in c.scope()]) for c in csp.constrs)
+
+
+@pytest.fixture
+def queens():
+    return build_queens
+
+
+@pytest.fixture
+def coloring():
+    return build_coloring
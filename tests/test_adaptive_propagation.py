@@ -0,0 +1,23 @@
+import pytest
+
+from conftest import satisfies
+
+
+@pytest.mark.parametrize("rootDepth", [0, 3, 100])
+def test_stats(queens, rootDepth):
+    csp = queens(12, ["ADAPT"])
+    csp.set_adaptive(rootDepth)
+    assert csp.solve() and satisfies(csp)
+    stats = csp.propagationStats
+    assert stats["FC"]["nodes"] + stats["MAC"]["nodes"] > 0  # one per value propagated
+    if rootDepth == 100:  # MAC everywhere
+        assert stats["FC"]["nodes"] == 0 and stats["switches"] == 0
+        assert stats["reasons"]["root"] == stats["MAC"]["nodes"]
+    if rootDepth == 0:
+        assert stats["reasons"]["root"] == 0
+
+
+def test_infeasible(coloring):
+    csp = coloring("myciel4.col", 4, ["ADAPT"])
+    assert not csp.solve() and not csp.timeOut
+    assert csp.propagationStats["MAC"]["nodes"] > 0
@@ -0,0 +1,131 @@
+import random
+
+import pytest
+
+from CSP import CSP
+from arc_consistency import ac3, ac4, ac_bulk
+
+OPERATORS = ["==", "!=", "<=", ">=", "<", ">"]
+
+
+def build(seed: int, nbVars=6, size=8):
+    """ Random binary model of linear and enumerated constraints, with its domains built. """
+    rng = random.Random(seed)
+    csp = CSP()
+    x = [csp.add_variable("x{}".format(i), rng.randint(-3, 0), rng.randint(0, size)) for i in range(nbVars)]
+    for _ in range(rng.randint(3, 10)):
+        i, j = rng.sample(range(nbVars), 2)
+        if rng.random() < 0.3:
+            modulo = rng.randint(2, 4)
+            csp.add_constraint_enum(i, j, lambda x, y, a, b, m=modulo: (a + b) % m != 0)
+            continue
+        expr = rng.choice([-2, -1, 1, 2]) * x[i] + rng.choice([-1, 1, 3]) * x[j]
+        bound = rng.randint(-3, 6)
+        csp.add_constraint({"==": expr == bound, "!=": expr != bound, "<=": expr <= bound, ">=": expr >= bound,
+                            "<": expr < bound, ">": expr > bound}[rng.choice(OPERATORS)])
+    csp.set_root_domains([var.intervals() for var in csp.vars])
+    return csp
+
+
+def domains(csp):
+    return [sorted(var.dom(0)) for var in csp.vars]
+
+
+def fixpoint(csp):
+    """ Arc consistency by revising every arc until none changes, the domains as sets. """
+    doms = [set(var.dom(0)) for var in csp.vars]
+    changed = True
+    while changed:
+        changed = False
+        for c in csp.constrs:
+            x, y = c.var1.id, c.var2.id
+            for a in list(doms[x]):
+                if not any(c.is_feasible([a, b]) for b in doms[y]):
+                    doms[x].discard(a)
+                    changed = True
+            for b in list(doms[y]):
+                if not any(c.is_feasible([a, b]) for a in doms[x]):
+                    doms[y].discard(b)
+                    changed = True
+    if not all(doms):
+        return None
+    return [sorted(dom) for dom in doms]
+
+
+@pytest.mark.parametrize("seed", range(60))
+def test_ac3_reaches_the_fixpoint(seed):
+    csp = build(seed)
+    expected = fixpoint(csp)
+    assert ac3(csp) == (expected is not None)
+    if expected is not None:
+        assert domains(csp) == expected
+
+
+def test_ac3_constraints_on_the_same_pair():
+    csp = CSP()
+    x, y = csp.add_variable("x", 0, 5), csp.add_variable("y", 0, 5)
+    csp.add_constraint(x - y >= 1)
+    csp.add_constraint(x + y <= 5)
+    csp.add_constraint(y * 2 - x >= 0)
+    csp.set_root_domains([var.intervals() for var in csp.vars])
+    expected = fixpoint(csp)
+    assert ac3(csp) and domains(csp) == expected
+
+
+@pytest.mark.parametrize("seed", range(60))
+def test_bulk_matches_ac3(seed):
+    reference = build(seed)
+    feasible = ac3(reference)
+    csp = build(seed)
+    assert ac_bulk(csp) == feasible
+    if feasible:
+        assert domains(csp) == domains(reference)
+
+
+@pytest.mark.parametrize("seed", range(60))
+def test_ac4_matches_ac3(seed):
+    reference = build(seed)
+    feasible = ac3(reference)
+    csp = build(seed)
+    assert ac4(csp) == feasible
+    if feasible:
+        assert domains(csp) == domains(reference)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_bulk_incremental(seed):
+    """ After a change, revising only the arcs around it reaches the domains of a full revision. """
+    csp = build(seed)
+    if not ac_bulk(csp):
+        return
+    var = max(csp.vars, key=lambda var: var.current_dom_size[0])
+    if var.current_dom_size[0] < 2:
+        return
+    value = var.dom(0)[0]
+    csp.remove_value(var.id, value)
+    incremental = ac_bulk(csp, changed=[var.id])
+
+    reference = build(seed)
+    reference.remove_value(var.id, value)
+    assert ac3(reference) == incremental
+    if incremental:
+        assert domains(csp) == domains(reference)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_bulk_with_large_domains(seed):
+    """ The arcs of the domains too large for the blocks are revised by ac3. """
+    reference = build(seed, size=600)
+    feasible = ac3(reference)
+    csp = build(seed, size=600)
+    assert ac_bulk(csp) == feasible
+    if feasible:
+        assert domains(csp) == domains(reference)
+
+
+def test_bulk_workers():
+    reference = build(3, nbVars=12)
+    feasible = ac3(reference)
+    csp = build(3, nbVars=12)
+    assert ac_bulk(csp, workers=2) == feasible
+    assert domains(csp) == domains(reference)
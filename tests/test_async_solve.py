@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from async_solve import solve_async, solve_events
+from conftest import satisfies
+
+
+def long_search(queens):
+    """ N-Queens the backtracking doesn't solve in seconds. """
+    csp = queens(26, ["BT"])
+    csp.timeLimit = 60
+    return csp
+
+
+def test_final_event(queens):
+    async def run():
+        return [event async for event in solve_events(queens(8, ["FC"]), period=0.01)]
+
+    events = asyncio.run(run())
+    assert events[-1].done and events[-1].isFeasible and not events[-1].interrupted
+    assert not any(event.done for event in events[:-1])
+
+
+def test_progress_callback(queens):
+    csp = queens(8, ["FC"])
+    events = []
+
+    async def on_progress(event):
+        events.append(event)
+
+    assert asyncio.run(solve_async(csp, on_progress, period=0.01))
+    assert events[-1].done and satisfies(csp)
+
+
+def test_cancel_then_solve(queens):
+    csp = long_search(queens)
+
+    async def run():
+        started = asyncio.Event()
+        task = asyncio.create_task(solve_async(csp, on_progress=lambda event: started.set(), period=0.01))
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())  # returns once the search stopped
+    assert not csp.isFeasible and not csp.interrupted
+
+    solution = queens(26, ["FC"])
+    assert solution.solve()
+    csp.set_phase(solution.assignments)  # the search goes straight to it
+    assert csp.solve() and not csp.timeOut
+    assert satisfies(csp)
+
+
+def test_interrupted_event(queens):
+    csp = long_search(queens)
+
+    async def run():
+        events = []
+        async for event in solve_events(csp, period=0.01):
+            csp.interrupted = True  # e.g. from another thread
+            events.append(event)
+        return events
+
+    last = asyncio.run(run())[-1]
+    assert last.done and last.interrupted and last.isFeasible is None
+    assert not csp.interrupted
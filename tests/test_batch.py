@@ -0,0 +1,38 @@
+import json
+import os
+
+from batch import completed_keys, job_key, read_results, run_batch
+from conftest import INSTANCES
+
+
+def test_job_key_ignores_key_order():
+    assert job_key({"problem": "nqueens", "N": 8, "settings": ["FC"]}) == \
+        job_key({"settings": ["FC"], "N": 8, "problem": "nqueens"})
+    assert job_key({"problem": "nqueens", "N": 8}) != job_key({"problem": "nqueens", "N": 9})
+
+
+def test_run_batch(tmp_path):
+    results = str(tmp_path / "results.jsonl")
+    jobs = [
+        {"problem": "nqueens", "N": 6, "settings": ["FC"]},
+        {"problem": "nqueens", "N": 3, "settings": ["FC"]},
+        {"problem": "coloring", "instance": os.path.join(INSTANCES, "myciel3.col"), "colors": 4, "settings": ["FC"]},
+        {"problem": "nqueens", "N": 26, "settings": ["BT"], "timeLimit": 0.2},
+        {"problem": "sudoku"},
+        {"problem": "nqueens", "N": 6, "settings": ["FC"]},  # solved once
+    ]
+    assert run_batch(jobs, results, workers=2) == 5
+    status = {record["key"]: record["status"] for record in read_results(results)}
+    assert [status[job_key(job)] for job in jobs] == ["solved", "infeasible", "solved", "timeout", "error", "solved"]
+
+    # a rerun only retries the failed job
+    assert completed_keys(results) == {job_key(job) for job in jobs if job["problem"] != "sudoku"}
+    assert run_batch(jobs, results, workers=2) == 1
+
+
+def test_truncated_last_line(tmp_path):
+    results = tmp_path / "results.jsonl"
+    record = {"key": "a", "job": {"problem": "nqueens", "N": 4}, "status": "solved"}
+    results.write_text(json.dumps(record) + "\n" + json.dumps(record)[:20])
+    assert list(read_results(str(results))) == [record]
+    assert list(read_results(str(tmp_path / "missing.jsonl"))) == []
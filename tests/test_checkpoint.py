@@ -0,0 +1,99 @@
+import os
+import random
+
+import pytest
+
+from conftest import satisfies
+
+
+# the arbitrary variable selection is random : the searches compared start from the same random state, the
+# checkpoint saves the state of the interrupted one
+SEED = 7
+
+
+@pytest.mark.parametrize("settings", [["BT"], ["FC", "AC4"], ["MAC3"]], ids=" + ".join)
+def test_resume_after_timeout(queens, tmp_path, settings):
+    path = str(tmp_path / "search.ckpt")
+    random.seed(SEED)
+    reference = queens(24, settings, 0, 1)
+    assert reference.solve()
+
+    random.seed(SEED)
+    stopped = queens(24, settings, 0, 1)
+    stopped.set_checkpoint(path)
+    stopped.timeLimit = 0
+    assert not stopped.solve()
+    assert stopped.timeOut and os.path.exists(path)
+
+    resumed = queens(24, settings, 0, 1)
+    resumed.set_checkpoint(path)
+    assert resumed.resume()
+    assert satisfies(resumed)
+    assert resumed.assignments == reference.assignments
+    assert not os.path.exists(path)  # removed once the search is over
+
+
+def test_resume_twice(queens, tmp_path):
+    path = str(tmp_path / "search.ckpt")
+    random.seed(SEED)
+    reference = queens(24, ["BT"], 0, 1)
+    assert reference.solve()
+
+    random.seed(SEED)
+    csp = queens(24, ["BT"], 0, 1)
+    csp.set_checkpoint(path)
+    csp.timeLimit = 0.02
+    assert not csp.solve()
+    nodes = csp.exploredNodes
+    csp = queens(24, ["BT"], 0, 1)
+    csp.set_checkpoint(path)
+    csp.timeLimit = 0.04
+    if not csp.resume():  # stopped again, further down the tree
+        assert csp.timeOut and csp.exploredNodes >= nodes
+        csp = queens(24, ["BT"], 0, 1)
+        csp.set_checkpoint(path)
+        assert csp.resume()
+    assert csp.assignments == reference.assignments
+
+
+def test_resume_without_checkpoint(queens, tmp_path):
+    csp = queens(8, ["FC"])
+    csp.set_checkpoint(str(tmp_path / "missing.ckpt"))
+    assert csp.resume()
+    assert satisfies(csp)
+
+
+def test_checkpoint_of_another_model(queens, tmp_path):
+    path = str(tmp_path / "search.ckpt")
+    csp = queens(24, ["BT"], 0, 1)
+    csp.set_checkpoint(path)
+    csp.timeLimit = 0
+    csp.solve()
+    with pytest.raises(ValueError):
+        queens(20, ["BT"], 0, 1).resume(path)
+
+
+
+def test_resume_within_a_lazy_domain(tmp_path):
+    """ The time limit stops the search among the values of a node, the resumed search goes on from there. """
+    from CSP import CSP
+
+    def build():
+        csp = CSP()
+        x = csp.add_variable("x", 0, 200000, lazy=True)
+        y = csp.add_variable("y", 0, 200000, lazy=True)
+        csp.add_constraint(y - x >= 199990)
+        csp.set_parameters(["BT"])
+        csp.set_variable_selection(1)
+        csp.set_value_selection(1)
+        csp.set_checkpoint(path)
+        return csp
+
+    path = str(tmp_path / "search.ckpt")
+    stopped = build()
+    stopped.timeLimit = 0.1
+    assert not stopped.solve() and stopped.timeOut
+
+    resumed = build()
+    assert resumed.resume()
+    assert resumed.assignments == [0, 199990]
@@ -0,0 +1,66 @@
+import os
+import random
+
+import pytest
+
+from coloring import lecture, solve_coloring, verification
+from coloring_preprocess import adjacency, greedy_clique, peel, reinsert
+from conftest import INSTANCES
+
+
+def random_graph(seed: int, nodes=30, density=0.2):
+    rng = random.Random(seed)
+    matrix = [[0] * nodes for _ in range(nodes)]
+    for u in range(nodes):
+        for v in range(u + 1, nodes):
+            if rng.random() < density:
+                matrix[u][v] = matrix[v][u] = 1
+    return matrix
+
+
+@pytest.mark.parametrize("name, size", [("myciel3.col", 2), ("queen5_5.col", 5), ("anna.col", 11)])
+def test_greedy_clique(name, size):
+    matrix, _, _ = lecture(os.path.join(INSTANCES, name))
+    clique = greedy_clique(adjacency(matrix))
+    assert len(clique) == size
+    assert all(matrix[u][v] for u in clique for v in clique if u != v)
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("colors", [2, 3, 4])
+def test_peel_and_reinsert(seed, colors):
+    matrix = random_graph(seed)
+    adj = adjacency(matrix)
+    core, order = peel(adj, colors)
+    assert sorted(core + order) == list(range(len(adj)))
+    inCore = set(core)
+    assert all(sum(v in inCore for v in adj[u]) >= colors for u in core)  # the core cannot be peeled further
+
+    # any coloring of the core extends to the peeled vertices
+    assignment = [None] * len(adj)
+    for c, u in enumerate(core):
+        assignment[u] = -c
+    reinsert(adj, order, assignment, colors)
+    assert all(1 <= assignment[u] <= colors for u in order)
+    assert all(assignment[u] != assignment[v] for u in range(len(adj)) for v in adj[u])
+
+
+@pytest.mark.parametrize("name, colors, feasible", [
+    ("myciel3.col", 3, False), ("myciel3.col", 4, True), ("queen5_5.col", 4, False), ("queen5_5.col", 5, True),
+    ("anna.col", 11, True),
+])
+def test_solve_with_and_without_preprocess(name, colors, feasible):
+    path = os.path.join(INSTANCES, name)
+    for preprocess in (True, False):
+        nodes, _, isFeasible, _, _, timeOut = solve_coloring(path, colors, ["FC"], timeLimit=30, preprocess=preprocess)
+        assert (isFeasible, timeOut) == (feasible, False)
+
+
+def test_clique_bound_without_search():
+    nodes, _, isFeasible, exploredNodes, _, timeOut = solve_coloring(os.path.join(INSTANCES, "anna.col"), 10, ["FC"])
+    assert (isFeasible, exploredNodes, timeOut) == (False, 0, False)
+
+
+def test_verification_rejects_partial_assignments():
+    matrix, nodes, _ = lecture(os.path.join(INSTANCES, "myciel3.col"))
+    assert not verification([None] * nodes, matrix)
@@ -0,0 +1,71 @@
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+from CSP import CSP
+from compact_table import ReversibleSparseBitSet
+from conftest import configure, satisfies
+
+
+def test_bitset():
+    bits = ReversibleSparseBitSet(130)
+    assert bits.limit == 3 and int(bits.words[-1]) == 0b11
+    mask = np.zeros(3, dtype=np.uint64)
+    mask[2] = np.uint64(1)
+    bits.intersect_with(mask)
+    assert bits.limit == 1 and bits.index[0] == 2
+    assert bits.intersect_index(mask) == 2 and bits.intersect_index(np.zeros(3, dtype=np.uint64)) == -1
+    bits.intersect_with(np.zeros(3, dtype=np.uint64))
+    assert bits.is_empty()
+    bits.restore(1)
+    assert bits.limit == 1 and int(bits.words[2]) == 1
+    bits.restore(0)
+    assert bits.limit == 3 and int(bits.words[0]) == np.iinfo(np.uint64).max
+
+
+def random_tables(seed: int, settings):
+    """ Random ternary tables over 5 variables, with a binary constraint and an all diff mixed in. """
+    rng = random.Random(seed)
+    csp = CSP()
+    x = [csp.add_variable("x{}".format(i), 0, rng.randint(2, 4)) for i in range(5)]
+    for _ in range(3):
+        vars = rng.sample(x, 3)
+        tuples = [t for t in itertools.product(*(range(var.domMin, var.domMax + 1) for var in vars))
+                  if rng.random() < 0.2]
+        csp.add_table(vars, np.array(tuples, dtype=np.int64).reshape(-1, 3))
+    csp.add_constraint(x[0] != x[1])
+    if rng.random() < 0.5:
+        csp.add_all_diff(x[2:])
+    configure(csp, settings, 1, rng.randint(0, 2))
+    return csp
+
+
+def has_solution(csp):
+    for values in itertools.product(*(range(var.domMin, var.domMax + 1) for var in csp.vars)):
+        csp.assignments = list(values)
+        if satisfies(csp):
+            return True
+    return False
+
+
+@pytest.mark.parametrize("settings", [["BT"], ["FC"]], ids=" + ".join)
+def test_tables_match_brute_force(settings):
+    for seed in range(60):
+        csp = random_tables(seed, settings)
+        feasible = csp.solve()
+        assert not feasible or satisfies(csp)
+        assert feasible == has_solution(random_tables(seed, settings)), seed
+
+
+def test_tuples_out_of_the_domains_ignored():
+    csp = CSP()
+    x = [csp.add_variable("x{}".format(i), 1, 3) for i in range(2)]
+    constr = csp.add_table(x, [[0, 1], [1, 2], [3, 4], [2, 2]])
+    assert constr.table.tolist() == [[1, 2], [2, 2]]
+    assert constr.is_feasible([2, 2]) and not constr.is_feasible([3, 4])
+    with pytest.raises(ValueError):
+        constr.is_feasible([1])
+    configure(csp, ["FC"], 1, 1)
+    assert csp.solve() and satisfies(csp)
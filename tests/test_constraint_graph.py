@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+
+
+@pytest.mark.parametrize("name, colors", [("myciel3.col", 4), ("queen5_5.col", 5)])
+def test_neighbors_match_the_edges(coloring, name, colors):
+    csp = coloring(name, colors, ["FC"])
+    csp.solve()
+    graph = csp.graph
+    edges = {frozenset((c.var1.id, c.var2.id)) for c in csp.constrs}
+    for v in range(csp.nbVars):
+        expected = sorted(u for u in range(csp.nbVars) if frozenset((u, v)) in edges)
+        assert graph.neighbors(v) == expected
+        assert graph.degree[v] == len(expected)
+        assert [c for c in csp.constrs if v in (c.var1.id, c.var2.id)] == graph.constrs[v]
+    assert np.all(np.diff(graph.indptr) >= 0) and graph.indptr[-1] == 2 * len(edges)
+
+
+def test_all_diff_not_in_the_adjacency(queens):
+    N = 6
+    csp = queens(N, ["FC"])
+    csp.solve()
+    graph = csp.graph
+    for v in range(N):
+        assert graph.neighbors(v) == [] and len(graph.constrs[v]) == 3
+        assert graph.degree[v] == 3 * (N - 1)  # the other variables of the three all diff
+    before = graph.futureDegree[:]
+    graph.unassign(0)
+    assert graph.futureDegree == [before[0]] + [d + 3 for d in before[1:]]
+
+
+def test_future_degree(coloring):
+    csp = coloring("myciel3.col", 4, ["BT"])
+    csp.solve()
+    graph = csp.graph
+    before = graph.futureDegree[:]
+    graph.unassign(0)
+    for u in range(csp.nbVars):
+        assert graph.futureDegree[u] == before[u] + (u in graph.neighbors(0))
+    graph.assign(0)
+    assert graph.futureDegree == before
+
+
+def test_constraints_added_after_the_build(coloring):
+    from constraint_graph import ConstraintGraph
+    csp = coloring("myciel3.col", 4, ["FC"])
+    csp.solve()
+    for u, v in [(0, 10), (0, 1), (2, 9)]:
+        csp.add_constraint_enum(u, v, lambda i, j, a, b: a <= b)
+    fresh = ConstraintGraph(csp)
+    for v in range(csp.nbVars):
+        assert sorted(csp.graph.neighbors(v)) == fresh.neighbors(v)
+        assert csp.graph.constrs[v] == fresh.constrs[v]
+    assert csp.graph.degree == fresh.degree
+    assert csp.graph.nbOverflow == 1  # only (0, 10) is a new edge
+    indptr = csp.graph.indptr
+    csp.solve()  # the CSR is rebuilt once, before the search
+    assert csp.graph.indptr is not indptr and csp.graph.nbOverflow == 0
+    assert list(csp.graph.indices) == list(fresh.indices) and list(csp.graph.indptr) == list(fresh.indptr)
+    for v in range(csp.nbVars):
+        assert csp.graph.neighbors(v) == fresh.neighbors(v)
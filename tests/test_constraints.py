@@ -0,0 +1,135 @@
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+from CSP import CSP
+from Constraint import Constraint, ConstraintSum
+from Variable import Variable
+from conftest import configure, satisfies
+
+
+@pytest.mark.parametrize("method, args", [("scope", ()), ("copy_with", ({},)), ("propagate", (0, []))])
+def test_abstract_methods(method, args):
+    with pytest.raises(NotImplementedError):
+        getattr(Constraint(0), method)(*args)
+
+
+@pytest.mark.parametrize("settings", [["FC"], ["ENGINE"], ["MAC3"]], ids=" + ".join)
+def test_sum_given_to_the_constructor(settings):
+    x = [Variable(i, "x{}".format(i), 0, 5) for i in range(4)]
+    csp = CSP(x, [ConstraintSum(0, x, [1, 2, -1, 3], 9, "eq"), ConstraintSum(1, x[:2], [1, 1], 4, "leq")])
+    configure(csp, settings, 1, 1)
+    assert csp.solve()
+    assert satisfies(csp)
+
+
+def random_sums(seed: int, settings, lazy: bool):
+    """ Random model of sums over 3 to 5 variables, with enumerated or lazy domains. """
+    rng = random.Random(seed)
+    csp = CSP()
+    x = [csp.add_variable("x{}".format(i), rng.randint(-3, 0), rng.randint(2, 5), lazy)
+         for i in range(rng.randint(3, 5))]
+    for _ in range(rng.randint(1, 4)):
+        vars = rng.sample(x, rng.randint(3, len(x)))
+        expr = sum(rng.choice([-2, -1, 1, 2, 3]) * var for var in vars)
+        bound = rng.randint(-4, 6)
+        csp.add_constraint(rng.choice([expr == bound, expr != bound, expr <= bound, expr >= bound, expr < bound,
+                                       expr > bound]))
+    configure(csp, settings, rng.choice([0, 1]), rng.choice([1, 2]))
+    return csp
+
+
+def brute_force(csp) -> bool:
+    for values in itertools.product(*[range(var.domMin, var.domMax + 1) for var in csp.vars]):
+        if all(c.is_feasible([values[var.id] for var in c.scope()]) for c in csp.constrs):
+            return True
+    return False
+
+
+@pytest.mark.parametrize("settings", [["FC"], ["ENGINE"], ["MAC3"], ["ADAPT"], ["BT"]], ids=" + ".join)
+@pytest.mark.parametrize("lazy", [False, True])
+def test_sums_match_brute_force(settings, lazy):
+    for seed in range(60):
+        expected = brute_force(random_sums(seed, ["BT"], False))
+        for state in range(8):  # the arbitrary variable selection is random, each state gives another search tree
+            random.seed(state)
+            csp = random_sums(seed, settings, lazy)
+            assert csp.solve() == expected, (seed, state)
+            assert not expected or satisfies(csp), (seed, state)
+
+
+def test_sum_state_of_a_sibling_value():
+    """ The state a sum reached under the first value of a node is not the state of the second value. """
+    csp = CSP()
+    x0 = csp.add_variable("x0", 0, 1)
+    x1, x2, x3 = [csp.add_variable("x{}".format(i), 0, 3) for i in (1, 2, 3)]
+    csp.add_constraint(x1 + 3 * x0 >= 3)  # x0 = 0 fixes x1 = 3, and the sum fails on x2 >= 1
+    csp.add_constraint(x2 + x0 >= 1)
+    csp.add_constraint(x1 + x2 + x3 == 3)  # x0 = 1 doesn't change its variables, it is propagated at x1 = 0
+    configure(csp, ["ENGINE"], 1, 1)
+    assert csp.solve()
+    assert satisfies(csp) and csp.assignments[:2] == [1, 0]
+
+
+def test_sum_updates_the_pushed_variables():
+    from propagation import PropagationEngine
+    csp = CSP()
+    x, y, z = [csp.add_variable(name, 0, 9) for name in "xyz"]
+    constr = csp.add_constraint(x + 2 * y - z <= 20)
+    csp.set_root_domains([var.intervals() for var in csp.vars])
+    engine = PropagationEngine(csp)
+    assert engine.propagate_all() and constr.sums == [-9, 27]
+
+    x.remove_above(5, 0)
+    y.remove_below(3, 0)  # not pushed, the sum keeps the old bounds of y
+    assert constr.propagate(-1, [x])
+    assert (constr.lo, constr.hi, constr.sums) == ([0, 0, 0], [5, 9, 9], [-9, 23])
+    # the state of the node is kept, the next propagation only applies its changes
+    assert constr.propagate(-1, [y])
+    assert (constr.lo, constr.hi, constr.sums) == ([0, 3, 0], [5, 9, 9], [-3, 23])
+    assert constr.propagate(-1, []) and constr.sums == [-3, 23]
+
+
+def test_expressions():
+    csp = CSP()
+    x, y, z = [csp.add_variable(name, 0, 3) for name in "xyz"]
+    constr = csp.add_constraint(2 * x + y - z + x <= 4)
+    assert isinstance(constr, ConstraintSum) and len(constr.scope()) == 3
+    assert constr.is_feasible([1, 1, 0]) and not constr.is_feasible([2, 1, 0])
+    assert isinstance(csp.add_constraint(sum([x, y, z]) == 5), ConstraintSum)
+    assert csp.add_constraint(x + y >= 1).is_feasible([0, 1])
+
+
+@pytest.mark.parametrize("settings", [["FC"], ["ENGINE"], ["MAC3"], ["BT"]], ids=" + ".join)
+def test_binary_linear_negative_coefficient(settings):
+    csp = CSP()
+    x, y = csp.add_variable("x", 1, 4), csp.add_variable("y", 1, 4)
+    csp.add_constraint(x * 2 - y * 3 > -6)  # forward checking divided by the coefficient without flipping the sign
+    csp.add_constraint(x - y < 0)
+    configure(csp, settings, 1, 1)
+    assert csp.solve()
+    assert satisfies(csp) and csp.assignments == [1, 2]
+
+
+def test_batch_matches_is_feasible():
+    csp = CSP()
+    x = [csp.add_variable("x{}".format(i), -2, 3) for i in range(4)]
+    constrs = [
+        csp.add_constraint(x[0] * 2 - x[1] <= 1),
+        csp.add_constraint(x[0] != x[2]),
+        csp.add_constraint_enum(1, 3, lambda i, j, a, b: (a * b) % 3 == 1),
+        csp.add_constraint(x[0] + x[1] * 3 - x[2] + x[3] >= 2),
+        csp.add_all_diff(x[:3], offsets=[0, 1, 2]),
+        csp.add_table(x[1:], np.array([[0, 1, 2], [3, 3, 3], [-2, 0, 1]])),
+    ]
+    rng = np.random.default_rng(0)
+    for c in constrs:
+        values = [rng.integers(-2, 4, size=50) for _ in c.scope()]
+        expected = [c.is_feasible(list(row)) for row in zip(*[column.tolist() for column in values])]
+        assert c.is_feasible_batch(values).tolist() == expected, c
+        # a scalar broadcast with arrays
+        values[0] = 1
+        expected = [c.is_feasible([1] + list(row)) for row in zip(*[column.tolist() for column in values[1:]])]
+        assert c.is_feasible_batch(values).tolist() == expected, c
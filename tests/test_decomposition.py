@@ -0,0 +1,54 @@
+import time
+
+import pytest
+
+from CSP import CSP
+from conftest import configure, satisfies
+from decomposition import components
+
+
+def independent_queens(sizes, settings):
+    """ One N-Queens per size, on disjoint variables of a single CSP. """
+    csp = CSP()
+    for N in sizes:
+        x = [csp.add_variable("x{}".format(csp.nbVars), 1, N) for _ in range(N)]
+        csp.add_all_diff(x)
+        csp.add_all_diff(x, offsets=range(N))
+        csp.add_all_diff(x, offsets=range(0, -N, -1))
+    configure(csp, settings, 1, 1)
+    return csp
+
+
+def test_components():
+    csp = independent_queens((4, 1, 5), ["FC"])
+    varIds, constrs = components(csp)
+    assert varIds == [list(range(4)), [4], list(range(5, 10))]
+    assert [len(part) for part in constrs] == [3, 3, 3]
+    for ids, part in zip(varIds, constrs):
+        assert all(var.id in ids for c in part for var in c.scope())
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+@pytest.mark.parametrize("sizes, feasible", [((6, 8, 5), True), ((6, 3, 5), False)])
+def test_decomposition(sizes, feasible, workers):
+    csp = independent_queens(sizes, ["FC", "DECOMPOSE"])
+    csp.set_workers(workers)
+    assert csp.solve() == feasible
+    assert not feasible or satisfies(csp)
+    assert not csp.timeOut
+
+
+def test_single_component(queens):
+    csp = queens(8, ["FC", "DECOMPOSE"])
+    assert csp.solve() and satisfies(csp)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_time_limit_of_the_components(workers):
+    """ The components share the time limit of the whole csp, also when more of them than workers wait in the pool. """
+    csp = independent_queens([14] * 16, ["BT", "DECOMPOSE"])  # about 0.2s of search each
+    csp.set_workers(workers)
+    csp.timeLimit = 1.5
+    begin = time.time()
+    assert satisfies(csp) if csp.solve() else csp.timeOut
+    assert time.time() - begin < 2.2
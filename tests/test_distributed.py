@@ -0,0 +1,83 @@
+import os
+import socket
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from conftest import SRC, satisfies
+from distributed import solve_distributed, split
+
+
+@pytest.mark.parametrize("N, feasible", [(8, True), (3, False), (10, True)])
+@pytest.mark.parametrize("depth, workers", [(1, 1), (2, 2)])
+def test_cube_and_conquer(queens, N, feasible, depth, workers):
+    csp = queens(N, ["FC"])
+    csp.set_cube_and_conquer(depth=depth, workers=workers)
+    csp.timeLimit = 60
+    assert csp.solve() == feasible
+    assert not feasible or satisfies(csp)
+    assert not csp.timeOut
+
+
+def test_cube_and_conquer_coloring(coloring):
+    csp = coloring("myciel3.col", 3, ["FC"])
+    csp.set_cube_and_conquer(depth=3, workers=2)
+    assert not csp.solve() and not csp.timeOut
+
+
+def test_split(queens):
+    csp = queens(6, ["FC"])
+    cubes = split(csp, 2)
+    assert cubes and all(len(cube) == 6 for cube in cubes)
+    # the first two queens are placed in each cube, the rows below only keep the values not attacked
+    for cube in cubes:
+        domains = [[value for lo, hi in intervals for value in range(lo, hi + 1)] for intervals in cube]
+        assert len(domains[0]) == len(domains[1]) == 1
+        a, b = domains[0][0], domains[1][0]
+        assert abs(a - b) > 1
+        assert all(value not in (a, a + 2, a - 2, b, b + 1, b - 1) for value in domains[2])
+    assert len({(cube[0][0], cube[1][0]) for cube in cubes}) == len(cubes)
+
+
+def test_invalid_depth(queens):
+    with pytest.raises(ValueError):
+        queens(4, ["FC"]).set_cube_and_conquer(depth=0)
+
+
+def test_remote_workers_need_an_authkey(queens):
+    csp = queens(4, ["FC"])
+    with pytest.raises(ValueError):
+        csp.set_cube_and_conquer(workers=0)
+    with pytest.raises(ValueError):
+        csp.set_cube_and_conquer(address=("localhost", 0))
+    with pytest.raises(ValueError):
+        solve_distributed(csp, workers=0)
+    result = subprocess.run([sys.executable, os.path.join(SRC, "distributed.py"), "localhost", "1"],
+                            capture_output=True, text=True)
+    assert result.returncode != 0 and "--authkey" in result.stderr
+
+
+def test_remote_worker(queens):
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        port = s.getsockname()[1]
+    csp = queens(8, ["FC"])
+    csp.set_cube_and_conquer(depth=2, workers=0, address=("localhost", port), authkey=b"secret")
+    csp.timeLimit = 60
+    command = [sys.executable, os.path.join(SRC, "distributed.py"), "localhost", str(port), "--authkey"]
+    processes = []
+    # the coordinator listens once the solve started, a worker with the wrong key is rejected
+    def start():
+        processes.extend(subprocess.Popen(command + [key]) for key in ("wrong", "secret"))
+
+    timer = threading.Timer(0.5, start)
+    timer.start()
+    try:
+        assert csp.solve() and satisfies(csp)
+    finally:
+        timer.join()
+        for process in processes:
+            process.wait(10)
+    assert processes[0].returncode != 0 and processes[1].returncode == 0
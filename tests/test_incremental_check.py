@@ -0,0 +1,51 @@
+import pytest
+
+from incremental_check import IncrementalChecker
+
+
+@pytest.fixture
+def checker(queens):
+    csp = queens(4, ["BT"])
+    csp.assignments = [None] * csp.nbVars
+    return csp, IncrementalChecker(csp)
+
+
+def assign(csp, checker, varId, value):
+    csp.assignments[varId] = value
+    return checker.assign(varId, value)
+
+
+def unassign(csp, checker, varId):
+    checker.unassign(varId, csp.assignments[varId])
+    csp.assignments[varId] = None
+
+
+def test_pairs_checked_once_both_assigned(checker):
+    csp, checker = checker
+    assert assign(csp, checker, 0, 2)
+    assert not assign(csp, checker, 1, 3)  # same diagonal as x1 = 2
+    unassign(csp, checker, 1)
+    assert assign(csp, checker, 1, 4)
+    assert assign(csp, checker, 2, 1)
+    assert assign(csp, checker, 3, 3)
+
+
+def test_all_diff_counts(checker):
+    csp, checker = checker
+    assert assign(csp, checker, 0, 1)
+    assert not assign(csp, checker, 2, 1)  # same column, and not on a diagonal
+    unassign(csp, checker, 2)
+    assert assign(csp, checker, 2, 4)
+    unassign(csp, checker, 0)
+    assert assign(csp, checker, 3, 1)  # the value 1 is free again
+
+
+def test_counters_restored(checker):
+    csp, checker = checker
+    nbAssigned = checker.nbAssigned[:]
+    for varId, value in enumerate([1, 1, 3, 3]):
+        assign(csp, checker, varId, value)
+    for varId in reversed(range(4)):
+        unassign(csp, checker, varId)
+    assert checker.nbAssigned == nbAssigned
+    assert all(used is None or not any(used.values()) for used in checker.used)
@@ -0,0 +1,108 @@
+import random
+
+import numpy as np
+import pytest
+
+from conftest import satisfies
+from local_search import CANDIDATES, MinConflicts
+
+
+def conflicts(csp, assignments, x):
+    """ Conflicts of x recomputed from scratch : the violated binary constraints, and the variables sharing its value
+    (plus offset) in each all diff. """
+    count = 0
+    for c in csp.constrs:
+        scope = c.scope()
+        if all(var.id != x for var in scope):
+            continue
+        if len(scope) == 2:
+            count += not c.is_feasible([assignments[var.id] for var in scope])
+        else:
+            keys = [assignments[var.id] + o for var, o in zip(scope, c.offsets)]
+            key = next(k for var, k in zip(scope, keys) if var.id == x)
+            count += keys.count(key) - 1
+    return count
+
+
+def prepared(csp):
+    csp.set_LS()
+    csp.timeLimit = 0  # only builds the root domains
+    csp.solve()
+    return csp
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_scores_follow_the_moves(queens, coloring, seed):
+    rng = random.Random(seed)
+    for csp in (prepared(queens(12, ["FC"])), prepared(coloring("myciel3.col", 3, ["FC"]))):
+        search = MinConflicts(csp, seed=seed)
+        search.initialize()
+        for _ in range(50):
+            x = rng.randrange(csp.nbVars)
+            search.assign(x, int(rng.choice(search.domain(x))))
+            y = rng.randrange(csp.nbVars)
+            expected = []
+            for a in search.domain(y).tolist():
+                assignments = search.assignments[:]
+                assignments[y] = a
+                expected.append(conflicts(csp, assignments, y))
+            assert search.scores(y).tolist() == expected
+            assert search.is_conflicted(y) == (conflicts(csp, search.assignments, y) > 0)
+
+
+def test_candidates_of_large_domains(queens):
+    csp = prepared(queens(300, ["FC"]))
+    csp.remove_value(7, 150)
+    search = MinConflicts(csp, seed=0)
+    search.initialize()
+    rng = random.Random(0)
+    for _ in range(100):
+        x = rng.randrange(csp.nbVars)
+        values = search.candidates(x)
+        assert len(values) <= CANDIDATES + 1 and search.assignments[x] in values.tolist()
+        assert all(csp.vars[x].contains(a, 0) for a in values.tolist())
+        scores = search.scores(x, values)
+        for a, score in zip(values.tolist(), scores.tolist()):
+            assignments = search.assignments[:]
+            assignments[x] = a
+            assert score == conflicts(csp, assignments, x)
+        search.assign(x, search.best_value(x, values, scores, 0))
+        for counts, free, keyMin in zip(search.counts, search.free, search.keyMin):
+            assert sorted(free.items) == np.flatnonzero(counts == 0).tolist()
+
+
+@pytest.mark.parametrize("N", [8, 100])
+def test_queens(queens, N):
+    csp = queens(N, ["LS"])
+    csp.timeLimit = 30
+    assert csp.solve() and not csp.timeOut
+    assert sorted(csp.assignments) == list(range(1, N + 1))
+    assert len({a + i for i, a in enumerate(csp.assignments)}) == N
+    assert len({a - i for i, a in enumerate(csp.assignments)}) == N
+
+
+@pytest.mark.parametrize("N", [8, 400])
+def test_root_domains(queens, N):
+    """ The local search keeps the values removed from the root domains out, and scales past the small models. """
+    csp = queens(N, ["LS"])
+    for value in range(1, N // 2 + 1):
+        csp.remove_value(0, value)
+    csp.timeLimit = 30
+    assert csp.solve()
+    assert satisfies(csp) and csp.assignments[0] > N // 2
+
+
+def test_no_proof_of_infeasibility(queens):
+    csp = queens(3, ["LS"])
+    csp.timeLimit = 0.3
+    assert not csp.solve()
+    assert csp.timeOut
+
+
+def test_tabu_and_walk(queens):
+    csp = queens(8, ["FC"])
+    csp.set_LS(tabu=3, walk=0.5)
+    assert csp.param["tabu"] == 3 and csp.param["walk"] == 0.5
+    csp.timeLimit = 30
+    assert csp.solve()
+    assert np.all(np.bincount(csp.assignments) <= 1)
@@ -0,0 +1,37 @@
+import pytest
+
+from CSP import CSP
+from n_queens import solve_nqueens, verification
+
+
+def test_verification():
+    assert verification([2, 4, 1, 3])
+    assert not verification([1, 3, 1, 4])  # same column
+    assert not verification([2, 4, 3, 1])  # same diagonal x_i + i
+    assert not verification([1, 3, 4, 2])  # same diagonal x_i - i
+    assert not verification([2, 4, None, 3])
+
+
+def test_offset_all_diff():
+    csp = CSP()
+    x = [csp.add_variable("x{}".format(i), 1, 4) for i in range(3)]
+    constr = csp.add_all_diff(x, offsets=[0, 1, 2])
+    assert constr.is_feasible([1, 1, 1]) and not constr.is_feasible([3, 2, 4])
+
+
+@pytest.mark.parametrize("settings", [["BT"], ["FC"], ["MAC3"], ["MAC4"]], ids=" + ".join)
+@pytest.mark.parametrize("N, feasible", [(1, True), (3, False), (8, True), (9, True)])
+def test_solve_nqueens(settings, N, feasible):
+    _, _, isFeasible, timeOut = solve_nqueens(N, settings, timeLimit=30)
+    assert (isFeasible, timeOut) == (feasible, False)
+
+
+def test_large_board():
+    _, _, isFeasible, timeOut = solve_nqueens(300, ["FC"], 4, 1, timeLimit=60)
+    assert isFeasible and not timeOut
+
+
+def test_local_search_large_board():
+    # lazy domains : the local search neither enumerates nor stores the N values of each queen
+    _, _, isFeasible, timeOut = solve_nqueens(20000, ["LS"], timeLimit=60)
+    assert isFeasible and not timeOut
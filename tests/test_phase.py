@@ -0,0 +1,40 @@
+import pytest
+
+from conftest import satisfies
+
+SOLUTION = [5, 3, 1, 7, 2, 8, 6, 4]  # a solution of the 8-Queens
+
+
+@pytest.mark.parametrize("settings", [["BT"], ["FC"], ["MAC3"]], ids=" + ".join)
+def test_initial_phase_of_a_solution(queens, settings):
+    csp = queens(8, settings)
+    csp.set_phase(SOLUTION)
+    assert csp.solve()
+    assert csp.assignments == SOLUTION
+    assert csp.exploredNodes <= 9  # straight down the tree
+
+
+def test_initial_phase_by_variable(queens):
+    csp = queens(8, ["FC"])
+    csp.set_phase({varId: value for varId, value in enumerate(SOLUTION) if varId % 2 == 0})
+    assert csp.phaseHint == [5, None, 1, None, 2, None, 6, None]
+    assert csp.solve() and satisfies(csp)
+    with pytest.raises(ValueError):
+        csp.set_phase(SOLUTION + [1])
+
+
+def test_local_search_from_the_phase(queens):
+    csp = queens(8, ["LS"])
+    csp.set_phase(SOLUTION)
+    assert csp.solve()
+    assert csp.assignments == SOLUTION and csp.exploredNodes == 0
+
+
+def test_phase_saving(queens):
+    csp = queens(10, ["FC", "PHASE"])
+    assert csp.solve() and satisfies(csp)
+    # the saved phases end on the solution, which a new search follows straight down
+    assert csp.phaseHint == csp.assignments
+    solution = csp.assignments[:]
+    csp.reset()
+    assert csp.solve() and csp.assignments == solution
@@ -0,0 +1,45 @@
+from CSP import CSP
+from propagation import PropagationEngine
+
+
+def root_engine(csp):
+    csp.set_root_domains([var.intervals() for var in csp.vars])
+    return PropagationEngine(csp)
+
+
+def test_fixpoint_of_a_chain():
+    csp = CSP()
+    x, y, z = [csp.add_variable(name, 0, 9) for name in "xyz"]
+    csp.add_constraint(x - y <= -1)
+    csp.add_constraint(y - z <= -1)
+    engine = root_engine(csp)
+    assert engine.propagate_all()
+    assert [(var.dom_min(0), var.dom_max(0)) for var in csp.vars] == [(0, 7), (1, 8), (2, 9)]
+
+    csp.add_constraint(x + y + z >= 23)
+    engine = root_engine(csp)
+    assert engine.propagate_all()
+    assert [(var.dom_min(0), var.dom_max(0)) for var in csp.vars] == [(6, 7), (7, 8), (8, 9)]
+    assert not any(engine.queues) and not engine.pending
+
+
+def test_wipe_out_clears_the_queues():
+    csp = CSP()
+    x, y, z = [csp.add_variable(name, 0, 9) for name in "xyz"]
+    csp.add_all_diff([x, y, z])
+    csp.add_constraint(x - y <= -1)
+    csp.add_constraint(y - z <= -1)
+    csp.add_constraint(x + y + z >= 27)
+    engine = root_engine(csp)
+    assert not engine.propagate_all()
+    assert not any(engine.queues) and not engine.pending
+
+
+def test_all_diff_singletons():
+    csp = CSP()
+    x = [csp.add_variable("x{}".format(i), 1, 3) for i in range(3)]
+    csp.add_all_diff(x)
+    engine = root_engine(csp)
+    x[0].remove_all_values_except(2, 0)
+    assert engine.propagate(-1, x[0])
+    assert sorted(x[1].dom(0)) == sorted(x[2].dom(0)) == [1, 3]
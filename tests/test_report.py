@@ -0,0 +1,55 @@
+import os
+
+from batch import run_batch, run_series
+from conftest import INSTANCES
+from report import latest_records, nqueens_series, plot_nqueens, write_coloring_table, write_nqueens_table
+
+
+def test_coloring_table(tmp_path):
+    results = str(tmp_path / "results.jsonl")
+    jobs = [{"problem": "coloring", "instance": os.path.join(INSTANCES, "myciel3.col"), "colors": colors,
+             "settings": ["FC"]} for colors in (3, 4)]
+    run_batch(jobs, results, workers=1)
+    assert [record["job"]["colors"] for record in latest_records(results, "coloring")] == [3, 4]
+    assert latest_records(results, "nqueens") == []
+
+    tex = str(tmp_path / "table.tex")
+    write_coloring_table(results, tex)
+    with open(tex) as f:
+        rows = [line for line in f if line.startswith("myciel3.col")]
+    assert len(rows) == 2
+    assert rows[0].startswith("myciel3.col & 11 & 20 & 3 & N & ")
+    assert rows[1].startswith("myciel3.col & 11 & 20 & 4 & Y & ")
+
+
+def nqueens_jobs(settings, sizes, timeLimit=30):
+    return [{"problem": "nqueens", "N": N, "settings": settings, "timeLimit": timeLimit} for N in sizes]
+
+
+def test_run_series(tmp_path):
+    results = str(tmp_path / "results.jsonl")
+    series = [nqueens_jobs(["FC"], [4, 6, 8]), nqueens_jobs(["BT"], [4, 30, 8], timeLimit=0.2), []]
+    assert run_series(series, results) == 5  # the BT series stops at its time out
+    assert [(record["job"]["N"], record["status"]) for record in latest_records(results, "nqueens")] == \
+        [(4, "solved"), (4, "solved"), (6, "solved"), (30, "timeout"), (8, "solved")]
+    assert run_series(series, results) == 0  # resumed : every job is recorded
+
+    series = nqueens_series(results)
+    assert sorted(series) == ["BT", "FC"]
+    assert series["FC"][0] == [4, 6, 8] and series["BT"][0] == [4]  # the solved ones only
+    assert all(len(values) == len(series["FC"][0]) for values in series["FC"])
+
+
+def test_nqueens_table_and_figures(tmp_path):
+    results = str(tmp_path / "results.jsonl")
+    run_batch(nqueens_jobs(["FC", "AC4"], [6, 3]) + nqueens_jobs(None, [5]), results, workers=1)
+
+    tex = str(tmp_path / "table.tex")
+    write_nqueens_table(results, tex)
+    with open(tex) as f:
+        rows = [line.split(" & ")[:3] for line in f if " & " in line and not line.startswith("\\textbf")]
+    assert rows == [["BT", "5", "Y"], ["FC + AC4", "3", "N"], ["FC + AC4", "6", "Y"]]
+
+    figures = str(tmp_path / "nqueens_{}.png")
+    plot_nqueens(results, figures, "N-Queens {}")
+    assert os.path.exists(figures.format("times")) and os.path.exists(figures.format("nodes"))
@@ -0,0 +1,106 @@
+import json
+import sqlite3
+
+import pytest
+
+from conftest import satisfies
+from result_cache import ResultCache, model_key
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return str(tmp_path / "results.sqlite")
+
+
+def test_feasible_hit(queens, cache):
+    first = queens(8, ["FC"])
+    first.set_result_cache(cache)
+    assert first.solve() and not first.cacheHit
+
+    second = queens(8, ["FC"])
+    second.set_result_cache(cache)
+    assert second.solve() and second.cacheHit
+    assert satisfies(second)
+    assert second.assignments == first.assignments
+    assert second.exploredNodes == first.exploredNodes
+
+
+def test_key_ignores_constraint_order(queens):
+    from CSP import CSP
+    csp = queens(8, ["FC"])
+    other = CSP()
+    x = [other.add_variable("y{}".format(i), 1, 8) for i in range(8)]
+    other.add_all_diff(x, offsets=range(0, -8, -1))
+    other.add_all_diff(x)
+    other.add_all_diff(x, offsets=range(8))
+    other.set_parameters(["FC"])
+    other.set_variable_selection(1)
+    other.set_value_selection(1)
+    assert model_key(other) == model_key(csp)
+
+
+def test_changes_miss(queens, cache):
+    csp = queens(8, ["FC"])
+    csp.set_result_cache(cache)
+    csp.solve()
+    for other in (queens(8, ["MAC3"]), queens(9, ["FC"]), queens(8, ["FC"], 1, 2)):
+        other.set_result_cache(cache)
+        other.solve()
+        assert not other.cacheHit
+
+    tightened = queens(8, ["FC"])
+    tightened.set_result_cache(cache)
+    tightened.remove_value(0, csp.assignments[0])
+    assert tightened.solve() and not tightened.cacheHit
+    assert tightened.assignments[0] != csp.assignments[0]
+
+
+def test_tampered_entry_is_discarded(queens, cache):
+    csp = queens(8, ["FC"])
+    csp.set_result_cache(cache)
+    csp.solve()
+    with sqlite3.connect(cache) as db:
+        db.execute("UPDATE results SET assignment = ?", (json.dumps([1] * 8),))
+    db.close()
+
+    again = queens(8, ["FC"])
+    again.set_result_cache(cache)
+    assert again.solve() and not again.cacheHit
+    assert satisfies(again)
+
+
+def test_timeout_not_cached(queens, cache):
+    csp = queens(40, ["BT"], 0, 1)
+    csp.set_result_cache(cache)
+    csp.timeLimit = 0
+    assert not csp.solve() and csp.timeOut
+    assert ResultCache(cache).get(model_key(csp)) is None
+
+
+def test_least_recently_used_dropped(queens, cache):
+    results = ResultCache(cache, maxEntries=2)
+    for key in ("a", "b", "c"):
+        results.put(key, True, [1], {})
+        if key == "b":
+            results.get("a")  # a is used after b
+    assert len(results) == 2
+    assert results.get("b") is None and results.get("a") is not None
+
+    with pytest.raises(ValueError):
+        ResultCache(cache, maxEntries=0)
+
+
+
+def test_infeasible_hit(queens, cache):
+    for hit in (False, True):
+        csp = queens(3, ["FC"])
+        csp.set_result_cache(cache)
+        assert not csp.solve()
+        assert csp.cacheHit == hit
+        assert csp.assignments == [None] * 3 and csp.nb_assigned == 0
+
+
+def test_infeasible_hit_of_solve_nqueens(cache):
+    from n_queens import solve_nqueens
+    for _ in range(2):
+        assert solve_nqueens(3, ["FC"], cache=cache)[2] is False
@@ -0,0 +1,104 @@
+import time
+
+import pytest
+
+from CSP import CSP
+from conftest import configure, satisfies
+
+COMPLETE = [["BT"], ["FC"], ["MAC3"], ["MAC4"], ["ADAPT"], ["ENGINE"], ["FC", "AC3"], ["FC", "AC4"],
+            ["FC", "SAC"], ["MAC4", "AC4"], ["FC", "BULK"], ["FC", "DECOMPOSE"], ["FC", "PHASE"]]
+
+
+@pytest.mark.parametrize("settings", COMPLETE + [["LS"]], ids=" + ".join)
+def test_queens_solution(queens, settings):
+    csp = queens(8, settings)
+    csp.timeLimit = 30
+    assert csp.solve()
+    assert satisfies(csp)
+
+
+@pytest.mark.parametrize("settings", COMPLETE, ids=" + ".join)
+def test_queens_infeasible(queens, settings):
+    csp = queens(3, settings)
+    assert not csp.solve()
+    assert not csp.timeOut
+
+
+@pytest.mark.parametrize("settings", COMPLETE + [["LS"]], ids=" + ".join)
+def test_coloring_solution(coloring, settings):
+    csp = coloring("myciel3.col", 4, settings)
+    csp.timeLimit = 30
+    assert csp.solve()
+    assert satisfies(csp)
+
+
+@pytest.mark.parametrize("settings", COMPLETE, ids=" + ".join)
+def test_coloring_infeasible(coloring, settings):
+    csp = coloring("myciel3.col", 3, settings)
+    assert not csp.solve()
+    assert not csp.timeOut
+
+
+@pytest.mark.parametrize("varOpt", range(4))
+@pytest.mark.parametrize("valOpt", range(4))
+def test_heuristics(queens, varOpt, valOpt):
+    csp = queens(10, ["FC", "AC4"], varOpt, valOpt)
+    assert csp.solve()
+    assert satisfies(csp)
+
+
+def test_resolve_after_tightening(queens):
+    csp = queens(8, ["FC", "AC3"])
+    assert csp.solve()
+    first = csp.assignments[0]
+    csp.remove_value(0, first)
+    assert csp.solve()
+    assert satisfies(csp) and csp.assignments[0] != first
+
+
+@pytest.mark.parametrize("settings", [["BT"], ["FC", "AC4"], ["MAC3"]], ids=" + ".join)
+def test_resolve_after_adding_constraints(coloring, settings):
+    csp = coloring("myciel3.col", 4, settings)
+    assert csp.solve()
+    # forbid the colors found for the first vertices, one constraint at a time
+    for varId in range(3):
+        value = csp.assignments[varId]
+        csp.add_constraint_enum(varId, varId + 3, lambda i, j, a, b, value=value: a != value)
+        assert csp.solve()
+        assert satisfies(csp) and csp.assignments[varId] != value
+    csp.reset()
+    assert csp.solve() and satisfies(csp)
+
+
+@pytest.mark.parametrize("settings, valOpt", [(["FC"], 2), (["ENGINE"], 1), (["MAC3"], 2), (["ADAPT"], 2)])
+def test_lazy_domains(settings, valOpt):
+    csp = CSP()
+    x, y, z = [csp.add_variable(name, 0, 10 ** 6) for name in "xyz"]
+    assert x.lazy
+    csp.add_constraint(x - y >= 500000)
+    csp.add_constraint(y - z >= 400000)
+    csp.add_constraint(x + y + z == 1400000)
+    configure(csp, settings, 1, valOpt)
+    csp.timeLimit = 30
+    assert csp.solve()
+    assert satisfies(csp)
+
+
+def lazy_infeasible(settings):
+    """ Three lazy domains of 10^6 values, the sums can't be reached (see the bounds : 3z + 1.3M > 1.2M). """
+    csp = CSP()
+    x, y, z = [csp.add_variable(name, 0, 10 ** 6) for name in "xyz"]
+    csp.add_constraint(x - y >= 500000)
+    csp.add_constraint(y - z >= 400000)
+    csp.add_constraint(x + y + z == 1200000)
+    configure(csp, settings, 1, 1)
+    return csp
+
+
+@pytest.mark.parametrize("settings", [["BT"], ["FC"], ["MAC3"], ["ADAPT"]], ids=" + ".join)
+def test_time_limit_within_a_node(settings):
+    csp = lazy_infeasible(settings)
+    csp.timeLimit = 1
+    begin = time.time()
+    assert not csp.solve()
+    assert csp.timeOut and time.time() - begin < 2
@@ -0,0 +1,71 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from CSP import CSP
+from conftest import satisfies
+from propagation import PropagationEngine
+from singleton_consistency import probe, sac
+
+
+def root(csp):
+    """ Allocate the domains of the search, as CSP.solve does before the root preprocessing. """
+    csp.assignments = [None] * csp.nbVars
+    csp.nodeIds = [0] * (csp.nbVars + 1)
+    for var in csp.vars:
+        var.current_dom_size = var.dom_size * np.ones(csp.nbVars + 1, dtype=int)
+    return csp
+
+
+def solutions(csp):
+    for values in itertools.product(*(range(var.domMin, var.domMax + 1) for var in csp.vars)):
+        csp.assignments = list(values)
+        if satisfies(csp):
+            yield values
+
+
+@pytest.mark.parametrize("N", [4, 5, 6])
+def test_sac_keeps_the_solutions(queens, N):
+    csp = root(queens(N, ["FC"]))
+    supported = [set(values) for values in zip(*solutions(queens(N, ["FC"])))]
+    assert sac(csp)
+    engine = PropagationEngine(csp)
+    for var, values in zip(csp.vars, supported):
+        assert values <= set(var.dom(0))
+        for value in var.dom(0):
+            assert probe(engine, var.id, value)  # singleton consistent
+
+
+def test_sac_prunes_more_than_ac(queens):
+    csp = root(queens(4, ["FC"]))
+    assert sac(csp)
+    # the corners of the 4-queens only fail after an assignment is propagated
+    assert sorted(csp.vars[0].dom(0)) == [2, 3]
+
+
+def test_sac_probes_sums_and_tables():
+    csp = CSP()
+    x, y, z = [csp.add_variable(name, 0, 1) for name in "xyz"]
+    csp.add_constraint(x + y + z == 1)
+    csp.add_table([x, y], [(0, 0), (0, 1), (1, 1)])
+    root(csp)
+    assert sac(csp)
+    # x = 1 leaves y = 0 by the sum, not allowed by the table
+    assert list(x.dom(0)) == [0] and sorted(y.dom(0)) == sorted(z.dom(0)) == [0, 1]
+
+
+def test_sac_infeasible(queens, coloring):
+    assert not sac(root(queens(3, ["FC"])))
+    assert sac(root(coloring("myciel3.col", 4, ["FC"])))
+
+
+def test_workers_same_domains(queens):
+    serial, parallel = root(queens(6, ["FC"])), root(queens(6, ["FC"]))
+    assert sac(serial) and sac(parallel, workers=2)
+    assert [sorted(var.dom(0)) for var in serial.vars] == [sorted(var.dom(0)) for var in parallel.vars]
+
+
+def test_invalid_workers(queens):
+    with pytest.raises(ValueError):
+        queens(4, ["FC"]).set_workers(0)
@@ -0,0 +1,50 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import INSTANCES, SRC
+from solve import main
+
+
+def test_nqueens(capsys):
+    result = main(["nqueens", "8", "--settings", "FC", "--quiet"])
+    assert result["status"] == "solved" and result["startupTime"] >= 0
+    record = json.loads(capsys.readouterr().out)
+    assert record["job"] == {"problem": "nqueens", "N": 8, "settings": ["FC"], "variable": 1, "value": 1,
+                             "timeLimit": 300}
+    assert record["status"] == "solved"
+
+
+def test_coloring(capsys):
+    path = os.path.join(INSTANCES, "myciel3.col")
+    result = main(["coloring", path, "3", "--no-preprocess", "--timeout", "30"])
+    assert result["status"] == "infeasible"
+    assert capsys.readouterr().out.rstrip().endswith("s of startup")
+
+
+def test_bad_arguments(capsys):
+    with pytest.raises(SystemExit):
+        main(["sudoku", "9"])
+    with pytest.raises(SystemExit):
+        main(["nqueens"])
+
+
+def test_core_does_not_import_numpy():
+    """ Solving a model of the core constraints leaves numpy and matplotlib unloaded. """
+    code = ("import sys\n"
+            "from CSP import CSP\n"
+            "csp = CSP()\n"
+            "x = [csp.add_variable('x{}'.format(i), 1, 6) for i in range(6)]\n"
+            "csp.add_all_diff(x)\n"
+            "csp.add_constraint(x[0] != x[1])\n"
+            "csp.set_parameters(['FC'])\n"
+            "csp.set_variable_selection(1)\n"
+            "csp.set_value_selection(1)\n"
+            "assert csp.solve()\n"
+            "import solve\n"
+            "print('numpy' in sys.modules, 'matplotlib' in sys.modules)\n")
+    out = subprocess.run([sys.executable, "-c", code], cwd=SRC, capture_output=True, text=True, check=True).stdout
+    assert out.split() == ["False", "False"]
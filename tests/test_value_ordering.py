@@ -0,0 +1,71 @@
+import random
+
+import numpy as np
+import pytest
+
+from CSP import CSP
+from constraint_graph import ConstraintGraph
+from conftest import satisfies
+from value_ordering import SupportCounter
+
+
+def build(seed: int):
+    """ Random binary model of linear and enumerated constraints, set up for the search as in CSP.solve. """
+    rng = random.Random(seed)
+    csp = CSP()
+    x = [csp.add_variable("x{}".format(i), rng.randint(-2, 0), rng.randint(2, 6)) for i in range(5)]
+    for _ in range(6):
+        i, j = rng.sample(range(5), 2)
+        if rng.random() < 0.5:
+            modulo = rng.randint(2, 4)
+            csp.add_constraint_enum(i, j, lambda x, y, a, b, m=modulo: (a + 2 * b) % m != 0)
+        else:
+            csp.add_constraint(x[i] * rng.choice([1, 2]) - x[j] <= rng.randint(-1, 3))
+    for var in csp.vars:
+        var.current_dom_size = var.dom_size * np.ones(csp.nbVars + 1, dtype=int)
+    csp.graph = ConstraintGraph(csp)
+    return csp, rng
+
+
+def supports(csp, var, value, level):
+    count = 0
+    for c in csp.constrs:
+        if all(other is not var for other in c.scope()):
+            continue
+        other = c.var2 if c.var1 is var else c.var1
+        for b in other.dom(level):
+            count += c.is_feasible([value, b] if c.var1 is var else [b, value])
+    return count
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_counts_follow_the_current_domains(seed):
+    csp, rng = build(seed)
+    counter = SupportCounter(csp)
+    for level in (1, 0, 1):  # values removed, restored, removed again
+        for var in csp.vars:
+            var.current_dom_size[level] = var.current_dom_size[0]
+        if level == 1:
+            for var in rng.sample(csp.vars, 3):
+                for value in rng.sample(var.dom(1), 2):
+                    var.remove_value(value, 1)
+        for var in csp.vars:
+            values = sorted(var.dom(level))
+            expected = sorted(values, key=lambda a: -supports(csp, var, a, level))
+            assert counter.order(var.id, level) == expected
+
+
+def test_compatibility_matrices():
+    csp, _ = build(0)
+    for c in csp.constrs:
+        mat = c.compatibility_matrix()
+        for a in c.var1.dom(-1):
+            for b in c.var2.dom(-1):
+                assert mat[a - c.var1.domMin, b - c.var2.domMin] == c.is_feasible([a, b])
+
+
+@pytest.mark.parametrize("settings", [["BT"], ["FC"]], ids=" + ".join)
+def test_most_supported_search(queens, coloring, settings):
+    for csp in (queens(8, settings, 1, 3), coloring("myciel3.col", 4, settings, 1, 3)):
+        assert csp.solve()
+        assert satisfies(csp)
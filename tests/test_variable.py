@@ -0,0 +1,130 @@
+import random
+
+import pytest
+
+from Variable import Variable, IntervalVariable
+
+LEVELS = 6
+
+
+def make(cls, domMin=0, domMax=40):
+    var = cls(0, "x", domMin, domMax)
+    if var.lazy:
+        var.allocate_levels(LEVELS, False)
+    var.current_dom_size = [var.dom_size] * LEVELS
+    return var
+
+
+def same(var, ref, level):
+    assert sorted(var.dom(level)) == sorted(ref.dom(level))
+    assert var.current_dom_size[level] == ref.current_dom_size[level]
+    assert var.intervals(level) == ref.intervals(level)
+    if ref.current_dom_size[level]:
+        assert (var.dom_min(level), var.dom_max(level)) == (ref.dom_min(level), ref.dom_max(level))
+    for value in range(ref.domMin - 1, ref.domMax + 2):
+        assert var.contains(value, level) == ref.contains(value, level)
+
+
+def test_interval_operations():
+    var = make(IntervalVariable, 0, 10 ** 6)
+    var.remove_value(500, 0)
+    var.remove_value(0, 0)
+    var.remove_value(1, 0)
+    assert var.dom_min(0) == 2 and not var.contains(500, 0) and var.contains(501, 0)
+    assert var.current_dom_size[0] == 10 ** 6 - 2
+    var.remove_below(501, 0)
+    assert var.dom_min(0) == 501 and var.current_dom_size[0] == 10 ** 6 - 500
+    var.remove_above(1000, 0)
+    assert var.intervals(0) == [(501, 1000)] and var.current_dom_size[0] == 500
+    with pytest.raises(ValueError):
+        var.remove_value(500, 0)
+
+
+def test_interval_restore():
+    var = make(IntervalVariable, 0, 100)
+    var.remove_value(50, 0)
+    var.copy_level(0, 1)
+    var.remove_value(60, 1)
+    var.remove_above(70, 1)
+    var.copy_level(1, 2)
+    var.remove_all_values_except(55, 2)
+    assert var.dom(2) == [55]
+    var.copy_level(0, 1)  # back to the root : the holes of the levels below are forgotten
+    assert var.contains(60, 1) and var.contains(100, 1) and not var.contains(50, 1)
+    assert var.current_dom_size[1] == 100
+
+
+def test_interval_restrict():
+    var = make(IntervalVariable, 0, 10 ** 6)
+    var.restrict([(0, 0), (10 ** 6, 10 ** 6)], 0)
+    assert var.intervals(0) == [(0, 0), (10 ** 6, 10 ** 6)]
+    assert var.current_dom_size[0] == 2 and var.dom(0) == [0, 10 ** 6]
+    assert not var.contains(1, 0) and not var.contains(10 ** 6 - 1, 0)
+    var.restrict([(5, 9)], 0)  # the values removed before are restored
+    assert var.dom(0) == [5, 6, 7, 8, 9]
+    var.restrict([], 0)
+    assert var.current_dom_size[0] == 0
+
+
+def test_interval_restrict_wide_gaps():
+    """ The gaps between the intervals are kept as ranges, the bounds jump over them. """
+    var = make(IntervalVariable, 0, 10 ** 6)
+    var.restrict([(0, 2), (500000, 500001), (10 ** 6 - 1, 10 ** 6)], 0)
+    assert len(var.gaps) == 2 and not var.holes
+    var.copy_level(0, 1)
+    var.remove_value(500000, 1)
+    var.remove_below(3, 1)
+    assert var.dom(1) == [500001, 10 ** 6 - 1, 10 ** 6] and var.current_dom_size[1] == 3
+    var.copy_level(1, 2)
+    var.remove_above(10 ** 6 - 2, 2)
+    assert var.intervals(2) == [(500001, 500001)] and var.current_dom_size[2] == 1
+    var.copy_level(0, 1)  # backtrack to the root
+    assert var.intervals(1) == var.intervals(0) and var.current_dom_size[1] == 7
+    var.restrict([(1, 1)], 1)
+    assert var.dom(1) == [1] and var.dom(0)[:3] == [0, 1, 2]
+    var.copy_level(0, 1)
+    assert len(var.gaps) == 2
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_interval_matches_enumerated(seed):
+    """ Random branches of a search on an enumerated and a lazy domain give the same domains. """
+    rng = random.Random(seed)
+    ref, var = make(Variable), make(IntervalVariable)
+    if rng.random() < 0.5:
+        intervals = sorted({(a, a + rng.randint(0, 4)) for a in rng.sample(range(0, 40, 6), 4)})
+        ref.restrict(intervals, 0)
+        var.restrict(intervals, 0)
+    same(var, ref, 0)
+    level = 0
+    for _ in range(200):
+        if level + 1 < LEVELS and ref.current_dom_size[level] > 0 and rng.random() < 0.6:
+            for v in (ref, var):
+                v.copy_level(level, level + 1)
+            level += 1
+        elif level > 0 and rng.random() < 0.5:
+            level -= 1
+            for v in (ref, var):  # backtrack : the child level is rebuilt from its parent
+                v.copy_level(level, level + 1)
+            same(var, ref, level + 1)
+        if ref.current_dom_size[level] == 0 or level == 0:
+            continue
+        values = ref.dom(level)
+        op = rng.randrange(4)
+        value = rng.choice(values)
+        if op == 0:
+            ref.remove_value(value, level)
+            var.remove_value(value, level)
+        elif op == 1:
+            bound = value + rng.randint(-2, 2)
+            ref.remove_below(bound, level)
+            var.remove_below(bound, level)
+        elif op == 2:
+            bound = value + rng.randint(-2, 2)
+            ref.remove_above(bound, level)
+            var.remove_above(bound, level)
+        else:
+            ref.remove_all_values_except(value, level)
+            var.remove_all_values_except(value, level)
+        for lv in range(level + 1):
+            same(var, ref, lv)
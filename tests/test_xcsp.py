@@ -0,0 +1,131 @@
+import pytest
+
+from Constraint import ConstraintAllDiff, ConstraintLinear, ConstraintSum
+from compact_table import ConstraintTable
+from conftest import configure, satisfies
+from xcsp import Loader, enumerate_tuples, evaluate, evaluate_tuples, load_xcsp, parse_expression, parse_values, \
+    remove_rows
+
+INSTANCE = """<instance format="XCSP3" type="CSP">
+  <variables>
+    <var id="a"> 0..3 6 </var>
+    <var id="b" as="a"/>
+    <array id="x" size="[2][3]"> 1..4 </array>
+    <array id="y" size="[3]">
+      <domain for="y[0]"> 2 4 </domain>
+      <domain for="others"> 0..9 </domain>
+    </array>
+  </variables>
+  <constraints>
+    <intension> gt(a,1) </intension>
+    <intension> eq(sub(add(a,mul(2,b)),3),y[2]) </intension>
+    <intension> eq(mod(mul(a,b),5),1) </intension>
+    <intension> ne(dist(x[0][0],x[0][1]),x[0][2]) </intension>
+    <extension>
+      <list> x[1][0] x[1][1] </list>
+      <conflicts> (1,1)(2,2)(3,3)(4,4) </conflicts>
+    </extension>
+    <extension>
+      <list> y[0] </list>
+      <supports> 4 5 </supports>
+    </extension>
+    <block>
+      <allDifferent> x[0][] </allDifferent>
+      <sum>
+        <list> x[1][] </list>
+        <coeffs> 1 2 1 </coeffs>
+        <condition> (le,y[1]) </condition>
+      </sum>
+    </block>
+    <group>
+      <intension> lt(%0,%1) </intension>
+      <args> x[0][0] x[1][0] </args>
+      <args> x[0][1] x[1][2] </args>
+    </group>
+  </constraints>
+</instance>
+"""
+
+
+@pytest.fixture
+def instance(tmp_path):
+    path = tmp_path / "instance.xml"
+    path.write_text(INSTANCE)
+    return str(path)
+
+
+def test_parse_values():
+    assert parse_values(" 0..3 5 7..8 ") == [0, 1, 2, 3, 5, 7, 8]
+
+
+def test_remove_rows():
+    import numpy as np
+    tuples = np.array([[0, 0], [0, 1], [1, 0], [1, 1]])
+    assert remove_rows(tuples, np.array([[1, 0], [5, 5]])).tolist() == [[0, 0], [0, 1], [1, 1]]
+
+
+@pytest.mark.parametrize("text", [
+    "eq(mod(mul(a,b),5),1)", "ne(dist(a,b),c)", "le(div(a,b),c)", "iff(gt(a,b),lt(b,c))", "xor(a,b,c)",
+    "imp(eq(a,0),ne(b,c))", "eq(if(gt(a,b),a,b),max(a,b,c))", "ge(min(a,b),sqr(c))", "or(not(a),and(b,c))",
+    "eq(neg(a),sub(b,abs(c)))", "eq(pow(a,2),add(b,c,1))",
+])
+def test_evaluate_tuples(text):
+    import xml.etree.ElementTree as ET
+    loader = Loader()
+    for name in "abc":
+        loader.var(ET.fromstring('<var id="{}"> -2..3 </var>'.format(name)))
+    vars = loader.csp.vars
+    tree = parse_expression(text, loader)
+    tuples = enumerate_tuples(vars)
+    expected = []
+    for t in tuples.tolist():
+        try:
+            expected.append(bool(evaluate(tree, {var.id: a for var, a in zip(vars, t)})))
+        except ZeroDivisionError:  # undefined, not satisfied
+            expected.append(False)
+    assert evaluate_tuples(tree, {var.id: tuples[:, i] for i, var in enumerate(vars)}).tolist() == expected
+
+
+def test_load(instance):
+    csp = load_xcsp(instance)
+    names = [var.name for var in csp.vars]
+    assert names == ["a", "b"] + ["x[{}][{}]".format(i, j) for i in range(2) for j in range(3)] + \
+        ["y[0]", "y[1]", "y[2]"]
+    a, b, y0 = csp.vars[0], csp.vars[1], csp.vars[8]
+    assert sorted(b.dom(0)) == [0, 1, 2, 3, 6]
+    assert sorted(a.dom(0)) == [2, 3, 6]  # unary intension
+    assert sorted(y0.dom(0)) == [4]  # unary extension, over the values 2 and 4
+
+    kinds = [type(c) for c in csp.constrs]
+    assert kinds == [ConstraintSum, ConstraintTable, ConstraintTable, ConstraintTable, ConstraintAllDiff, ConstraintSum,
+                     ConstraintLinear, ConstraintLinear]
+
+
+@pytest.mark.parametrize("settings", [["FC"], ["MAC3"], ["BT"]], ids=" + ".join)
+def test_solve(instance, settings):
+    csp = load_xcsp(instance)
+    configure(csp, settings, 1, 1)
+    assert csp.solve()
+    assert satisfies(csp)
+    values = dict(zip([var.name for var in csp.vars], csp.assignments))
+    a, b = values["a"], values["b"]
+    assert a in (2, 3, 6) and b in (0, 1, 2, 3, 6) and a * b % 5 == 1
+    assert a + 2 * b - 3 == values["y[2]"] and values["y[0]"] == 4
+    assert values["x[1][0]"] != values["x[1][1]"]
+    assert values["x[1][0]"] + 2 * values["x[1][1]"] + values["x[1][2]"] <= values["y[1]"]
+    assert values["x[0][0]"] < values["x[1][0]"] and values["x[0][1]"] < values["x[1][2]"]
+    assert len({values["x[0][{}]".format(j)] for j in range(3)}) == 3
+
+
+@pytest.mark.parametrize("constraint, message", [
+    ("<regular> <list> a b </list> </regular>", "Unsupported"),
+    ("<intension> eq(foo(a),b) </intension>", "Unsupported"),
+    ("<extension> <list> a b </list> <supports> (0,*) </supports> </extension>", "short tuples"),
+    ("<intension> eq(z,b) </intension>", "Unknown variable"),
+])
+def test_unsupported(tmp_path, constraint, message):
+    path = tmp_path / "instance.xml"
+    path.write_text("<instance><variables><var id='a'> 0..3 </var><var id='b'> 0..3 </var></variables>"
+                    "<constraints>{}</constraints></instance>".format(constraint))
+    with pytest.raises(ValueError, match=message):
+        load_xcsp(str(path))